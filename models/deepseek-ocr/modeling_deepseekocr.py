@@ -296,7 +296,8 @@ def load_pil_images(conversations: List[Dict[str, str]]) -> List[Image.Image]:
             # exit()
             
             # pil_img = Image.open(image_path)
-            pil_img = load_image(image_path)
+            # already-decoded PIL images (e.g. rendered PDF pages) are used as-is
+            pil_img = image_path if isinstance(image_path, Image.Image) else load_image(image_path)
             pil_img = pil_img.convert("RGB")
             pil_images.append(pil_img)
 
@@ -502,7 +503,7 @@ class DeepseekOCRModel(DeepseekV2Model):
                     images_in_this_batch = torch.cat(images_in_this_batch, dim=0)
                     # exit()
 
-                    inputs_embeds[idx].masked_scatter_(images_seq_mask[idx].unsqueeze(-1).cuda(), images_in_this_batch)
+                    inputs_embeds[idx].masked_scatter_(images_seq_mask[idx].unsqueeze(-1).to(inputs_embeds.device), images_in_this_batch)
 
                 idx += 1
             
@@ -700,7 +701,10 @@ class DeepseekOCRForCausalLM(DeepseekV2ForCausalLM):
 
 
 
-    def infer(self, tokenizer, prompt='', image_file='', output_path = '', base_size=1024, image_size=640, crop_mode=True, test_compress=False, save_results=False, eval_mode=False):
+    def infer(self, tokenizer, prompt='', image_file='', output_path = '', base_size=1024, image_size=640, crop_mode=True, test_compress=False, save_results=False, eval_mode=False, global_view_transform=None):
+        # image_file may be a path or an already-decoded PIL image.
+        # global_view_transform(image, size) -> normalized bfloat16 (3, size, size) tensor;
+        # when given it replaces ImageOps.pad + image_transform for the global view.
         self.disable_torch_init()
 
         os.makedirs(output_path, exist_ok=True)
@@ -716,7 +720,7 @@ class DeepseekOCRForCausalLM(DeepseekV2ForCausalLM):
                     # "content": "<image>\nFree OCR. ",
                     # "content": "<image>\nParse the figure. ",
                     # "content": "<image>\nExtract the text in the image. ",
-                    "images": [f'{image_file}'],
+                    "images": [image_file],
                 },
                 {"role": "<|Assistant|>", "content": ""},
             ]
@@ -785,8 +789,9 @@ class DeepseekOCRForCausalLM(DeepseekV2ForCausalLM):
                 
                 """process the global view"""
                 # image = image.resize((base_size, base_size))
-                global_view = ImageOps.pad(image, (base_size, base_size),
-                                        color=tuple(int(x * 255) for x in image_transform.mean))
+                if global_view_transform is None:
+                    global_view = ImageOps.pad(image, (base_size, base_size),
+                                            color=tuple(int(x * 255) for x in image_transform.mean))
                 
                 if base_size == 1024:
                     valid_img_tokens += int(256 * ratio)
@@ -799,7 +804,10 @@ class DeepseekOCRForCausalLM(DeepseekV2ForCausalLM):
 
 
                 
-                images_list.append(image_transform(global_view).to(torch.bfloat16))
+                if global_view_transform is None:
+                    images_list.append(image_transform(global_view).to(torch.bfloat16))
+                else:
+                    images_list.append(global_view_transform(image, base_size))
 
                 # global_view_tensor = image_transform(global_view).to(torch.bfloat16)
 
@@ -844,9 +852,12 @@ class DeepseekOCRForCausalLM(DeepseekV2ForCausalLM):
                     print('directly resize')
                     image = image.resize((image_size, image_size))
                 # else:
-                global_view = ImageOps.pad(image, (image_size, image_size),
-                                        color=tuple(int(x * 255) for x in image_transform.mean))
-                images_list.append(image_transform(global_view).to(torch.bfloat16))
+                if global_view_transform is None:
+                    global_view = ImageOps.pad(image, (image_size, image_size),
+                                            color=tuple(int(x * 255) for x in image_transform.mean))
+                    images_list.append(image_transform(global_view).to(torch.bfloat16))
+                else:
+                    images_list.append(global_view_transform(image, image_size))
 
                 if base_size == 1024:
                     valid_img_tokens += int(256 * ratio)
@@ -911,12 +922,12 @@ class DeepseekOCRForCausalLM(DeepseekV2ForCausalLM):
 
         if not eval_mode:
             streamer = NoEOSTextStreamer(tokenizer, skip_prompt=True, skip_special_tokens=False)
-            with torch.autocast("cuda", dtype=torch.bfloat16):
+            with torch.autocast(self.device.type, dtype=torch.bfloat16):
                 with torch.no_grad():
                     output_ids = self.generate(
-                        input_ids.unsqueeze(0).cuda(),
-                        images=[(images_crop.cuda(), images_ori.cuda())],
-                        images_seq_mask = images_seq_mask.unsqueeze(0).cuda(),
+                        input_ids.unsqueeze(0).to(self.device),
+                        images=[(images_crop.to(self.device), images_ori.to(self.device))],
+                        images_seq_mask = images_seq_mask.unsqueeze(0).to(self.device),
                         images_spatial_crop = images_spatial_crop,
                         # do_sample=False,
                         # num_beams = 1,
@@ -929,12 +940,12 @@ class DeepseekOCRForCausalLM(DeepseekV2ForCausalLM):
                         )
 
         else:
-            with torch.autocast("cuda", dtype=torch.bfloat16):
+            with torch.autocast(self.device.type, dtype=torch.bfloat16):
                 with torch.no_grad():
                     output_ids = self.generate(
-                        input_ids.unsqueeze(0).cuda(),
-                        images=[(images_crop.cuda(), images_ori.cuda())],
-                        images_seq_mask = images_seq_mask.unsqueeze(0).cuda(),
+                        input_ids.unsqueeze(0).to(self.device),
+                        images=[(images_crop.to(self.device), images_ori.to(self.device))],
+                        images_seq_mask = images_seq_mask.unsqueeze(0).to(self.device),
                         images_spatial_crop = images_spatial_crop,
                         # do_sample=False,
                         # num_beams = 1,
@@ -947,7 +958,7 @@ class DeepseekOCRForCausalLM(DeepseekV2ForCausalLM):
                 
 
         if '<image>' in conversation[0]['content'] and eval_mode:
-                outputs = tokenizer.decode(output_ids[0, input_ids.unsqueeze(0).cuda().shape[1]:])
+                outputs = tokenizer.decode(output_ids[0, input_ids.unsqueeze(0).to(self.device).shape[1]:])
                 stop_str = '<｜end▁of▁sentence｜>'
                 if outputs.endswith(stop_str):
                     outputs = outputs[:-len(stop_str)]
@@ -957,7 +968,7 @@ class DeepseekOCRForCausalLM(DeepseekV2ForCausalLM):
                 return outputs
         
         if '<image>' in conversation[0]['content'] and test_compress:
-            outputs = tokenizer.decode(output_ids[0, input_ids.unsqueeze(0).cuda().shape[1]:])
+            outputs = tokenizer.decode(output_ids[0, input_ids.unsqueeze(0).to(self.device).shape[1]:])
             pure_texts_outputs_token_length = len(text_encode(tokenizer, outputs, bos=False, eos=False))
             print('='*50)
             print('image size: ', (w, h))
@@ -968,7 +979,7 @@ class DeepseekOCRForCausalLM(DeepseekV2ForCausalLM):
 
 
         if '<image>' in conversation[0]['content'] and save_results:
-            outputs = tokenizer.decode(output_ids[0, input_ids.unsqueeze(0).cuda().shape[1]:])
+            outputs = tokenizer.decode(output_ids[0, input_ids.unsqueeze(0).to(self.device).shape[1]:])
             stop_str = '<｜end▁of▁sentence｜>'
 
             print('='*15 + 'save results:' + '='*15)
@@ -978,6 +989,10 @@ class DeepseekOCRForCausalLM(DeepseekV2ForCausalLM):
                 outputs = outputs[:-len(stop_str)]
             outputs = outputs.strip()
 
+            # keep the grounding tags (<|ref|>/<|det|>) so callers can recover layout boxes
+            with open(f'{output_path}/result_raw.mmd', 'w', encoding = 'utf-8') as afile:
+                afile.write(outputs)
+
             matches_ref, matches_images, mathes_other = re_match(outputs)
             # print(matches_ref)
             result = process_image_with_refs(image_draw, matches_ref, output_path)
@@ -20,6 +20,7 @@ if os.name == 'nt':
 sys.path.insert(0, '.')
 
 from src import OCREngine, PDFConverter, get_memory_manager, get_tracker
+from src.sharding import parse_shard, shard_key, select_shard
 import logging
 
 # 設定日誌
@@ -165,6 +166,7 @@ def main():
     parser.add_argument('--model', default='./models/deepseek-ocr', help='模型路徑')
     parser.add_argument('--max-pages', type=int, default=100, help='PDF 最大處理頁數')
     parser.add_argument('--json', action='store_true', help='以 JSON 格式輸出結果')
+    parser.add_argument('--shard', type=parse_shard, help='只處理第 i 個分片，格式 i/N（多台機器分工）')
     
     args = parser.parse_args()
     
@@ -218,6 +220,16 @@ def main():
             print(f"錯誤: 在 {input_path} 中找不到圖片檔案")
             sys.exit(1)
         
+        if args.shard:
+            total_files = len(image_files)
+            image_files = select_shard(image_files, *args.shard,
+                                       key=lambda p: shard_key(p, input_path))
+            if not args.json:
+                print(f"\n分片 {args.shard[0]}/{args.shard[1]}: {len(image_files)}/{total_files} 張圖片")
+            if not image_files:
+                print("此分片沒有圖片")
+                sys.exit(0)
+        
         if not args.json:
             print(f"\n找到 {len(image_files)} 張圖片")
         
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+全域視圖張量轉換微基準
+比較 ImageOps.pad + ToTensor + Normalize + .to(bfloat16) 與 pad_to_tensor
+"""
+
+import sys
+import os
+import time
+import argparse
+
+if os.name == 'nt':
+    import codecs
+    sys.stdout = codecs.getwriter('utf-8')(sys.stdout.buffer, 'strict')
+    sys.stderr = codecs.getwriter('utf-8')(sys.stderr.buffer, 'strict')
+
+sys.path.insert(0, '.')
+
+import numpy as np
+import torch
+from PIL import Image, ImageOps
+from torchvision import transforms
+
+from src.image_processor import ImageProcessor, pad_to_tensor, pad_batch_to_tensor
+
+
+def baseline_transform(image: Image.Image, size: int) -> torch.Tensor:
+    """模型原本的全域視圖轉換流程"""
+    transform = transforms.Compose([
+        transforms.ToTensor(),
+        transforms.Normalize(ImageProcessor.MODEL_MEAN, ImageProcessor.MODEL_STD)
+    ])
+    global_view = ImageOps.pad(image, (size, size),
+                               color=tuple(int(x * 255) for x in ImageProcessor.MODEL_MEAN))
+    return transform(global_view).to(torch.bfloat16)
+
+
+def time_it(func, repeat: int) -> float:
+    """回傳平均執行時間（毫秒）"""
+    func()  # 預熱
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description='全域視圖張量轉換微基準')
+    parser.add_argument('--size', type=int, default=1024, help='目標邊長 (base_size)')
+    parser.add_argument('--repeat', type=int, default=20, help='重複次數')
+    parser.add_argument('--batch', type=int, default=4, help='批次大小')
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    page_sizes = [(1700, 2200), (2480, 3508), (1024, 1024), (800, 600)]
+
+    print("=" * 60)
+    print(f"全域視圖張量轉換微基準 (size={args.size}, repeat={args.repeat})")
+    print("=" * 60)
+    print(f"{'圖片尺寸':<14}{'原始 (ms)':>12}{'fused (ms)':>12}{'加速':>8}{'最大誤差':>10}")
+
+    for width, height in page_sizes:
+        image = Image.fromarray(rng.integers(0, 256, (height, width, 3), dtype=np.uint8))
+        out = torch.empty((3, args.size, args.size), dtype=torch.bfloat16)
+
+        base_ms = time_it(lambda: baseline_transform(image, args.size), args.repeat)
+        fused_ms = time_it(lambda: pad_to_tensor(image, args.size, out=out), args.repeat)
+
+        diff = (baseline_transform(image, args.size).float()
+                - pad_to_tensor(image, args.size).float()).abs().max().item()
+
+        print(f"{f'{width}x{height}':<14}{base_ms:>12.2f}{fused_ms:>12.2f}"
+              f"{base_ms / fused_ms:>7.2f}x{diff:>10.4f}")
+
+    # 批次路徑
+    images = [
+        Image.fromarray(rng.integers(0, 256, (2200, 1700, 3), dtype=np.uint8))
+        for _ in range(args.batch)
+    ]
+    out = torch.empty((args.batch, 3, args.size, args.size), dtype=torch.bfloat16)
+
+    base_ms = time_it(
+        lambda: torch.stack([baseline_transform(img, args.size) for img in images]),
+        args.repeat
+    )
+    fused_ms = time_it(lambda: pad_batch_to_tensor(images, args.size, out=out), args.repeat)
+
+    print()
+    print(f"批次 {args.batch} 張 (1700x2200): 原始 {base_ms:.2f} ms, "
+          f"fused {fused_ms:.2f} ms, 加速 {base_ms / fused_ms:.2f}x")
+    print("=" * 60)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+匯入時間基準
+在全新的 Python 行程中逐一匯入模組，量測匯入時間並檢查是否載入了 torch / transformers；
+輕量模組（GUI、CLI、佇列、設定）超過時間上限或載入了重量級套件時以非零結束碼結束
+"""
+
+import sys
+import os
+import json
+import argparse
+import statistics
+import subprocess
+from pathlib import Path
+
+if os.name == 'nt':
+    import codecs
+    sys.stdout = codecs.getwriter('utf-8')(sys.stdout.buffer, 'strict')
+    sys.stderr = codecs.getwriter('utf-8')(sys.stderr.buffer, 'strict')
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+# 不應載入重量級套件的模組
+LIGHT_MODULES = [
+    'src',
+    'src.config_loader',
+    'src.job_manifest',
+    'src.job_queue',
+    'src.result_store',
+    'src.sharding',
+    'src.cli',
+    'src.gui',
+]
+
+# 對照用：需要 torch 的模組
+HEAVY_MODULES = [
+    'src.ocr_engine',
+]
+
+# 匯入後檢查是否已載入的重量級套件
+HEAVY_PACKAGES = ['torch', 'transformers', 'pdf2image']
+
+MEASURE_CODE = """
+import sys, time, json
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{'seconds': elapsed, 'loaded': [name for name in {packages!r} if name in sys.modules]}}))
+"""
+
+
+def measure(module, repeat):
+    """在全新行程中匯入模組 repeat 次，回傳 (秒數中位數, 載入的重量級套件, 錯誤訊息)"""
+    timings = []
+    loaded = []
+    for _ in range(repeat):
+        process = subprocess.run(
+            [sys.executable, '-c', MEASURE_CODE.format(module=module, packages=HEAVY_PACKAGES)],
+            cwd=PROJECT_ROOT,
+            capture_output=True,
+            text=True
+        )
+        if process.returncode != 0:
+            lines = process.stderr.strip().splitlines()
+            return None, [], lines[-1] if lines else f"結束碼 {process.returncode}"
+        data = json.loads(process.stdout.strip().splitlines()[-1])
+        timings.append(data['seconds'])
+        loaded = data['loaded']
+    return statistics.median(timings), loaded, None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='匯入時間基準')
+    parser.add_argument('modules', nargs='*', help='要量測的模組（預設為內建清單）')
+    parser.add_argument('--repeat', type=int, default=3, help='每個模組量測次數（取中位數）')
+    parser.add_argument('--max-seconds', type=float, default=1.0, help='輕量模組的匯入時間上限')
+    parser.add_argument('--skip-heavy', action='store_true', help='不量測對照用的重量級模組')
+    args = parser.parse_args()
+    
+    if args.modules:
+        modules = [(name, name in LIGHT_MODULES) for name in args.modules]
+    else:
+        modules = [(name, True) for name in LIGHT_MODULES]
+        if not args.skip_heavy:
+            modules += [(name, False) for name in HEAVY_MODULES]
+    
+    print("=" * 72)
+    print(f"匯入時間基準（每個模組 {args.repeat} 次，取中位數；輕量模組上限 {args.max_seconds:.2f}s）")
+    print("=" * 72)
+    print(f"{'模組':<24}{'秒數':>10}  {'重量級套件':<28}結果")
+    
+    failures = 0
+    for module, light in modules:
+        seconds, loaded, error = measure(module, args.repeat)
+        if error is not None:
+            print(f"{module:<24}{'-':>10}  {'-':<28}無法匯入: {error}")
+            continue
+        
+        status = "OK"
+        if light and loaded:
+            status = "失敗：載入了重量級套件"
+            failures += 1
+        elif light and seconds > args.max_seconds:
+            status = "失敗：超過時間上限"
+            failures += 1
+        elif not light:
+            status = "對照"
+        print(f"{module:<24}{seconds:>10.3f}  {', '.join(loaded) or '-':<28}{status}")
+    
+    print("=" * 72)
+    if failures:
+        print(f"{failures} 個模組未通過")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+PDF 平行轉換基準測試
+量測不同 pdftoppm 行程數下的轉換速度（頁/秒）
+"""
+
+import sys
+import os
+import time
+import argparse
+
+if os.name == 'nt':
+    import codecs
+    sys.stdout = codecs.getwriter('utf-8')(sys.stdout.buffer, 'strict')
+    sys.stderr = codecs.getwriter('utf-8')(sys.stderr.buffer, 'strict')
+
+sys.path.insert(0, '.')
+
+from src.pdf_converter import PDFConverter
+
+
+def main():
+    parser = argparse.ArgumentParser(description='PDF 平行轉換基準測試')
+    parser.add_argument('pdf', help='PDF 檔案路徑')
+    parser.add_argument('--dpi', type=int, default=200, help='轉換 DPI')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8, 16],
+                        help='要測試的行程數')
+    parser.add_argument('--chunk-size', type=int, default=8, help='每段頁數')
+    parser.add_argument('--max-pages', type=int, default=None, help='最大頁數')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print(f"PDF 平行轉換基準測試: {args.pdf}")
+    print(f"DPI: {args.dpi}, 每段頁數: {args.chunk_size}, CPU 核心: {os.cpu_count()}")
+    print("=" * 60)
+    print(f"{'行程數':<8}{'頁數':>8}{'時間 (s)':>12}{'頁/秒':>10}{'加速':>8}")
+
+    baseline = None
+    for workers in args.workers:
+        converter = PDFConverter(dpi=args.dpi, max_pages=args.max_pages, workers=workers)
+
+        start = time.perf_counter()
+        pages = 0
+        for _, image in converter.iter_pages(args.pdf, chunk_size=args.chunk_size):
+            pages += 1
+            image.close()
+        elapsed = time.perf_counter() - start
+
+        rate = pages / elapsed if elapsed > 0 else 0.0
+        baseline = baseline or rate
+        print(f"{workers:<8}{pages:>8}{elapsed:>12.2f}{rate:>10.2f}{rate / baseline:>7.2f}x")
+
+    print("=" * 60)
+
+
+if __name__ == '__main__':
+    main()
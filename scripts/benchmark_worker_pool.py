@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+CPU 工作池擴充性基準
+比較不同工作行程數的每小時頁數，以及各行程的 RSS / PSS / USS
+"""
+
+import sys
+import os
+import time
+import argparse
+from itertools import cycle, islice
+from pathlib import Path
+
+if os.name == 'nt':
+    import codecs
+    sys.stdout = codecs.getwriter('utf-8')(sys.stdout.buffer, 'strict')
+    sys.stderr = codecs.getwriter('utf-8')(sys.stderr.buffer, 'strict')
+
+sys.path.insert(0, '.')
+
+from src.worker_pool import OCRWorkerPool, physical_cpu_count
+
+
+def collect_images(inputs):
+    """展開輸入的圖片檔與資料夾"""
+    extensions = {'.png', '.jpg', '.jpeg', '.bmp', '.tiff', '.tif', '.webp'}
+    images = []
+    for item in inputs:
+        path = Path(item)
+        if path.is_dir():
+            images.extend(sorted(p for p in path.iterdir() if p.suffix.lower() in extensions))
+        elif path.exists():
+            images.append(path)
+    return images
+
+
+def format_mb(value):
+    return f"{value:.0f}" if value is not None else "-"
+
+
+def main():
+    parser = argparse.ArgumentParser(description='CPU 工作池擴充性基準')
+    parser.add_argument('inputs', nargs='+', help='圖片檔或資料夾')
+    parser.add_argument('--model', default='./models/deepseek-ocr', help='模型路徑')
+    parser.add_argument('--workers', default='1,2,4', help='要測試的工作行程數，以逗號分隔')
+    parser.add_argument('--pages', type=int, default=16, help='每輪處理的頁數（不足時重複輸入）')
+    parser.add_argument('--crop', action='store_true', help='啟用裁切模式')
+    args = parser.parse_args()
+    
+    images = collect_images(args.inputs)
+    if not images:
+        print("錯誤: 找不到圖片")
+        sys.exit(1)
+    
+    pages = [str(p) for p in islice(cycle(images), args.pages)]
+    worker_counts = [int(n) for n in args.workers.split(',') if n.strip()]
+    
+    print("=" * 72)
+    print(f"CPU 工作池擴充性基準（實體核心 {physical_cpu_count()}，每輪 {len(pages)} 頁）")
+    print("=" * 72)
+    
+    rows = []
+    for num_workers in worker_counts:
+        pool = OCRWorkerPool(num_workers, model_path=args.model)
+        start = time.perf_counter()
+        pool.start()
+        load_seconds = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        results = pool.process_images(pages, crop_mode=args.crop, save_results=True)
+        elapsed = time.perf_counter() - start
+        
+        memory = pool.worker_memory()
+        pool.close()
+        
+        failed = sum(1 for r in results if not r.success)
+        rows.append((num_workers, pool.threads_per_worker, load_seconds, elapsed,
+                     len(pages) / elapsed * 3600, failed, memory))
+        
+        print(f"\n{num_workers} 個行程 × {pool.threads_per_worker} 執行緒: "
+              f"載入 {load_seconds:.1f}s，處理 {elapsed:.1f}s，失敗 {failed} 頁")
+        for stats in memory:
+            print(f"  PID {stats['pid']}: RSS {format_mb(stats['rss_mb'])} MB, "
+                  f"PSS {format_mb(stats['pss_mb'])} MB, USS {format_mb(stats['uss_mb'])} MB")
+    
+    baseline = rows[0][4] if rows else 0
+    print()
+    print(f"{'行程數':<8}{'執行緒':>8}{'頁/小時':>12}{'加速':>8}{'平均 RSS':>12}{'平均 USS':>12}")
+    for num_workers, threads, _, _, pages_per_hour, _, memory in rows:
+        avg_rss = sum(m['rss_mb'] for m in memory) / len(memory) if memory else None
+        uss_values = [m['uss_mb'] for m in memory if m['uss_mb'] is not None]
+        avg_uss = sum(uss_values) / len(uss_values) if uss_values else None
+        print(f"{num_workers:<8}{threads:>8}{pages_per_hour:>12.0f}{pages_per_hour / baseline:>7.2f}x"
+              f"{format_mb(avg_rss):>12}{format_mb(avg_uss):>12}")
+    print("=" * 72)
+
+
+if __name__ == '__main__':
+    main()
@@ -37,12 +37,29 @@ def setup_local_poppler():
             logger.info(f"已設定本地 Poppler 路徑: {poppler_path_str}")
 
 
+def preload_inference_modules():
+    """在背景執行緒預先匯入 torch / transformers，與視窗建立同時進行"""
+    import threading
+    import importlib
+    
+    def worker():
+        try:
+            importlib.import_module("src.ocr_engine")
+        except Exception as e:
+            logger.warning(f"預先匯入推理模組失敗: {e}")
+    
+    threading.Thread(target=worker, daemon=True).start()
+
+
 def main():
     """主函數"""
     try:
         # 設定本地 Poppler（如果存在）
         setup_local_poppler()
         
+        # 推理模組匯入需要數秒，不等它完成就先顯示視窗
+        preload_inference_modules()
+        
         logger.info("啟動 DeepSeek-OCR GUI 應用程式")
         
         # 建立並執行主視窗
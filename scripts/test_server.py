@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+OCR HTTP 服務測試用戶端
+上傳圖片 / PDF，串流工作狀態並取得結果
+
+使用前先啟動服務: python -m src.server
+"""
+
+import sys
+import os
+import json
+import argparse
+import urllib.request
+import urllib.error
+from pathlib import Path
+from urllib.parse import urlencode, quote
+
+# 設定 Windows 終端機編碼
+if os.name == 'nt':
+    import codecs
+    sys.stdout = codecs.getwriter('utf-8')(sys.stdout.buffer, 'strict')
+    sys.stderr = codecs.getwriter('utf-8')(sys.stderr.buffer, 'strict')
+
+
+def request_json(url: str, data: bytes = None, method: str = 'GET'):
+    """送出請求並解析 JSON 回應"""
+    request = urllib.request.Request(url, data=data, method=method)
+    with urllib.request.urlopen(request) as response:
+        return json.loads(response.read().decode('utf-8'))
+
+
+def stream_events(url: str):
+    """讀取 Server-Sent Events，逐筆產出狀態"""
+    with urllib.request.urlopen(url) as response:
+        for raw_line in response:
+            line = raw_line.decode('utf-8').rstrip('\n')
+            if line.startswith('data: '):
+                yield json.loads(line[len('data: '):])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='OCR HTTP 服務測試用戶端')
+    parser.add_argument('file', nargs='?', help='要辨識的圖片或 PDF')
+    parser.add_argument('--url', default='http://127.0.0.1:8000', help='服務位址')
+    parser.add_argument('--crop', action='store_true', help='啟用裁切模式')
+    parser.add_argument('--markdown', action='store_true', help='以 Markdown 輸出結果')
+    parser.add_argument('--health', action='store_true', help='只查詢服務狀態與統計')
+    args = parser.parse_args()
+    
+    base_url = args.url.rstrip('/')
+    
+    try:
+        if args.health or not args.file:
+            print(json.dumps(request_json(f"{base_url}/health"), ensure_ascii=False, indent=2))
+            print(json.dumps(request_json(f"{base_url}/metrics"), ensure_ascii=False, indent=2))
+            return
+        
+        file_path = Path(args.file)
+        if not file_path.exists():
+            print(f"錯誤: 檔案不存在: {file_path}")
+            sys.exit(1)
+        
+        query = {'filename': file_path.name}
+        if args.crop:
+            query['crop_mode'] = 'true'
+        
+        job = request_json(
+            f"{base_url}/jobs?{urlencode(query, quote_via=quote)}",
+            data=file_path.read_bytes(),
+            method='POST'
+        )
+        print(f"工作已提交: {job['job_id']}")
+        
+        for status in stream_events(f"{base_url}/jobs/{job['job_id']}/events"):
+            print(f"  {status['status']}: {status['pages_done']}/{status['pages_total']} 頁")
+        
+        if args.markdown:
+            with urllib.request.urlopen(
+                    f"{base_url}/jobs/{job['job_id']}/result?format=markdown") as response:
+                print(response.read().decode('utf-8'))
+        else:
+            result = request_json(f"{base_url}/jobs/{job['job_id']}/result")
+            print(json.dumps(result, ensure_ascii=False, indent=2))
+    
+    except urllib.error.HTTPError as e:
+        print(f"錯誤: HTTP {e.code}: {e.read().decode('utf-8', 'ignore')}")
+        sys.exit(1)
+    except urllib.error.URLError as e:
+        print(f"錯誤: 無法連線到服務 ({e.reason})，請先執行 python -m src.server")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
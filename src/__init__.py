@@ -1,26 +1,50 @@
 """
 DeepSeek-OCR 核心模組
+
+公開名稱在第一次存取時才匯入對應的子模組（PEP 562），
+import src 或只用到輕量子模組（設定、佇列、結果儲存）時不會載入 torch / transformers / pdf2image
 """
 
-from .image_processor import ImageProcessor, load_image, get_image_info
-from .ocr_engine import OCREngine, OCRResult, process_image
-from .performance_tracker import PerformanceTracker, PerformanceMetrics, get_tracker
-from .memory_manager import MemoryManager, get_memory_manager
-from .pdf_converter import PDFConverter, convert_pdf_to_images, get_pdf_info
-
-__all__ = [
-    'ImageProcessor',
-    'load_image',
-    'get_image_info',
-    'OCREngine',
-    'OCRResult',
-    'process_image',
-    'PerformanceTracker',
-    'PerformanceMetrics',
-    'get_tracker',
-    'MemoryManager',
-    'get_memory_manager',
-    'PDFConverter',
-    'convert_pdf_to_images',
-    'get_pdf_info',
-]
+import importlib
+from typing import TYPE_CHECKING
+
+# 公開名稱 -> 定義所在的子模組
+_LAZY_ATTRIBUTES = {
+    'ImageProcessor': '.image_processor',
+    'load_image': '.image_processor',
+    'get_image_info': '.image_processor',
+    'OCREngine': '.ocr_engine',
+    'OCRResult': '.ocr_engine',
+    'process_image': '.ocr_engine',
+    'PerformanceTracker': '.performance_tracker',
+    'PerformanceMetrics': '.performance_tracker',
+    'get_tracker': '.performance_tracker',
+    'MemoryManager': '.memory_manager',
+    'get_memory_manager': '.memory_manager',
+    'PDFConverter': '.pdf_converter',
+    'convert_pdf_to_images': '.pdf_converter',
+    'get_pdf_info': '.pdf_converter',
+}
+
+__all__ = list(_LAZY_ATTRIBUTES)
+
+if TYPE_CHECKING:
+    from .image_processor import ImageProcessor, load_image, get_image_info
+    from .ocr_engine import OCREngine, OCRResult, process_image
+    from .performance_tracker import PerformanceTracker, PerformanceMetrics, get_tracker
+    from .memory_manager import MemoryManager, get_memory_manager
+    from .pdf_converter import PDFConverter, convert_pdf_to_images, get_pdf_info
+
+
+def __getattr__(name):
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    # 快取在模組中，之後的存取不再經過 __getattr__
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
@@ -0,0 +1,409 @@
+"""
+記憶體感知的准入控制模組
+在請求送入模型之前，依影像 token 數與裁切格數估計所需記憶體，
+對照 MemoryManager 的即時讀數（GPU 為 VRAM，CPU 為系統可用記憶體）決定：
+直接准入、延後（清理快取並等待記憶體釋放）、降級（關閉裁切模式或縮小尺寸）或拒絕，
+避免等到 OOM 之後才清理快取重試
+"""
+
+import math
+import time
+import threading
+from dataclasses import dataclass, asdict
+from typing import Optional, Tuple, Dict, Any, List, Union
+import logging
+
+from .memory_manager import MemoryManager, get_memory_manager
+from .crop_grid import CROP_TILE_SIZE, crop_grid
+
+logger = logging.getLogger(__name__)
+
+ACTION_ADMIT = 'admit'
+ACTION_DOWNGRADE = 'downgrade'
+ACTION_REJECT = 'reject'
+
+# 影像 token：patch 16 像素，再以 4 倍降採樣（對應模型 infer 的 num_queries 計算）
+PATCH_SIZE = 16
+DOWNSAMPLE_RATIO = 4
+
+# 生成上限（模型 infer 的 max_new_tokens）與提示詞 token 的保守估計
+MAX_NEW_TOKENS = 8192
+PROMPT_TOKENS = 64
+
+# 語言模型（config.json 的 language_config）：12 層 × 10 個 KV head × head_dim 128，K 與 V 各一份
+KV_ELEMENTS_PER_TOKEN = 2 * 12 * 10 * 128
+ATTENTION_HEADS = 10
+VOCAB_SIZE = 129280
+
+# 視覺編碼器（SAM + CLIP）每個輸入像素的峰值啟動記憶體（位元組），實際值會以觀測結果校正
+VISION_BYTES_PER_PIXEL = 256
+
+# 降級順序：先關閉裁切模式，再依序縮小為以下尺寸（Large → Base → Small → Tiny）
+DOWNGRADE_SIZES = (1280, 1024, 640, 512)
+
+# 校正係數的範圍與下修速度（上修立即生效，避免低估造成 OOM）
+MIN_SCALE = 0.25
+MAX_SCALE = 4.0
+SCALE_DECAY = 0.2
+
+GB = 1024 ** 3
+
+
+def _num_queries(size: int) -> int:
+    """單一視圖每邊的影像 token 數"""
+    return math.ceil((size // PATCH_SIZE) / DOWNSAMPLE_RATIO)
+
+
+def count_image_tokens(
+    dimensions: Tuple[int, int],
+    base_size: int,
+    image_size: int,
+    crop_mode: bool
+) -> Tuple[int, int, int]:
+    """
+    計算模型為一張圖片產生的影像 token 數
+    
+    Args:
+        dimensions: 圖片尺寸 (width, height)
+        base_size: 基礎尺寸
+        image_size: 圖片尺寸
+        crop_mode: 是否使用裁切模式
+    
+    Returns:
+        (影像 token 數, 切片數, 視覺編碼器處理的總像素數)
+    """
+    width, height = dimensions
+    
+    if not crop_mode:
+        queries = _num_queries(image_size)
+        return (queries + 1) * queries + 1, 0, image_size * image_size
+    
+    # 全域視圖（base_size × base_size）
+    queries_base = _num_queries(base_size)
+    tokens = (queries_base + 1) * queries_base + 1
+    pixels = base_size * base_size
+    tiles = 0
+    
+    # 任一邊超過 640 時切成 640 × 640 的切片
+    if width > CROP_TILE_SIZE or height > CROP_TILE_SIZE:
+        columns, rows = crop_grid(width, height)
+        if columns > 1 or rows > 1:
+            queries = _num_queries(image_size)
+            tokens += (queries * columns + 1) * (queries * rows)
+            tiles = columns * rows
+            pixels += tiles * CROP_TILE_SIZE * CROP_TILE_SIZE
+    
+    return tokens, tiles, pixels
+
+
+@dataclass
+class MemoryEstimate:
+    """單一請求的記憶體估計"""
+    image_tokens: int           # 影像 token 數
+    tiles: int                  # 裁切模式的切片數
+    sequence_tokens: int        # 提示詞 + 影像 + 生成上限
+    kv_cache_gb: float          # KV 快取
+    prefill_gb: float           # 預填階段的 logits 與注意力分數
+    vision_gb: float            # 視覺編碼器啟動記憶體
+    raw_gb: float               # 未校正的合計
+    total_gb: float             # 乘上校正係數後的合計
+
+
+@dataclass
+class AdmissionDecision:
+    """准入決策"""
+    action: str                     # admit / downgrade / reject
+    base_size: int                  # 實際使用的設定
+    image_size: int
+    crop_mode: bool
+    estimate: MemoryEstimate
+    available_gb: float             # 決策時的可用記憶體（已扣除安全餘量）
+    waited: float = 0.0             # 延後等待的秒數
+    reason: str = ""
+    
+    @property
+    def admitted(self) -> bool:
+        """是否可以送入模型（准入或降級）"""
+        return self.action != ACTION_REJECT
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """轉為可序列化的字典"""
+        data = asdict(self)
+        data['estimate'] = {
+            key: round(value, 3) if isinstance(value, float) else value
+            for key, value in data['estimate'].items()
+        }
+        data['available_gb'] = round(self.available_gb, 3)
+        data['waited'] = round(self.waited, 3)
+        return data
+
+
+class AdmissionController:
+    """依記憶體估計決定請求是否送入模型"""
+    
+    def __init__(
+        self,
+        memory_manager: Optional[MemoryManager] = None,
+        headroom_gb: float = 0.5,
+        max_defer_seconds: float = 30.0,
+        poll_interval: float = 1.0,
+        allow_downgrade: bool = True,
+        enabled: bool = True,
+        device: Union[str, int] = 'cuda',
+        dtype_bytes: int = 2,
+        max_new_tokens: int = MAX_NEW_TOKENS
+    ):
+        """
+        初始化准入控制器
+        
+        Args:
+            memory_manager: 記憶體管理器，None 使用全域實例
+            headroom_gb: 保留的安全餘量（GB）
+            max_defer_seconds: 記憶體暫時不足時最多等待的秒數
+            poll_interval: 延後期間重新讀取記憶體的間隔（秒）
+            allow_downgrade: 記憶體不足時是否降級設定（否則直接拒絕）
+            enabled: 停用時一律准入
+            device: 模型所在的裝置（'cuda'、'cuda:N'、GPU 編號或 'cpu'），CPU 以系統可用記憶體判斷
+            dtype_bytes: 模型資料類型的位元組數（bfloat16 為 2）
+            max_new_tokens: 生成 token 上限
+        """
+        self.memory_manager = memory_manager or get_memory_manager()
+        self.headroom_gb = headroom_gb
+        self.max_defer_seconds = max_defer_seconds
+        self.poll_interval = poll_interval
+        self.allow_downgrade = allow_downgrade
+        self.enabled = enabled
+        self.device = device
+        self.dtype_bytes = dtype_bytes
+        self.max_new_tokens = max_new_tokens
+        
+        self._lock = threading.Lock()
+        self._scale = 1.0
+        # 曾觀察到的最大可用量：估計值不超過它時，不足才可能是暫時的，值得等待
+        self._peak_available = 0.0
+        self._counts = {ACTION_ADMIT: 0, ACTION_DOWNGRADE: 0, ACTION_REJECT: 0}
+        self._deferred = 0
+        self._defer_seconds = 0.0
+    
+    @classmethod
+    def from_config(
+        cls,
+        memory_manager: Optional[MemoryManager] = None,
+        device: Union[str, int] = 'cuda'
+    ) -> 'AdmissionController':
+        """
+        依 system_config.json 的 admission 區段建立控制器
+        
+        Args:
+            memory_manager: 記憶體管理器，None 使用全域實例
+            device: 模型所在的裝置
+        
+        Returns:
+            AdmissionController 實例
+        """
+        from src.config_loader import get_config
+        
+        config = get_config()
+        return cls(
+            memory_manager=memory_manager,
+            headroom_gb=config.get('admission.headroom_gb', 0.5),
+            max_defer_seconds=config.get('admission.max_defer_seconds', 30.0),
+            allow_downgrade=config.get('admission.allow_downgrade', True),
+            enabled=config.get('admission.enabled', True),
+            device=device
+        )
+    
+    def estimate(
+        self,
+        dimensions: Tuple[int, int],
+        base_size: int,
+        image_size: int,
+        crop_mode: bool
+    ) -> MemoryEstimate:
+        """
+        估計單一請求的推理記憶體（不含已載入的模型權重）
+        
+        Args:
+            dimensions: 圖片尺寸 (width, height)
+            base_size: 基礎尺寸
+            image_size: 圖片尺寸
+            crop_mode: 是否使用裁切模式
+        
+        Returns:
+            MemoryEstimate 物件
+        """
+        image_tokens, tiles, pixels = count_image_tokens(dimensions, base_size, image_size, crop_mode)
+        prefill_tokens = image_tokens + PROMPT_TOKENS
+        sequence_tokens = prefill_tokens + self.max_new_tokens
+        
+        kv_cache = sequence_tokens * KV_ELEMENTS_PER_TOKEN * self.dtype_bytes
+        # 預填時整段序列的 logits（float32）與單層注意力分數
+        prefill = prefill_tokens * VOCAB_SIZE * 4 + prefill_tokens ** 2 * ATTENTION_HEADS * 4
+        vision = pixels * VISION_BYTES_PER_PIXEL
+        
+        raw_gb = (kv_cache + prefill + vision) / GB
+        with self._lock:
+            scale = self._scale
+        return MemoryEstimate(
+            image_tokens=image_tokens,
+            tiles=tiles,
+            sequence_tokens=sequence_tokens,
+            kv_cache_gb=kv_cache / GB,
+            prefill_gb=prefill / GB,
+            vision_gb=vision / GB,
+            raw_gb=raw_gb,
+            total_gb=raw_gb * scale
+        )
+    
+    @property
+    def memory_device(self) -> Union[str, int]:
+        """MemoryManager 讀數使用的裝置：'cpu' 或 GPU 編號"""
+        if isinstance(self.device, int):
+            return self.device
+        device_type, _, index = str(self.device).partition(':')
+        if device_type == 'cpu':
+            return 'cpu'
+        return int(index) if index else 0
+    
+    def available(self) -> float:
+        """目前可供推理使用的記憶體（GB，已扣除安全餘量）"""
+        free_gb, _ = self.memory_manager.get_available_memory(self.memory_device)
+        with self._lock:
+            self._peak_available = max(self._peak_available, free_gb)
+        return max(0.0, free_gb - self.headroom_gb)
+    
+    def _downgrades(self, base_size: int, image_size: int, crop_mode: bool) -> List[Tuple[int, int, bool]]:
+        """依品質由高到低列出可降級的設定"""
+        candidates = []
+        current = image_size
+        if crop_mode:
+            # 關閉裁切模式，只保留全域視圖
+            current = base_size
+            candidates.append((base_size, base_size, False))
+        for size in DOWNGRADE_SIZES:
+            if size < current:
+                candidates.append((size, size, False))
+        return candidates
+    
+    def admit(
+        self,
+        dimensions: Tuple[int, int],
+        base_size: int,
+        image_size: int,
+        crop_mode: bool
+    ) -> AdmissionDecision:
+        """
+        決定請求的處理方式
+        
+        記憶體足夠時直接准入；不足時先清理快取，若估計值未超過曾經出現的可用量
+        （代表其他工作佔用的記憶體可能釋放）則延後等待，仍不足時改用記憶體足夠的較低設定，
+        連最低設定都放不下時拒絕。
+        
+        Args:
+            dimensions: 圖片尺寸 (width, height)
+            base_size: 基礎尺寸
+            image_size: 圖片尺寸
+            crop_mode: 是否使用裁切模式
+        
+        Returns:
+            AdmissionDecision 物件
+        """
+        estimate = self.estimate(dimensions, base_size, image_size, crop_mode)
+        if not self.enabled:
+            return AdmissionDecision(ACTION_ADMIT, base_size, image_size, crop_mode, estimate, 0.0)
+        
+        available = self.available()
+        waited = 0.0
+        
+        if estimate.total_gb > available and self.memory_device != 'cpu':
+            self.memory_manager.clear_cache(self.memory_device)
+            available = self.available()
+        
+        if estimate.total_gb > available and estimate.total_gb <= self._peak_available - self.headroom_gb:
+            logger.info(
+                f"記憶體暫時不足（需要 {estimate.total_gb:.2f} GB，可用 {available:.2f} GB），"
+                f"延後最多 {self.max_defer_seconds:.0f} 秒"
+            )
+            started = time.perf_counter()
+            deadline = started + self.max_defer_seconds
+            while estimate.total_gb > available and time.perf_counter() < deadline:
+                time.sleep(self.poll_interval)
+                available = self.available()
+            waited = time.perf_counter() - started
+            with self._lock:
+                self._deferred += 1
+                self._defer_seconds += waited
+        
+        if estimate.total_gb <= available:
+            decision = AdmissionDecision(
+                ACTION_ADMIT, base_size, image_size, crop_mode, estimate, available, waited
+            )
+        else:
+            decision = None
+            if self.allow_downgrade:
+                for candidate in self._downgrades(base_size, image_size, crop_mode):
+                    candidate_estimate = self.estimate(dimensions, *candidate)
+                    if candidate_estimate.total_gb <= available:
+                        decision = AdmissionDecision(
+                            ACTION_DOWNGRADE, *candidate, candidate_estimate, available, waited,
+                            reason=(
+                                f"需要 {estimate.total_gb:.2f} GB，可用 {available:.2f} GB，"
+                                f"降級為 base_size={candidate[0]}, image_size={candidate[1]}, "
+                                f"crop_mode={candidate[2]}"
+                            )
+                        )
+                        break
+            if decision is None:
+                decision = AdmissionDecision(
+                    ACTION_REJECT, base_size, image_size, crop_mode, estimate, available, waited,
+                    reason=f"記憶體不足：需要 {estimate.total_gb:.2f} GB，可用 {available:.2f} GB"
+                )
+        
+        with self._lock:
+            self._counts[decision.action] += 1
+        
+        if decision.action == ACTION_DOWNGRADE:
+            logger.warning(f"准入降級: {decision.reason}")
+        elif decision.action == ACTION_REJECT:
+            logger.error(f"准入拒絕: {decision.reason}")
+        else:
+            logger.debug(f"准入: 需要 {estimate.total_gb:.2f} GB，可用 {available:.2f} GB")
+        return decision
+    
+    def observe(self, estimate: MemoryEstimate, peak_gb: float):
+        """
+        以實際峰值校正估計係數
+        
+        實際值高於估計時立即上修，低於估計時緩慢下修。
+        
+        Args:
+            estimate: 該請求的估計
+            peak_gb: 推理期間實際增加的峰值記憶體（GB）
+        """
+        if estimate.raw_gb <= 0 or peak_gb <= 0:
+            return
+        ratio = min(MAX_SCALE, max(MIN_SCALE, peak_gb / estimate.raw_gb))
+        with self._lock:
+            if ratio > self._scale:
+                self._scale = ratio
+            else:
+                self._scale += (ratio - self._scale) * SCALE_DECAY
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        取得准入統計
+        
+        Returns:
+            {admitted, downgraded, rejected, deferred, defer_seconds, scale, peak_available_gb}
+        """
+        with self._lock:
+            return {
+                'enabled': self.enabled,
+                'admitted': self._counts[ACTION_ADMIT],
+                'downgraded': self._counts[ACTION_DOWNGRADE],
+                'rejected': self._counts[ACTION_REJECT],
+                'deferred': self._deferred,
+                'defer_seconds': round(self._defer_seconds, 3),
+                'scale': round(self._scale, 3),
+                'peak_available_gb': round(self._peak_available, 3)
+            }
@@ -0,0 +1,607 @@
+"""
+DeepSeek-OCR 命令列工具
+適合排程（cron / 工作排程器）的批次 OCR：遞迴輸入或清單檔、預先解碼、JSONL 輸出、
+續傳、--limit / --shard，並即時顯示頁/分與 tokens/s
+
+用法:
+    python -m src.cli ocr <檔案或資料夾>... [-o outputs/cli/results.jsonl]
+    python -m src.cli ocr --manifest inputs.txt --shard 0/4 --limit 1000
+    python -m src.cli merge shard0.jsonl shard1.jsonl ... -o merged.jsonl [--manifest inputs.txt]
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, Future
+from datetime import datetime
+from pathlib import Path
+from typing import Optional, List, Dict, Tuple, Iterator, Any
+import logging
+
+from src.sharding import parse_shard, shard_key, select_shard, merge_results
+
+logger = logging.getLogger(__name__)
+
+# 支援的輸入類型（與 ImageProcessor.SUPPORTED_FORMATS 相同，另加 .tif 與 PDF）
+IMAGE_EXTENSIONS = {'.png', '.jpg', '.jpeg', '.bmp', '.tiff', '.tif', '.webp'}
+INPUT_EXTENSIONS = IMAGE_EXTENSIONS | {'.pdf'}
+
+
+def collect_inputs(
+    inputs: List[str],
+    manifest: Optional[str] = None,
+    recursive: bool = True
+) -> List[Tuple[Path, str]]:
+    """
+    展開輸入檔案
+    
+    Args:
+        inputs: 檔案或資料夾
+        manifest: 清單檔（每行一個路徑，# 開頭為註解），相對路徑以清單檔所在目錄為準
+        recursive: 資料夾是否包含子資料夾
+    
+    Returns:
+        去除重複後的 (檔案路徑, 分片鍵) 列表（資料夾內依路徑排序，其餘維持輸入順序）；
+        分片鍵為相對於輸入資料夾或清單檔的路徑，各機器掛載位置不同時仍一致
+    """
+    candidates: List[Tuple[Path, str]] = []
+    
+    if manifest:
+        manifest_path = Path(manifest)
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line or line.startswith('#'):
+                    continue
+                path = Path(line)
+                key = shard_key(path)
+                if not path.is_absolute():
+                    path = manifest_path.parent / path
+                candidates.append((path, key))
+    
+    for item in inputs:
+        path = Path(item)
+        if path.is_dir():
+            walker = path.rglob('*') if recursive else path.iterdir()
+            found = sorted(p for p in walker if p.is_file() and p.suffix.lower() in INPUT_EXTENSIONS)
+            candidates.extend((p, shard_key(p, path)) for p in found)
+        else:
+            candidates.append((path, shard_key(path)))
+    
+    files = []
+    seen = set()
+    for path, input_key in candidates:
+        key = path.resolve()
+        if key in seen:
+            continue
+        seen.add(key)
+        if not path.is_file():
+            logger.warning(f"略過不存在的檔案: {path}")
+            continue
+        if path.suffix.lower() not in INPUT_EXTENSIONS:
+            logger.warning(f"略過不支援的檔案: {path}")
+            continue
+        files.append((path, input_key))
+    return files
+
+
+class ReadAheadDecoder:
+    """
+    以執行緒池預先計算雜湊並解碼後續圖片，讓模型推理時不必等待讀檔與解碼
+    
+    PIL 解碼與 SHA-256 都會釋放 GIL，少數執行緒即可跟上 GPU 的速度；
+    最多預先處理 prefetch 個檔案，限制記憶體中的圖片數量。
+    指定 limit 時，已排入的檔案加上已產出且需處理的檔案不超過 limit，達到上限後不再解碼後續檔案。
+    """
+    
+    def __init__(self, workers: int = 2, prefetch: int = 4):
+        self.workers = max(1, workers)
+        self.prefetch = max(1, prefetch)
+    
+    def iter_decoded(
+        self,
+        files: List[Path],
+        skip: Optional[Any] = None,
+        limit: Optional[int] = None
+    ) -> Iterator[Tuple[Path, Future]]:
+        """
+        依輸入順序產出 (路徑, Future)
+        
+        Future 的結果為 (內容雜湊, 圖片或 None)；PDF 以及 skip(路徑, 雜湊) 為 True 的檔案不解碼。
+        
+        Args:
+            files: 輸入檔案
+            skip: 判斷是否略過解碼的函數（例如續傳時已完成的檔案）
+            limit: 最多產出的需處理檔案數（skip 略過的檔案不計），None 表示不限制
+        """
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="decode") as pool:
+            pending: deque = deque()
+            file_iter = iter(files)
+            used = 0
+            try:
+                while True:
+                    # 尚未確定是否略過的檔案都先算作需處理，避免解碼超過 limit 的檔案
+                    while len(pending) < self.prefetch and (limit is None or used + len(pending) < limit):
+                        path = next(file_iter, None)
+                        if path is None:
+                            break
+                        pending.append((path, pool.submit(_hash_and_decode, path, skip)))
+                    if not pending:
+                        break
+                    path, future = pending.popleft()
+                    if limit is not None:
+                        try:
+                            content_hash, _ = future.result()
+                        except Exception:
+                            used += 1
+                        else:
+                            if skip is None or not skip(path, content_hash):
+                                used += 1
+                    yield path, future
+            finally:
+                for _, future in pending:
+                    future.cancel()
+
+
+def _hash_and_decode(path: Path, skip) -> Tuple[str, Any]:
+    """計算內容雜湊並解碼圖片"""
+    from PIL import Image
+    from src.job_manifest import compute_content_hash
+    
+    content_hash = compute_content_hash(path)
+    if path.suffix.lower() == '.pdf' or (skip is not None and skip(path, content_hash)):
+        return content_hash, None
+    
+    image = Image.open(path)
+    image.load()
+    if image.mode != 'RGB':
+        image = image.convert('RGB')
+    return content_hash, image
+
+
+class RateMeter:
+    """統計並顯示處理速度"""
+    
+    def __init__(self, total: int, stream=None, interval: float = 30.0):
+        """
+        Args:
+            total: 輸入檔案數
+            stream: 輸出位置（預設 stderr）
+            interval: 非終端機輸出時，每隔多少秒印出一行
+        """
+        self.total = total
+        self.stream = stream or sys.stderr
+        self.interval = interval
+        self.is_tty = hasattr(self.stream, 'isatty') and self.stream.isatty()
+        self.start_time = time.time()
+        self.last_print = 0.0
+        self.files_done = 0
+        self.pages = 0
+        self.tokens = 0
+        self.failed = 0
+        self.resumed = 0
+        self.ocr_seconds = 0.0
+    
+    def add_page(self, result=None, failed: bool = False):
+        """記錄一頁（result 為 OCRResult，文字層頁面為 None）"""
+        self.pages += 1
+        if failed:
+            self.failed += 1
+        if result is not None:
+            self.tokens += result.output_tokens
+            self.ocr_seconds += result.processing_time
+    
+    def summary(self) -> Dict[str, Any]:
+        """目前的統計值"""
+        elapsed = max(time.time() - self.start_time, 1e-6)
+        return {
+            'files': self.files_done,
+            'total_files': self.total,
+            'pages': self.pages,
+            'failed': self.failed,
+            'resumed': self.resumed,
+            'elapsed_seconds': round(elapsed, 1),
+            'pages_per_minute': round(self.pages / elapsed * 60, 2),
+            'tokens_per_second': round(self.tokens / self.ocr_seconds, 1) if self.ocr_seconds else 0.0
+        }
+    
+    def render(self, force: bool = False):
+        """顯示進度（終端機以單行更新）"""
+        now = time.time()
+        if not force and not self.is_tty and now - self.last_print < self.interval:
+            return
+        self.last_print = now
+        
+        stats = self.summary()
+        line = (f"{stats['files']}/{self.total} 檔 | {stats['pages']} 頁 | "
+                f"{stats['pages_per_minute']:.1f} 頁/分 | {stats['tokens_per_second']:.1f} tokens/s | "
+                f"失敗 {stats['failed']} | 續傳略過 {stats['resumed']}")
+        if self.is_tty:
+            self.stream.write('\r' + line + ' ' * 4)
+            if force:
+                self.stream.write('\n')
+        else:
+            self.stream.write(line + '\n')
+        self.stream.flush()
+
+
+class JSONLWriter:
+    """逐筆附加寫入 JSONL（每筆寫入後 flush，中斷時最多遺失最後一筆）"""
+    
+    def __init__(self, path: Path):
+        self.path = path
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, 'a', encoding='utf-8')
+    
+    def write(self, record: Dict[str, Any]):
+        self._file.write(json.dumps(record, ensure_ascii=False, default=str) + '\n')
+        self._file.flush()
+    
+    def close(self):
+        self._file.close()
+
+
+def _result_record(path: Path, key: str, content_hash: str, result,
+                   page: Optional[int] = None, cached: bool = False) -> Dict[str, Any]:
+    """將 OCRResult 轉為 JSONL 紀錄"""
+    return {
+        'key': key,
+        'path': str(path),
+        'page': page,
+        'sha256': content_hash,
+        'success': result.success,
+        'text': result.text_content,
+        'error': result.error_message,
+        'source': result.source,
+        'skipped_blank': result.skipped_blank,
+        'image_size': list(result.image_size),
+        'processing_time': round(result.processing_time, 3),
+        'output_tokens': result.output_tokens,
+        'layout': result.layout,
+        'cached': cached,
+        'timestamp': result.timestamp.isoformat()
+    }
+
+
+def run_ocr(args) -> int:
+    """
+    執行 ocr 子命令
+    
+    Returns:
+        結束代碼（有失敗時為 1）
+    """
+    from src.config_loader import get_config
+    from src.job_manifest import JobManifest
+    
+    config = get_config()
+    
+    inputs = collect_inputs(args.inputs, args.manifest, recursive=not args.no_recursive)
+    inputs_total = len(inputs)
+    if args.shard:
+        # 依檔案鍵雜湊分片：新增或刪除其他檔案不會改變既有檔案所在的分片
+        inputs = select_shard(inputs, *args.shard, key=lambda item: item[1])
+    files = [path for path, _ in inputs]
+    input_keys = {path: key for path, key in inputs}
+    if not files:
+        if inputs_total and args.shard:
+            print(f"分片 {args.shard[0]}/{args.shard[1]} 沒有檔案", file=sys.stderr)
+            return 0
+        print("錯誤: 沒有可處理的輸入檔案", file=sys.stderr)
+        return 2
+    
+    output_path = Path(args.output)
+    work_dir = output_path.parent / f".{output_path.stem}_work"
+    
+    ocr_settings = {
+        'base_size': args.base_size or config.get('model.base_size', 1024),
+        'image_size': args.image_size or config.get('model.image_size', 1024),
+        'crop_mode': config.get('model.crop_mode', False) if args.crop is None else args.crop,
+        'skip_blank': config.get('blank_detection.enabled', True) if args.skip_blank is None else args.skip_blank
+    }
+    if args.prompt:
+        ocr_settings['prompt'] = args.prompt
+    
+    # 續傳清單與結果檔放在一起，設定不同時不會沿用舊結果
+    manifest = JobManifest(output_path.parent / f"{output_path.stem}.manifest.jsonl", settings=ocr_settings)
+    if not args.resume:
+        skip = None
+    else:
+        skip = lambda path, content_hash: manifest.is_done(str(path.resolve()), content_hash)
+    
+    # 結果儲存：相同內容與設定已辨識過時直接沿用，新結果也寫入供日後查詢與匯出
+    store = None
+    if args.store:
+        from src.result_store import ResultStore
+        store = ResultStore(config.get('results.db_path', './outputs/results/results.db'))
+    job_id = args.job_id or output_path.stem
+    
+    from src.ocr_engine import OCREngine
+    engine = OCREngine(model_path=args.model)
+    engine.load_model()
+    
+    writer = JSONLWriter(output_path)
+    meter = RateMeter(len(files))
+    decoder = ReadAheadDecoder(workers=args.decode_workers, prefetch=args.prefetch)
+    processed = 0
+    
+    print(f"處理 {len(files)} 個檔案 → {output_path}", file=sys.stderr)
+    try:
+        for path, future in decoder.iter_decoded(files, skip, limit=args.limit):
+            if args.limit is not None and processed >= args.limit:
+                break
+            
+            key = str(path.resolve())
+            input_key = input_keys[path]
+            try:
+                content_hash, image = future.result()
+            except Exception as e:
+                writer.write({'key': input_key, 'path': str(path), 'page': None, 'success': False,
+                              'error': f"讀取失敗: {e}", 'timestamp': datetime.now().isoformat()})
+                meter.add_page(failed=True)
+                meter.files_done += 1
+                processed += 1
+                meter.render()
+                continue
+            
+            if skip is not None and skip(path, content_hash):
+                meter.resumed += 1
+                meter.files_done += 1
+                meter.render()
+                continue
+            
+            if path.suffix.lower() == '.pdf':
+                error = _process_pdf(engine, store, job_id, path, input_key, content_hash, ocr_settings,
+                                     work_dir, writer, meter, config, max_pages=args.max_pages)
+                ok = error is None
+            else:
+                result, cached = _run_engine(
+                    engine, store, job_id, image, content_hash, ocr_settings,
+                    output_path=str(work_dir),
+                    source_path=str(path)
+                )
+                writer.write(_result_record(path, input_key, content_hash, result, cached=cached))
+                meter.add_page(None if cached else result, failed=not result.success)
+                ok = result.success
+                error = result.error_message
+            
+            if ok:
+                manifest.mark_done(key, content_hash, output=str(output_path))
+            else:
+                manifest.mark_failed(key, content_hash, error or "辨識失敗")
+            
+            meter.files_done += 1
+            processed += 1
+            meter.render()
+    
+    except KeyboardInterrupt:
+        print("\n已中斷，重新執行同一命令即可從中斷處繼續", file=sys.stderr)
+    finally:
+        writer.close()
+        shutil.rmtree(work_dir, ignore_errors=True)
+        meter.render(force=True)
+    
+    if args.summary:
+        print(json.dumps(meter.summary(), ensure_ascii=False))
+    
+    return 1 if meter.failed else 0
+
+
+def _run_engine(engine, store, job_id: str, image, content_hash: str, ocr_settings: Dict[str, Any],
+                page: Optional[int] = None, **kwargs):
+    """
+    先查結果儲存，沒有相同內容與設定的結果時才執行推理
+    
+    Returns:
+        (OCRResult, 是否為快取結果)
+    """
+    if store is not None:
+        # 只沿用目前模型產生的結果：模型更新或重載為其他模型後重新辨識
+        stored = store.get(content_hash, ocr_settings, page=page, model=engine.model_fingerprint)
+        if stored is not None:
+            result = stored.to_ocr_result()
+            if stored.job_id != job_id:
+                # 也記在目前的工作下，依工作匯出時不會缺頁
+                store.put(result, content_hash, job_id=job_id, page=page, settings=ocr_settings)
+            return result, True
+    
+    # 內容雜湊也作為請求合併鍵（PDF 頁面加上頁碼）
+    request_hash = content_hash if page is None else f"{content_hash}#page={page}"
+    result = engine.process_image(image, save_results=True, content_hash=request_hash, **ocr_settings, **kwargs)
+    # 因記憶體不足而降級的結果不寫入儲存，之後記憶體足夠時會以原設定重新處理
+    if store is not None and not (result.model_config or {}).get('downgraded_from'):
+        store.put(result, content_hash, job_id=job_id, page=page, settings=ocr_settings)
+    return result, False
+
+
+def _process_pdf(engine, store, job_id: str, path: Path, input_key: str, content_hash: str,
+                 ocr_settings: Dict[str, Any], work_dir: Path, writer: JSONLWriter,
+                 meter: RateMeter, config, max_pages: Optional[int] = None) -> Optional[str]:
+    """
+    逐頁處理 PDF（有文字層的頁面直接取文字），每頁一筆 JSONL 紀錄
+    
+    每筆紀錄附上文件總頁數（page_count），合併時可據此找出缺少的頁面（包含末尾）。
+    
+    Returns:
+        有頁面失敗或因 max_pages 截斷時回傳原因（檔案不標記為完成），否則 None
+    """
+    from src.pdf_converter import PDFConverter
+    
+    converter = PDFConverter(
+        dpi=config.get('pdf.dpi', 200),
+        max_pages=max_pages,
+        workers=config.get('pdf.workers', 1),
+        ram_budget_mb=config.get('pdf.ram_budget_mb')
+    )
+    
+    error = None
+    page_count = None
+    try:
+        page_count = converter.count_pages(path)
+        if max_pages and page_count > max_pages:
+            error = f"共 {page_count} 頁，超過 --max-pages {max_pages}，僅處理前 {max_pages} 頁"
+        
+        pages = converter.iter_document(
+            path,
+            prefetch=2,
+            use_text_layer=config.get('pdf.use_text_layer', True)
+        )
+        for page in pages:
+            if page.source == 'text_layer':
+                writer.write({
+                    'key': input_key,
+                    'path': str(path),
+                    'page': page.page_number,
+                    'page_count': page_count,
+                    'sha256': content_hash,
+                    'success': True,
+                    'text': page.text,
+                    'source': page.source,
+                    'processing_time': 0.0,
+                    'output_tokens': 0,
+                    'timestamp': datetime.now().isoformat()
+                })
+                meter.add_page()
+                continue
+            
+            result, cached = _run_engine(
+                engine, store, job_id, page.image, content_hash, ocr_settings,
+                page=page.page_number,
+                output_path=str(work_dir),
+                source_path=f"{path}#page={page.page_number}"
+            )
+            record = _result_record(path, input_key, content_hash, result,
+                                    page=page.page_number, cached=cached)
+            record['page_count'] = page_count
+            writer.write(record)
+            meter.add_page(None if cached else result, failed=not result.success)
+            if not result.success and error is None:
+                error = "部分頁面辨識失敗"
+            meter.render()
+    except Exception as e:
+        writer.write({'key': input_key, 'path': str(path), 'page': None, 'page_count': page_count,
+                      'sha256': content_hash, 'success': False, 'error': f"PDF 處理失敗: {e}",
+                      'timestamp': datetime.now().isoformat()})
+        meter.add_page(failed=True)
+        return f"PDF 處理失敗: {e}"
+    
+    return error
+
+
+def run_merge(args) -> int:
+    """
+    執行 merge 子命令
+    
+    Returns:
+        結束代碼（有缺漏、重複或失敗頁面時為 1）
+    """
+    expected = None
+    page_counts = {}
+    if args.inputs or args.manifest:
+        inputs = collect_inputs(args.inputs, args.manifest, recursive=not args.no_recursive)
+        expected = [key for _, key in inputs]
+        # 由原始 PDF 讀取總頁數，補足沒有 page_count 的舊紀錄
+        for path, key in inputs:
+            if path.suffix.lower() != '.pdf':
+                continue
+            try:
+                from src.pdf_converter import read_pdf_structure
+                page_counts[key] = read_pdf_structure(path)['total_pages']
+            except Exception as e:
+                logger.warning(f"無法讀取 PDF 頁數，只依結果中的頁數檢查缺頁: {path}: {e}")
+    
+    report = merge_results(args.shard_files, args.output, expected_keys=expected, page_counts=page_counts)
+    
+    print(f"合併 {report['shard_files']} 個分片 → {report['output']}")
+    print(f"  檔案: {report['files_with_results']}/{report['files']}  頁數: {report['pages']}  "
+          f"過期紀錄: {report['stale_records']}")
+    for label, field in (('失敗', 'failed'), ('重複', 'duplicates'),
+                         ('缺頁', 'missing_pages'), ('缺檔', 'missing_files')):
+        items = report[field]
+        print(f"  {label}: {len(items)}")
+        for item in items[:10]:
+            print(f"    - {item}")
+        if len(items) > 10:
+            print(f"    ...（共 {len(items)} 筆，詳見 --report）")
+    
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    
+    problems = report['failed'] or report['duplicates'] or report['missing_pages'] or report['missing_files']
+    return 1 if problems else 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """建立命令列參數解析器"""
+    parser = argparse.ArgumentParser(prog='python -m src.cli', description='DeepSeek-OCR 命令列工具')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    
+    ocr = subparsers.add_parser('ocr', help='批次 OCR，結果輸出為 JSONL')
+    ocr.add_argument('inputs', nargs='*', help='圖片、PDF 或資料夾')
+    ocr.add_argument('--manifest', help='輸入清單檔（每行一個路徑）')
+    ocr.add_argument('-o', '--output', default='outputs/cli/results.jsonl', help='JSONL 結果檔')
+    ocr.add_argument('--model', default='./models/deepseek-ocr', help='模型路徑')
+    ocr.add_argument('--no-recursive', action='store_true', help='資料夾不包含子資料夾')
+    ocr.add_argument('--no-resume', dest='resume', action='store_false', help='不跳過已完成的檔案')
+    ocr.add_argument('--limit', type=int, help='本次最多處理的檔案數（不含續傳略過的檔案）')
+    ocr.add_argument('--shard', type=parse_shard, help='只處理第 i 個分片，格式 i/N')
+    ocr.add_argument('--decode-workers', type=int, default=2, help='預先解碼的執行緒數')
+    ocr.add_argument('--prefetch', type=int, default=4, help='預先解碼的檔案數')
+    ocr.add_argument('--base-size', type=int, help='基礎尺寸（預設使用設定檔）')
+    ocr.add_argument('--image-size', type=int, help='圖片尺寸（預設使用設定檔）')
+    ocr.add_argument('--crop', dest='crop', action='store_true', default=None,
+                     help='啟用裁切模式（預設使用設定檔）')
+    ocr.add_argument('--no-crop', dest='crop', action='store_false', default=None, help='停用裁切模式')
+    ocr.add_argument('--max-pages', type=int,
+                     help='每個 PDF 最多處理的頁數（預設不限制；超過時該檔案不標記為完成）')
+    ocr.add_argument('--skip-blank', dest='skip_blank', action='store_true', default=None,
+                     help='跳過空白頁（預設使用設定檔 blank_detection.enabled）')
+    ocr.add_argument('--no-skip-blank', dest='skip_blank', action='store_false', default=None,
+                     help='不跳過空白頁')
+    ocr.add_argument('--prompt', help='自訂提示詞')
+    ocr.add_argument('--no-store', dest='store', action='store_false',
+                     help='不查詢也不寫入結果儲存（results.db_path）')
+    ocr.add_argument('--job-id', help='結果儲存中的工作 ID（預設為輸出檔名）')
+    ocr.add_argument('--summary', action='store_true', help='結束時以 JSON 輸出統計到 stdout')
+    ocr.add_argument('-v', '--verbose', action='store_true', help='顯示詳細日誌')
+    ocr.set_defaults(func=run_ocr)
+    
+    merge = subparsers.add_parser('merge', help='合併各分片的 JSONL 結果並檢查缺漏與重複')
+    merge.add_argument('shard_files', nargs='+', help='各分片的 JSONL 結果檔')
+    merge.add_argument('-o', '--output', default='outputs/cli/merged.jsonl', help='合併後的 JSONL 檔')
+    merge.add_argument('--inputs', nargs='*', default=[], help='原始輸入（用於找出完全沒有結果的檔案）')
+    merge.add_argument('--manifest', help='原始輸入清單檔')
+    merge.add_argument('--no-recursive', action='store_true', help='資料夾不包含子資料夾')
+    merge.add_argument('--report', help='將完整報告寫入 JSON 檔')
+    merge.add_argument('-v', '--verbose', action='store_true', help='顯示詳細日誌')
+    merge.set_defaults(func=run_merge)
+    
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    
+    # 命令列預設只顯示警告，避免每頁的 INFO 日誌蓋掉進度列
+    logging.basicConfig(
+        level=logging.INFO if args.verbose else logging.WARNING,
+        format='%(asctime)s - %(levelname)s - %(message)s'
+    )
+    
+    if args.command == 'ocr' and not args.inputs and not args.manifest:
+        parser.error("請指定輸入檔案、資料夾或 --manifest")
+    
+    return args.func(args)
+
+
+if __name__ == '__main__':
+    if os.name == 'nt':
+        import codecs
+        sys.stdout = codecs.getwriter('utf-8')(sys.stdout.buffer, 'strict')
+        sys.stderr = codecs.getwriter('utf-8')(sys.stderr.buffer, 'strict')
+    sys.exit(main())
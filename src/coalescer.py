@@ -0,0 +1,101 @@
+"""
+進行中請求合併模組
+相同內容與設定的請求同時送入時（GUI 重複點擊、HTTP 重送、熱資料夾中的重複檔案），
+只有第一個請求實際執行，其餘請求等待並取得同一份結果
+"""
+
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class _Call:
+    """一個進行中的請求"""
+    
+    def __init__(self):
+        self.event = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.followers = 0
+
+
+class RequestCoalescer:
+    """
+    以請求鍵合併同時進行的相同請求（single-flight）
+    
+    只合併「進行中」的請求：第一個請求完成後鍵即移除，之後的請求會重新執行
+    （已完成結果的重複使用由 ResultStore 負責）。
+    """
+    
+    def __init__(self):
+        """初始化請求合併器"""
+        self._lock = threading.Lock()
+        self._in_flight: Dict[Hashable, _Call] = {}
+        self._executed = 0
+        self._coalesced = 0
+    
+    def run(self, key: Hashable, func: Callable[[], Any]) -> Tuple[Any, bool]:
+        """
+        執行請求；相同鍵的請求進行中時，等待並沿用其結果
+        
+        Args:
+            key: 請求鍵（內容雜湊 + 設定指紋）
+            func: 實際執行請求的函數
+        
+        Returns:
+            (結果, 是否沿用其他請求的結果)
+        
+        Raises:
+            Exception: 執行請求的函數拋出的例外（等待中的請求會收到同一個例外）
+        """
+        with self._lock:
+            call = self._in_flight.get(key)
+            if call is None:
+                call = _Call()
+                self._in_flight[key] = call
+                self._executed += 1
+                leader = True
+            else:
+                call.followers += 1
+                self._coalesced += 1
+                leader = False
+        
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+        
+        try:
+            call.result = func()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+            if call.followers:
+                logger.info(f"合併 {call.followers} 個相同的進行中請求")
+            call.event.set()
+        return call.result, False
+    
+    def in_flight(self) -> int:
+        """目前進行中的請求數（不含等待合併的請求）"""
+        with self._lock:
+            return len(self._in_flight)
+    
+    def get_stats(self) -> Dict[str, int]:
+        """
+        取得合併統計
+        
+        Returns:
+            {executed: 實際執行數, coalesced: 沿用結果數, in_flight: 進行中數}
+        """
+        with self._lock:
+            return {
+                'executed': self._executed,
+                'coalesced': self._coalesced,
+                'in_flight': len(self._in_flight)
+            }
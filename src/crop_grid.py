@@ -0,0 +1,40 @@
+"""
+裁切模式切片計算模組
+模型裁切模式（dynamic_preprocess）把圖片切成 640 × 640 切片的規則，
+PDF 轉換（自動 DPI）與記憶體准入（影像 token 估計）共用，不依賴 pdf2image 或 torch
+"""
+
+from typing import Tuple
+
+# 模型裁切模式的切片邊長與切片數範圍（對應 dynamic_preprocess 的預設值）
+CROP_TILE_SIZE = 640
+CROP_MIN_TILES = 2
+CROP_MAX_TILES = 9
+
+
+def crop_grid(width: float, height: float) -> Tuple[int, int]:
+    """依模型裁切模式的規則，回傳圖片會被切成的 (欄數, 列數)"""
+    aspect_ratio = width / height
+    target_ratios = sorted(
+        {
+            (i, j)
+            for n in range(CROP_MIN_TILES, CROP_MAX_TILES + 1)
+            for i in range(1, n + 1)
+            for j in range(1, n + 1)
+            if CROP_MIN_TILES <= i * j <= CROP_MAX_TILES
+        },
+        key=lambda x: x[0] * x[1]
+    )
+    
+    best_ratio_diff = float('inf')
+    best_ratio = (1, 1)
+    area = width * height
+    for ratio in target_ratios:
+        ratio_diff = abs(aspect_ratio - ratio[0] / ratio[1])
+        if ratio_diff < best_ratio_diff:
+            best_ratio_diff = ratio_diff
+            best_ratio = ratio
+        elif ratio_diff == best_ratio_diff:
+            if area > 0.5 * CROP_TILE_SIZE * CROP_TILE_SIZE * ratio[0] * ratio[1]:
+                best_ratio = ratio
+    return best_ratio
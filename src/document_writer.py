@@ -0,0 +1,216 @@
+"""
+文件輸出模組
+將逐頁完成的辨識結果串流寫入單一 Markdown 檔（含頁面錨點），
+並以 JSONL 索引記錄每頁的位置、處理時間與狀態
+"""
+
+import os
+import json
+import shutil
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Optional, Dict, Union, Any
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class DocumentWriter:
+    """
+    文件輸出器
+    
+    輸出檔案（name 為文件名稱）：
+        {name}.md            合併的 Markdown，每頁前有 <a id="page-N"></a> 錨點
+        {name}.index.jsonl   每頁一筆索引：page, offset, length, status, source, processing_time ...
+        {name}_images/       頁面中擷取的圖片，檔名加上頁碼前綴
+    
+    offset / length 為頁面文字在 Markdown 檔中的位元組位置，可直接 seek 讀取單頁。
+    處理期間頁面依完成順序附加寫入（同一頁以索引中最後一筆為準），
+    close() 時依頁碼順序重建 Markdown 與索引，每頁只保留最後一筆。
+    """
+    
+    def __init__(self, output_dir: Union[str, Path], name: str, resume: bool = True):
+        """
+        初始化文件輸出器
+        
+        Args:
+            output_dir: 輸出目錄
+            name: 文件名稱（通常為來源檔名主幹）
+            resume: 是否沿用既有輸出；False 時清空既有的 Markdown 與索引
+        """
+        self.output_dir = Path(output_dir)
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        
+        self.name = name
+        self.markdown_path = self.output_dir / f"{name}.md"
+        self.index_path = self.output_dir / f"{name}.index.jsonl"
+        self.images_dir = self.output_dir / f"{name}_images"
+        
+        self._entries: Dict[int, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        if resume:
+            self._load_index()
+        
+        self._markdown = open(self.markdown_path, 'ab' if resume else 'wb')
+        self._index = open(self.index_path, 'a' if resume else 'w', encoding='utf-8')
+    
+    def _load_index(self):
+        """讀取既有索引（續傳時）"""
+        if not self.index_path.exists():
+            return
+        
+        with open(self.index_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                self._entries[entry['page']] = entry
+        
+        logger.info(f"沿用既有文件輸出: {self.markdown_path}（{len(self._entries)} 頁）")
+    
+    def write_page(
+        self,
+        page_number: int,
+        text: str,
+        status: str = 'done',
+        source: str = 'ocr',
+        processing_time: float = 0.0,
+        assets_dir: Optional[Union[str, Path]] = None,
+        **extra: Any
+    ) -> Dict[str, Any]:
+        """
+        寫入一頁結果
+        
+        Args:
+            page_number: 頁碼
+            text: 頁面 Markdown 文字
+            status: 'done' 或 'failed'（失敗頁只寫入索引）
+            source: 'ocr' 或 'text_layer'
+            processing_time: 處理時間（秒）
+            assets_dir: 模型輸出目錄，其中 images/ 的圖片會移入 {name}_images/
+            **extra: 其他索引欄位（例如 duplicate_of、skipped_blank、error）
+        
+        Returns:
+            該頁的索引紀錄
+        """
+        if assets_dir is not None and status == 'done':
+            text = self._move_assets(page_number, text, Path(assets_dir))
+        
+        with self._lock:
+            offset = length = None
+            if status == 'done':
+                header = f'<a id="page-{page_number}"></a>\n\n'.encode('utf-8')
+                body = text.encode('utf-8')
+                
+                self._markdown.write(header)
+                offset = self._markdown.tell()
+                self._markdown.write(body)
+                self._markdown.write(b'\n\n')
+                self._markdown.flush()
+                length = len(body)
+            
+            entry = {
+                'page': page_number,
+                'offset': offset,
+                'length': length,
+                'status': status,
+                'source': source,
+                'processing_time': round(processing_time, 3),
+                'timestamp': datetime.now().isoformat(),
+                **extra
+            }
+            self._index.write(json.dumps(entry, ensure_ascii=False, default=str) + '\n')
+            self._index.flush()
+            self._entries[page_number] = entry
+        
+        return entry
+    
+    def _move_assets(self, page_number: int, text: str, assets_dir: Path) -> str:
+        """將模型擷取的圖片移到共用圖片目錄，並改寫 Markdown 中的連結"""
+        source_images = assets_dir / "images"
+        if not source_images.is_dir():
+            return text
+        
+        self.images_dir.mkdir(parents=True, exist_ok=True)
+        prefix = f"page_{page_number:04d}_"
+        for image_file in source_images.iterdir():
+            shutil.move(str(image_file), str(self.images_dir / f"{prefix}{image_file.name}"))
+        
+        return text.replace('](images/', f']({self.images_dir.name}/{prefix}')
+    
+    def read_text(self, page_number: int) -> Optional[str]:
+        """
+        依索引讀取已寫入頁面的文字
+        
+        Args:
+            page_number: 頁碼
+        
+        Returns:
+            頁面文字，未寫入或失敗時回傳 None
+        """
+        entry = self._entries.get(page_number)
+        if entry is None or entry['offset'] is None:
+            return None
+        
+        with self._lock:
+            if not self._markdown.closed:
+                self._markdown.flush()
+        with open(self.markdown_path, 'rb') as f:
+            f.seek(entry['offset'])
+            return f.read(entry['length']).decode('utf-8')
+    
+    def get_entry(self, page_number: int) -> Optional[Dict[str, Any]]:
+        """取得頁面最後一筆索引紀錄"""
+        return self._entries.get(page_number)
+    
+    def close(self):
+        """關閉輸出檔案，並依頁碼順序重建 Markdown 與索引"""
+        with self._lock:
+            if self._markdown.closed:
+                return
+            for f in (self._markdown, self._index):
+                f.flush()
+                f.close()
+            self._rebuild()
+    
+    def _rebuild(self):
+        """
+        依頁碼順序重寫 Markdown 與索引
+        
+        重試的頁面與重新執行時覆寫的頁面會移回原本的位置，舊的副本一併移除；
+        先寫入暫存檔再取代，中途失敗時原輸出保持不變。
+        """
+        markdown_tmp = self.markdown_path.with_name(self.markdown_path.name + '.tmp')
+        index_tmp = self.index_path.with_name(self.index_path.name + '.tmp')
+        
+        entries = {}
+        with open(self.markdown_path, 'rb') as source, \
+                open(markdown_tmp, 'wb') as markdown, \
+                open(index_tmp, 'w', encoding='utf-8') as index:
+            for page_number in sorted(self._entries):
+                entry = dict(self._entries[page_number])
+                if entry['offset'] is not None:
+                    source.seek(entry['offset'])
+                    body = source.read(entry['length'])
+                    markdown.write(f'<a id="page-{page_number}"></a>\n\n'.encode('utf-8'))
+                    entry['offset'] = markdown.tell()
+                    markdown.write(body)
+                    markdown.write(b'\n\n')
+                index.write(json.dumps(entry, ensure_ascii=False, default=str) + '\n')
+                entries[page_number] = entry
+            
+            for f in (markdown, index):
+                f.flush()
+                os.fsync(f.fileno())
+        
+        os.replace(markdown_tmp, self.markdown_path)
+        os.replace(index_tmp, self.index_path)
+        self._entries = entries
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
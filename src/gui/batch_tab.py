@@ -8,6 +8,12 @@ from pathlib import Path
 import threading
 from typing import List
 
+from src.config_loader import get_config
+from src.job_queue import JobQueue, STATUS_ENQUEUED, STATUS_LEASED
+
+# 批次頁籤在持久化佇列中使用的佇列名稱
+BATCH_QUEUE = 'batch'
+
 
 class BatchTab(ctk.CTkFrame):
     """批次處理頁籤類別"""
@@ -20,8 +26,18 @@ class BatchTab(ctk.CTkFrame):
         self.image_files: List[Path] = []
         self.is_processing = False
         self.stop_requested = False
+        self.watcher = None
+        
+        # 持久化工作佇列：GUI 中斷後未完成的檔案仍保留，下次啟動時還原
+        config = get_config()
+        self.job_queue = JobQueue(
+            config.get("queue.db_path", "./outputs/queue/jobs.db"),
+            lease_seconds=config.get("queue.lease_seconds", 600),
+            max_attempts=config.get("queue.max_attempts", 3)
+        )
         
         self.create_widgets()
+        self.restore_queue()
     
     def create_widgets(self):
         """建立介面元件"""
@@ -39,6 +55,9 @@ class BatchTab(ctk.CTkFrame):
                      command=self.add_folder, width=120).pack(side="left", padx=5)
         ctk.CTkButton(button_frame, text="🗑️ 清除列表", 
                      command=self.clear_list, width=120).pack(side="left", padx=5)
+        self.watch_button = ctk.CTkButton(button_frame, text="👁️ 監看資料夾", 
+                                         command=self.toggle_watch, width=120)
+        self.watch_button.pack(side="left", padx=5)
         
         # 檔案列表
         list_frame = ctk.CTkFrame(self)
@@ -85,6 +104,10 @@ class BatchTab(ctk.CTkFrame):
         ctk.CTkCheckBox(options_frame, text="自動清理快取", 
                        variable=self.auto_clear_var).pack(anchor="w", padx=10, pady=5)
         
+        self.resume_var = ctk.BooleanVar(value=get_config().get("jobs.resume", True))
+        ctk.CTkCheckBox(options_frame, text="續傳（跳過已完成檔案）", 
+                       variable=self.resume_var).pack(anchor="w", padx=10, pady=5)
+        
         # 控制按鈕
         control_buttons = ctk.CTkFrame(options_frame)
         control_buttons.pack(fill="x", padx=10, pady=10)
@@ -170,6 +193,76 @@ class BatchTab(ctk.CTkFrame):
             
             self.update_file_list()
     
+    def restore_queue(self):
+        """還原佇列中尚未完成的檔案（例如上次處理中 GUI 意外結束）"""
+        try:
+            pending = self.job_queue.list_jobs([STATUS_ENQUEUED, STATUS_LEASED], queue=BATCH_QUEUE)
+        except Exception as e:
+            print(f"讀取工作佇列失敗: {e}")
+            return
+        
+        for job in pending:
+            file_path = Path(job.input_path)
+            if file_path not in self.image_files:
+                self.image_files.append(file_path)
+        
+        if pending:
+            self.update_file_list()
+            self.progress_label.configure(text=f"佇列中有 {len(pending)} 個未完成檔案，可直接開始處理")
+    
+    def toggle_watch(self):
+        """開始 / 停止監看資料夾：新檔案寫入完成後自動排入佇列並開始處理"""
+        if self.watcher is not None:
+            self.watcher.stop()
+            self.watcher = None
+            self.watch_button.configure(text="👁️ 監看資料夾")
+            if self.status_callback:
+                self.status_callback("已停止監看資料夾")
+            return
+        
+        folder = filedialog.askdirectory(title="選擇要監看的資料夾")
+        if not folder:
+            return
+        
+        from src.hot_folder import HotFolderWatcher
+        
+        config = get_config()
+        self.watcher = HotFolderWatcher(
+            [folder],
+            self.job_queue,
+            state_dir=Path(self.output_dir_var.get()) / "hot_folder_seen.jsonl",
+            queue=BATCH_QUEUE,
+            settle_seconds=config.get("hot_folder.settle_seconds", 2.0),
+            poll_interval=config.get("hot_folder.poll_interval", 5.0),
+            on_enqueued=lambda path, job_id: self.after(0, self._on_file_arrived, path)
+        )
+        self.watcher.start()
+        self.watch_button.configure(text="⏹️ 停止監看")
+        if self.status_callback:
+            self.status_callback(f"監看中: {folder}")
+    
+    def _on_file_arrived(self, file_path: Path):
+        """監看到新檔案：加入列表，未在處理時自動開始"""
+        if file_path not in self.image_files:
+            self.image_files.append(file_path)
+            self.update_file_list()
+        
+        # 推理元件仍在背景載入時先留在佇列中，就緒後由 resume_pending 開始處理
+        if not self.is_processing and self.ocr_engine is not None:
+            self._start_processing()
+    
+    def resume_pending(self):
+        """
+        監看中有待處理的檔案時開始處理
+        
+        處理結束後又有新檔案排入時由本頁籤呼叫；推理元件於背景載入完成後由主視窗呼叫。
+        """
+        if self.watcher is None or self.is_processing or self.stop_requested or self.ocr_engine is None:
+            return
+        counts = self.job_queue.counts(BATCH_QUEUE)
+        if counts[STATUS_ENQUEUED]:
+            self._start_processing()
+    
     def clear_list(self):
         """清除列表"""
         if self.is_processing:
@@ -177,6 +270,7 @@ class BatchTab(ctk.CTkFrame):
             return
         
         self.image_files.clear()
+        self.job_queue.remove_pending(BATCH_QUEUE)
         self.update_file_list()
         self.progress_bar.set(0)
         self.progress_label.configure(text="等待開始...")
@@ -208,6 +302,21 @@ class BatchTab(ctk.CTkFrame):
             messagebox.showwarning("警告", "已在處理中")
             return
         
+        if self.ocr_engine is None:
+            messagebox.showinfo("提示", "推理元件載入中，請稍候")
+            return
+        
+        # 排入持久化佇列（已在佇列中的檔案不重複排入）
+        try:
+            self.job_queue.enqueue_many(self.image_files, queue=BATCH_QUEUE)
+        except Exception as e:
+            messagebox.showerror("錯誤", f"無法寫入工作佇列:\n{e}")
+            return
+        
+        self._start_processing()
+    
+    def _start_processing(self):
+        """啟動背景處理執行緒"""
         # 更新按鈕狀態
         self.start_button.configure(state="disabled")
         self.stop_button.configure(state="normal")
@@ -227,69 +336,119 @@ class BatchTab(ctk.CTkFrame):
             self.status_callback("正在停止...")
     
     def _batch_process_thread(self):
-        """批次處理執行緒"""
+        """批次處理執行緒：從持久化佇列依序租用工作直到佇列清空或使用者停止"""
         import time
+        from src.job_manifest import JobManifest, compute_content_hash
         
-        total = len(self.image_files)
+        counts = self.job_queue.counts(BATCH_QUEUE)
+        total = counts[STATUS_ENQUEUED] + counts[STATUS_LEASED]
+        processed = 0
         successful = 0
         failed = 0
+        resumed = 0
         start_time = time.time()
         
         try:
+            # 工作清單：記錄每個檔案的完成狀態，重新執行時跳過已完成檔案、重試失敗檔案
+            config = get_config()
+            ocr_settings = {
+                'base_size': config.get("model.base_size", 1024),
+                'image_size': config.get("model.image_size", 1024),
+                'crop_mode': config.get("model.crop_mode", False)
+            }
+            manifest = JobManifest(self.output_dir_var.get(), settings=ocr_settings)
+            
             # 確保模型已載入
             if not self.ocr_engine._model_loaded:
                 self.after(0, lambda: self.progress_label.configure(text="載入模型..."))
                 self.ocr_engine.load_model()
             
-            # 處理每個檔案
-            for i, image_path in enumerate(self.image_files):
-                if self.stop_requested:
-                    self.after(0, lambda: self.progress_label.configure(text="已停止"))
+            # 處理每個工作
+            while not self.stop_requested:
+                job = self.job_queue.lease(queue=BATCH_QUEUE)
+                if job is None:
                     break
                 
+                image_path = Path(job.input_path)
+                if job.attempts == 1:
+                    processed += 1
+                
                 # 更新進度
-                progress = (i + 1) / total
-                current_text = f"處理中: {i+1}/{total}"
-                file_text = f"當前: {image_path.name}"
+                progress = min(processed / max(total, 1), 1.0)
+                current_text = f"處理中: {processed}/{total}"
+                retry_text = f"（第 {job.attempts} 次嘗試）" if job.attempts > 1 else ""
+                file_text = f"當前: {image_path.name}{retry_text}"
                 
                 self.after(0, lambda p=progress, t=current_text, f=file_text: self._update_progress(p, t, f))
                 
                 if self.status_callback:
-                    self.status_callback(f"處理: {i+1}/{total} - {image_path.name}")
+                    self.status_callback(f"處理: {processed}/{total} - {image_path.name}")
                 
                 # 處理圖片
+                key = str(image_path.resolve())
+                input_hash = None
                 try:
+                    input_hash = compute_content_hash(image_path)
+                    if self.resume_var.get() and manifest.is_done(key, input_hash):
+                        successful += 1
+                        resumed += 1
+                        self.job_queue.complete(job.job_id, result_path=manifest.get(key).get('output'))
+                        continue
+                    
+                    output_path = f"{self.output_dir_var.get()}/{image_path.stem}"
                     result = self.ocr_engine.process_image(
                         image_path,
-                        output_path=f"{self.output_dir_var.get()}/{image_path.stem}",
-                        save_results=True
+                        output_path=output_path,
+                        save_results=True,
+                        **ocr_settings
                     )
                     
                     if result.success:
                         successful += 1
+                        manifest.mark_done(key, input_hash, output=output_path,
+                                           processing_time=result.processing_time)
+                        self.job_queue.complete(job.job_id, result_path=output_path)
                     else:
-                        failed += 1
+                        error = result.error_message or "未知錯誤"
+                        manifest.mark_failed(key, input_hash, error)
+                        if self.job_queue.fail(job.job_id, error) != STATUS_ENQUEUED:
+                            failed += 1
                 
                 except Exception as e:
-                    failed += 1
+                    if input_hash is not None:
+                        manifest.mark_failed(key, input_hash, str(e))
+                    # 檔案不存在等錯誤重試也無法成功
+                    retry = image_path.exists()
+                    if self.job_queue.fail(job.job_id, str(e), retry=retry) != STATUS_ENQUEUED:
+                        failed += 1
                     print(f"處理 {image_path.name} 失敗: {e}")
                 
                 # 自動清理快取
-                if self.auto_clear_var.get() and (i + 1) % 5 == 0:
+                if self.auto_clear_var.get() and processed % 5 == 0:
                     from src import get_memory_manager
                     get_memory_manager().clear_cache()
             
+            # 已完成的檔案從列表移除，停止時剩下的檔案仍留在佇列中
+            pending = {job.input_path for job in
+                       self.job_queue.list_jobs([STATUS_ENQUEUED, STATUS_LEASED], queue=BATCH_QUEUE)}
+            self.image_files = [p for p in self.image_files if str(p.resolve()) in pending]
+            self.after(0, self.update_file_list)
+            
             # 完成
             total_time = time.time() - start_time
-            stats_text = f"✓ 成功: {successful}  ✗ 失敗: {failed}  ⏱️ 總時間: {total_time:.1f}s"
+            stats_text = f"✓ 成功: {successful}（續傳跳過 {resumed}）  ✗ 失敗: {failed}  ⏱️ 總時間: {total_time:.1f}s"
             
             self.after(0, lambda: self.stats_label.configure(text=stats_text))
-            self.after(0, lambda: self.progress_label.configure(text="處理完成！"))
+            if self.stop_requested:
+                self.after(0, lambda: self.progress_label.configure(
+                    text=f"已停止，佇列中還有 {len(pending)} 個檔案"))
+            else:
+                self.after(0, lambda: self.progress_label.configure(text="處理完成！"))
             
             if self.status_callback:
                 self.status_callback(f"批次處理完成: {successful}/{total}")
             
-            if not self.stop_requested:
+            if not self.stop_requested and self.watcher is None:
                 self.after(0, lambda: messagebox.showinfo("完成", 
                     f"批次處理完成！\n成功: {successful}\n失敗: {failed}\n總時間: {total_time:.1f}秒"))
         
@@ -301,6 +460,7 @@ class BatchTab(ctk.CTkFrame):
             # 恢復按鈕狀態
             self.after(0, self._reset_buttons)
             self.is_processing = False
+            self.after(0, self.resume_pending)
     
     def _update_progress(self, progress, text, file_text):
         """更新進度顯示"""
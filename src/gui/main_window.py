@@ -5,12 +5,12 @@
 import customtkinter as ctk
 from tkinter import messagebox
 import sys
+import threading
 from pathlib import Path
 
 # 添加專案根目錄到路徑
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
-from src import get_memory_manager, OCREngine
 from src.version_info import PROJECT_NAME, PROJECT_VERSION
 from .single_image_tab import SingleImageTab
 from .batch_tab import BatchTab
@@ -35,9 +35,9 @@ class MainWindow(ctk.CTk):
         ctk.set_appearance_mode("dark")
         ctk.set_default_color_theme("blue")
         
-        # 初始化記憶體管理器和 OCR 引擎
-        self.memory_manager = get_memory_manager()
-        self.ocr_engine = None  # 延遲載入
+        # 記憶體管理器和 OCR 引擎需要 torch / transformers，視窗顯示後在背景匯入與建立
+        self.memory_manager = None
+        self.ocr_engine = None
         
         # 建立 UI
         self.create_menu()
@@ -46,6 +46,9 @@ class MainWindow(ctk.CTk):
         
         # 啟動監控更新
         self.update_status()
+        
+        # 背景初始化 OCR 引擎
+        self.start_engine_init()
     
     def center_window(self):
         """將視窗置中"""
@@ -110,9 +113,6 @@ class MainWindow(ctk.CTk):
         self.tab_batch = self.tabview.add("批次處理")
         self.tab_pdf = self.tabview.add("PDF 處理")
         
-        # 初始化 OCR 引擎（延遲載入）
-        self.init_ocr_engine()
-        
         # 建立單張圖片頁籤
         self.single_image_tab = SingleImageTab(
             self.tab_single, 
@@ -197,6 +197,15 @@ class MainWindow(ctk.CTk):
         self.ram_label = ctk.CTkLabel(ram_frame, text="0 / 0 GB", font=("Arial", 10))
         self.ram_label.pack()
         
+        # 推理排程（各延遲等級的 p95 延遲）
+        queue_frame = ctk.CTkFrame(self.right_frame)
+        queue_frame.pack(fill="x", padx=10, pady=5)
+        
+        ctk.CTkLabel(queue_frame, text="排程", font=("Arial", 12, "bold")).pack(pady=5)
+        self.scheduler_label = ctk.CTkLabel(queue_frame, text="互動 -\n批次 -", 
+                                           font=("Arial", 10), justify="left")
+        self.scheduler_label.pack()
+        
         # 分隔線
         ctk.CTkFrame(self.right_frame, height=2).pack(fill="x", padx=10, pady=20)
         
@@ -208,14 +217,50 @@ class MainWindow(ctk.CTk):
         ctk.CTkButton(self.right_frame, text="📁 開啟輸出", 
                      command=self.open_output_dir).pack(fill="x", padx=10, pady=5)
     
-    def init_ocr_engine(self):
-        """初始化 OCR 引擎"""
+    def start_engine_init(self):
+        """在背景執行緒匯入 torch / transformers 並建立 OCR 引擎，不阻塞視窗顯示"""
+        self.status_label.configure(text="正在載入推理元件...")
+        thread = threading.Thread(target=self._init_engine_thread, daemon=True)
+        thread.start()
+    
+    def _init_engine_thread(self):
+        """OCR 引擎初始化執行緒"""
         try:
-            self.ocr_engine = OCREngine(model_path="./models/deepseek-ocr")
+            from src.memory_manager import get_memory_manager
+            from src.ocr_engine import OCREngine
+            
+            memory_manager = get_memory_manager()
             # 不立即載入模型，等到需要時再載入
+            ocr_engine = OCREngine(
+                model_path="./models/deepseek-ocr",
+                blank_config=self.load_blank_config()
+            )
         except Exception as e:
-            messagebox.showerror("錯誤", f"初始化 OCR 引擎失敗:\n{e}")
-            self.ocr_engine = None
+            print(f"初始化 OCR 引擎失敗: {e}")
+            error = str(e)
+            self.after(0, lambda: messagebox.showerror("錯誤", f"初始化 OCR 引擎失敗:\n{error}"))
+            self.after(0, lambda: self.status_label.configure(text="OCR 引擎初始化失敗"))
+            return
+        
+        self.after(0, self._on_engine_ready, memory_manager, ocr_engine)
+    
+    def _on_engine_ready(self, memory_manager, ocr_engine):
+        """引擎就緒後交給各頁籤（在主執行緒執行）"""
+        self.memory_manager = memory_manager
+        self.ocr_engine = ocr_engine
+        for tab in (self.single_image_tab, self.batch_tab, self.pdf_tab):
+            tab.ocr_engine = ocr_engine
+        self.status_label.configure(text="就緒")
+        
+        # 載入期間監看到的新檔案已在佇列中，現在開始處理
+        self.batch_tab.resume_pending()
+    
+    def load_blank_config(self):
+        """從系統配置載入空白頁偵測門檻"""
+        from src.image_processor import BlankPageConfig
+        
+        # enabled 決定未指定 skip_blank 的請求（例如批次處理）是否跳過空白頁
+        return BlankPageConfig.from_config()
     
     def create_status_bar(self):
         """建立狀態列"""
@@ -233,10 +278,14 @@ class MainWindow(ctk.CTk):
     def update_status(self):
         """更新狀態資訊"""
         try:
-            # 更新 VRAM
-            memory_info = self.memory_manager.get_vram_usage()
+            # 更新 VRAM（記憶體管理器在背景初始化完成前顯示載入中）
+            memory_info = self.memory_manager.get_vram_usage() if self.memory_manager else None
             
-            if memory_info.cuda_available:
+            if memory_info is None:
+                self.gpu_name_label.configure(text="載入中...")
+                self.vram_progress.set(0)
+                self.vram_label.configure(text="N/A")
+            elif memory_info.cuda_available:
                 self.gpu_name_label.configure(text=memory_info.device_name[:20])
                 vram_percent = memory_info.vram_usage_percent / 100
                 self.vram_progress.set(vram_percent)
@@ -260,6 +309,18 @@ class MainWindow(ctk.CTk):
             self.ram_label.configure(
                 text=f"{ram.used / 1024**3:.1f} / {ram.total / 1024**3:.1f} GB"
             )
+            
+            # 更新排程統計
+            if self.ocr_engine is not None:
+                stats = self.ocr_engine.get_scheduler_stats()
+                lines = []
+                for priority, label in (("interactive", "互動"), ("bulk", "批次")):
+                    item = stats[priority]
+                    if item['count'] or item['waiting']:
+                        lines.append(f"{label} p95 {item['latency_p95']:.1f}s（等待 {item['waiting']}）")
+                    else:
+                        lines.append(f"{label} -")
+                self.scheduler_label.configure(text="\n".join(lines))
         
         except Exception as e:
             print(f"更新狀態失敗: {e}")
@@ -287,6 +348,9 @@ class MainWindow(ctk.CTk):
     
     def clear_cache(self):
         """清理快取"""
+        if self.memory_manager is None:
+            messagebox.showinfo("提示", "推理元件載入中，請稍候")
+            return
         try:
             self.memory_manager.clear_cache()
             self.status_label.configure(text="快取已清理")
@@ -295,8 +359,37 @@ class MainWindow(ctk.CTk):
             messagebox.showerror("錯誤", f"清理快取失敗: {e}")
     
     def reload_model(self):
-        """重載模型"""
-        messagebox.showinfo("提示", "重載模型功能開發中")
+        """重載模型（依目前設定在背景載入並暖機新模型，就緒後切換，期間照常處理請求）"""
+        if self.ocr_engine is None:
+            messagebox.showerror("錯誤", "OCR 引擎未初始化")
+            return
+        if self.ocr_engine.is_reloading:
+            messagebox.showinfo("提示", "模型重載進行中")
+            return
+        
+        from src.config_loader import reload_config
+        config = reload_config()
+        model_path = config.get("paths.model_dir", self.ocr_engine.model_path)
+        device = config.get("device.type", self.ocr_engine.device)
+        torch_dtype = config.get("model.torch_dtype", "bfloat16")
+        
+        self.status_label.configure(text="背景重載模型中，目前模型持續服務...")
+        thread = threading.Thread(
+            target=self._reload_model_thread, args=(model_path, device, torch_dtype), daemon=True
+        )
+        thread.start()
+    
+    def _reload_model_thread(self, model_path, device, torch_dtype):
+        """重載模型執行緒"""
+        try:
+            seamless = self.ocr_engine.reload_model(model_path=model_path, device=device, torch_dtype=torch_dtype)
+            message = "模型已重載" if seamless else "模型已重載（記憶體不足，期間曾暫停處理）"
+            self.after(0, lambda: self.status_label.configure(text=message))
+        except Exception as e:
+            print(f"重載模型失敗: {e}")
+            error = str(e)
+            self.after(0, lambda: messagebox.showerror("錯誤", f"重載模型失敗:\n{error}"))
+            self.after(0, lambda: self.status_label.configure(text="重載模型失敗，沿用目前模型"))
     
     def open_output_dir(self):
         """開啟輸出目錄"""
@@ -8,6 +8,10 @@ from pathlib import Path
 import threading
 
 
+# 串流轉換時每次轉換的頁數（同時也是預先轉換的頁數）
+STREAM_CHUNK_SIZE = 4
+
+
 class PDFTab(ctk.CTkFrame):
     """PDF 處理頁籤類別"""
     
@@ -110,6 +114,40 @@ class PDFTab(ctk.CTkFrame):
         ctk.CTkButton(option_row2, text="瀏覽", command=self.browse_output, 
                      width=60).pack(side="left", padx=5)
         
+        from src.config_loader import get_config
+        self.skip_blank_var = ctk.BooleanVar(
+            value=get_config().get("blank_detection.enabled", True))
+        ctk.CTkCheckBox(convert_frame, text="跳過空白頁", 
+                       variable=self.skip_blank_var).pack(anchor="w", padx=10, pady=5)
+        
+        self.dedup_var = ctk.BooleanVar(value=get_config().get("dedup.enabled", False))
+        ctk.CTkCheckBox(convert_frame, text="重複頁只辨識一次", 
+                       variable=self.dedup_var).pack(anchor="w", padx=10, pady=5)
+        
+        self.auto_dpi_var = ctk.BooleanVar(
+            value=get_config().get("pdf.auto_dpi", False))
+        ctk.CTkCheckBox(convert_frame, text="依 OCR 解析度自動調整 DPI（DPI 欄位為上限）", 
+                       variable=self.auto_dpi_var).pack(anchor="w", padx=10, pady=5)
+        
+        self.text_layer_var = ctk.BooleanVar(
+            value=get_config().get("pdf.use_text_layer", True))
+        ctk.CTkCheckBox(convert_frame, text="使用內嵌文字層（僅 OCR 掃描頁）", 
+                       variable=self.text_layer_var).pack(anchor="w", padx=10, pady=5)
+        
+        self.combined_var = ctk.BooleanVar(
+            value=get_config().get("pdf.combined_output", True))
+        ctk.CTkCheckBox(convert_frame, text="合併輸出（單一 Markdown + 頁面索引）", 
+                       variable=self.combined_var).pack(anchor="w", padx=10, pady=5)
+        
+        self.resume_var = ctk.BooleanVar(value=get_config().get("jobs.resume", True))
+        ctk.CTkCheckBox(convert_frame, text="續傳（跳過已完成頁面）", 
+                       variable=self.resume_var).pack(anchor="w", padx=10, pady=5)
+        
+        self.save_images_var = ctk.BooleanVar(
+            value=get_config().get("pdf.save_page_images", False))
+        ctk.CTkCheckBox(convert_frame, text="保存頁面圖片（稽核用）", 
+                       variable=self.save_images_var).pack(anchor="w", padx=10, pady=5)
+        
         # 處理按鈕
         self.process_button = ctk.CTkButton(self, text="🚀 開始處理", 
                                            command=self.start_process, 
@@ -178,8 +216,11 @@ class PDFTab(ctk.CTkFrame):
                     info_text = f"""檔案: {info['file_name']}
 大小: {info['file_size_mb']:.2f} MB
 總頁數: {info['total_pages']} 頁
-第一頁尺寸: {info['first_page_size']}
+第一頁尺寸: {info['first_page_size']} pt
 預估轉換時間: {info['estimated_conversion_time']} 秒"""
+                    title = info.get('metadata', {}).get('Title')
+                    if title:
+                        info_text = f"標題: {title}\n" + info_text
                     self.pdf_info_text.insert("1.0", info_text)
                     
                     # 更新頁碼範圍
@@ -207,6 +248,10 @@ class PDFTab(ctk.CTkFrame):
             messagebox.showwarning("警告", "已在處理中")
             return
         
+        if self.ocr_engine is None:
+            messagebox.showinfo("提示", "推理元件載入中，請稍候")
+            return
+        
         # 禁用按鈕
         self.process_button.configure(state="disabled", text="處理中...")
         self.is_processing = True
@@ -218,18 +263,39 @@ class PDFTab(ctk.CTkFrame):
     
     def _process_pdf_thread(self):
         """PDF 處理執行緒"""
-        import time
+        import json
+        import shutil
         from src import PDFConverter
+        from src.pdf_converter import PageImageWriter
+        from src.config_loader import get_config
+        from src.image_processor import DuplicateIndex
+        from src.job_manifest import JobManifest, compute_content_hash
+        from src.document_writer import DocumentWriter
+        
+        image_writer = None
+        document_writer = None
+        scratch_dir = None
         
         try:
             # 步驟 1: 轉換 PDF
             self.after(0, lambda: self.convert_label.configure(text="正在轉換 PDF..."))
             
+            # OCR 解析度模式：轉換 DPI 與模型輸入使用相同設定
+            config = get_config()
+            ocr_mode = (
+                config.get("model.base_size", 1024),
+                config.get("model.image_size", 1024),
+                config.get("model.crop_mode", False)
+            )
+            
             # 建立轉換器
             converter = PDFConverter(
                 dpi=self.dpi_var.get(),
                 output_format=self.format_var.get(),
-                max_pages=self.max_pages_var.get()
+                max_pages=self.max_pages_var.get(),
+                workers=config.get("pdf.workers", 1),
+                ocr_mode=ocr_mode if self.auto_dpi_var.get() else None,
+                ram_budget_mb=config.get("pdf.ram_budget_mb")
             )
             
             # 設定頁碼範圍
@@ -237,60 +303,203 @@ class PDFTab(ctk.CTkFrame):
             if self.page_mode_var.get() == "range":
                 page_range = (self.start_page_var.get(), self.end_page_var.get())
             
-            # 轉換 PDF
-            pdf_images_dir = Path(self.output_dir_var.get()) / "pdf_images"
-            conversion_result = converter.convert_pdf(
-                self.current_pdf_path,
-                pdf_images_dir,
-                page_range=page_range,
-                prefix=self.current_pdf_path.stem
-            )
-            
-            if not conversion_result.success:
-                raise Exception(conversion_result.error_message)
-            
-            self.after(0, lambda: self.convert_progress.set(1.0))
-            self.after(0, lambda: self.convert_label.configure(
-                text=f"✓ 完成: {conversion_result.converted_pages} 頁"))
-            
-            # 步驟 2: OCR 處理
-            self.after(0, lambda: self.ocr_label.configure(text="正在進行 OCR..."))
-            
             # 確保模型已載入
             if not self.ocr_engine._model_loaded:
+                self.after(0, lambda: self.ocr_label.configure(text="載入模型..."))
                 self.ocr_engine.load_model()
             
-            # 批次處理圖片
-            image_paths = [Path(p) for p in conversion_result.image_paths]
-            total = len(image_paths)
+            # 頁面邊轉換邊辨識：背景執行緒轉換，記憶體只保留少量頁面
+            first_page, last_page = converter.resolve_page_range(self.current_pdf_path, page_range)
+            total = last_page - first_page + 1
             successful = 0
+            skipped = 0
+            text_pages = 0
+            output_dir = Path(self.output_dir_var.get())
+            pdf_images_dir = output_dir / "pdf_images"
+            image_ext = self.format_var.get().lower()
+            
+            # 工作清單：記錄每頁完成狀態，重新執行時跳過已完成頁面、重試失敗頁面
+            # 輸出配置（合併輸出或逐頁目錄、輸出位置）改變時舊紀錄不再有效
+            pdf_hash = compute_content_hash(self.current_pdf_path)
+            manifest = JobManifest(output_dir, settings={
+                'dpi': converter.dpi,
+                'ocr_mode': ocr_mode,
+                'auto_dpi': converter.ocr_mode is not None,
+                'use_text_layer': self.text_layer_var.get(),
+                'skip_blank': self.skip_blank_var.get(),
+                'dedup': self.dedup_var.get(),
+                'combined_output': self.combined_var.get(),
+                'output_dir': str(output_dir.resolve())
+            })
+            page_key = lambda page_num: f"{self.current_pdf_path.name}#page={page_num}"
+            pending_pages = [
+                page_num for page_num in range(first_page, last_page + 1)
+                if not (self.resume_var.get() and manifest.is_done(page_key(page_num), pdf_hash))
+            ]
+            completed = total - len(pending_pages)
+            successful += completed
+            if completed:
+                print(f"續傳: 跳過 {completed} 個已完成頁面")
+            
+            # 合併輸出：頁面完成即寫入單一 Markdown 與索引，模型輸出只暫存於一個工作目錄
+            if self.combined_var.get():
+                document_writer = DocumentWriter(output_dir, self.current_pdf_path.stem,
+                                                 resume=self.resume_var.get())
+                scratch_dir = output_dir / f".{self.current_pdf_path.stem}_work"
             
-            for i, image_path in enumerate(image_paths):
-                # 更新進度
+            # 頁面圖片只在需要稽核時於背景寫入，OCR 直接使用記憶體中的頁面
+            if self.save_images_var.get():
+                image_writer = PageImageWriter(converter.output_format)
+            
+            # 重複頁偵測（逐頁比對已辨識的代表頁）
+            duplicate_index = None
+            hash_size = config.get("dedup.hash_size", 16)
+            duplicates = {}
+            if self.dedup_var.get() and len(pending_pages) > 1:
+                duplicate_index = DuplicateIndex(config.get("dedup.max_distance", 10))
+            
+            self.after(0, lambda: self.ocr_label.configure(text="正在進行 OCR..."))
+            
+            # 有可用文字層的頁面直接取文字，只有掃描頁才轉換並 OCR
+            pages = converter.iter_document(
+                self.current_pdf_path,
+                page_range=(first_page, last_page),
+                chunk_size=STREAM_CHUNK_SIZE,
+                prefetch=STREAM_CHUNK_SIZE,
+                use_text_layer=self.text_layer_var.get(),
+                pages=pending_pages
+            )
+            
+            for i, page in enumerate(pages, completed):
+                page_num, image = page.page_number, page.image
+                
+                # 步驟 1 進度：頁面已轉換
+                if image_writer is not None and image is not None:
+                    image_writer.submit(
+                        image,
+                        pdf_images_dir / f"{self.current_pdf_path.stem}_{page_num:04d}.{image_ext}"
+                    )
+                
+                self.after(0, lambda p=(i + 1) / total: self.convert_progress.set(p))
+                self.after(0, lambda i=i, t=total: self.convert_label.configure(
+                    text=f"轉換中: {i+1}/{t}"))
+                
+                # 步驟 2 進度
                 progress = (i + 1) / total
                 self.after(0, lambda p=progress: self.ocr_progress.set(p))
                 self.after(0, lambda i=i, t=total: self.ocr_label.configure(
                     text=f"處理中: {i+1}/{t}"))
                 
+                # 以實際頁碼命名，續傳時輸出位置不變
+                if document_writer is not None:
+                    shutil.rmtree(scratch_dir, ignore_errors=True)
+                    page_dir = scratch_dir
+                    page_output = f"{document_writer.markdown_path}#page-{page_num}"
+                else:
+                    page_dir = output_dir / f"page_{page_num:04d}"
+                    page_output = str(page_dir)
+                
+                # 文字層頁面直接輸出，不經過模型
+                if page.source == "text_layer":
+                    if document_writer is not None:
+                        document_writer.write_page(page_num, page.text, source=page.source)
+                    else:
+                        page_dir.mkdir(parents=True, exist_ok=True)
+                        with open(page_dir / "result.mmd", 'w', encoding='utf-8') as f:
+                            f.write(page.text)
+                    manifest.mark_done(page_key(page_num), pdf_hash,
+                                       output=page_output, source=page.source)
+                    text_pages += 1
+                    successful += 1
+                    continue
+                
+                # 重複頁沿用代表頁輸出（感知雜湊篩選候選，像素內容相同才沿用）
+                page_hash = page_digest = None
+                if duplicate_index is not None:
+                    page_hash = self.ocr_engine.image_processor.compute_perceptual_hashes(
+                        [image], hash_size=hash_size)[0]
+                    page_digest = self.ocr_engine.image_processor.compute_content_digest(image)
+                    representative = duplicate_index.match(page_hash, page_digest)
+                    if representative is not None:
+                        if document_writer is not None:
+                            document_writer.write_page(
+                                page_num, document_writer.read_text(representative) or "",
+                                duplicate_of=representative)
+                        else:
+                            source_dir = output_dir / f"page_{representative:04d}"
+                            if source_dir.exists():
+                                shutil.copytree(source_dir, page_dir, dirs_exist_ok=True)
+                        duplicates[page_num] = representative
+                        manifest.mark_done(page_key(page_num), pdf_hash,
+                                           output=page_output, duplicate_of=representative)
+                        successful += 1
+                        continue
+                
                 # 處理圖片
                 try:
                     result = self.ocr_engine.process_image(
-                        image_path,
-                        output_path=f"{self.output_dir_var.get()}/page_{i+1:04d}",
-                        save_results=True
+                        image,
+                        base_size=ocr_mode[0],
+                        image_size=ocr_mode[1],
+                        crop_mode=ocr_mode[2],
+                        output_path=str(page_dir),
+                        save_results=True,
+                        skip_blank=self.skip_blank_var.get(),
+                        source_path=f"{self.current_pdf_path}#page={page_num}"
                     )
                     
+                    if document_writer is not None:
+                        document_writer.write_page(
+                            page_num,
+                            result.text_content,
+                            status='done' if result.success else 'failed',
+                            source=result.source,
+                            processing_time=result.processing_time,
+                            assets_dir=page_dir,
+                            skipped_blank=result.skipped_blank,
+                            error=result.error_message
+                        )
+                    
                     if result.success:
                         successful += 1
+                        manifest.mark_done(page_key(page_num), pdf_hash,
+                                           output=page_output, source=result.source,
+                                           skipped_blank=result.skipped_blank,
+                                           processing_time=result.processing_time)
+                        if duplicate_index is not None:
+                            duplicate_index.add(page_hash, page_num, page_digest)
+                    else:
+                        manifest.mark_failed(page_key(page_num), pdf_hash,
+                                             result.error_message or "未知錯誤")
+                    if result.skipped_blank:
+                        skipped += 1
                 
                 except Exception as e:
-                    print(f"處理頁面 {i+1} 失敗: {e}")
+                    if document_writer is not None:
+                        document_writer.write_page(page_num, "", status='failed', error=str(e))
+                    manifest.mark_failed(page_key(page_num), pdf_hash, str(e))
+                    print(f"處理頁面 {page_num} 失敗: {e}")
+            
+            self.after(0, lambda: self.convert_label.configure(
+                text=f"✓ 完成: {total} 頁"))
+            
+            # 記錄去重結果（頁碼 -> 代表頁碼），續傳時保留先前的紀錄；合併輸出時已記錄於索引
+            if duplicates and document_writer is None:
+                duplicates_file = output_dir / "duplicates.json"
+                recorded = {}
+                if duplicates_file.exists():
+                    with open(duplicates_file, 'r', encoding='utf-8') as f:
+                        recorded = json.load(f)
+                recorded.update({str(k): v for k, v in duplicates.items()})
+                with open(duplicates_file, 'w', encoding='utf-8') as f:
+                    json.dump(recorded, f, indent=2)
             
             # 完成
             self.after(0, lambda: self.ocr_label.configure(
                 text=f"✓ 完成: {successful}/{total} 頁"))
             self.after(0, lambda: self.pages_label.configure(
-                text=f"成功處理 {successful} 頁，失敗 {total - successful} 頁"))
+                text=f"成功處理 {successful} 頁（文字層 {text_pages} 頁，空白頁跳過 {skipped} 頁，重複沿用 {len(duplicates)} 頁），"
+                     f"失敗 {total - successful} 頁"))
             
             if self.status_callback:
                 self.status_callback(f"PDF 處理完成: {successful}/{total} 頁")
@@ -303,8 +512,15 @@ class PDFTab(ctk.CTkFrame):
             self.after(0, lambda msg=error_msg: messagebox.showerror("錯誤", f"PDF 處理失敗:\n{msg}"))
         
         finally:
+            if image_writer is not None:
+                image_writer.close()
+            if document_writer is not None:
+                document_writer.close()
+            if scratch_dir is not None:
+                shutil.rmtree(scratch_dir, ignore_errors=True)
+            
             # 恢復按鈕
             self.after(0, lambda: self.process_button.configure(
                 state="normal", text="🚀 開始處理"))
             self.is_processing = False
-    
+
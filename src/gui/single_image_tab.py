@@ -192,6 +192,10 @@ class SingleImageTab(ctk.CTkFrame):
             messagebox.showwarning("警告", "請先選擇圖片")
             return
         
+        if self.ocr_engine is None:
+            messagebox.showinfo("提示", "推理元件載入中，請稍候")
+            return
+        
         # 禁用按鈕
         self.process_button.configure(state="disabled", text="處理中...")
         
@@ -217,7 +221,8 @@ class SingleImageTab(ctk.CTkFrame):
                 image_size=self.image_size_var.get(),
                 crop_mode=self.crop_mode_var.get(),
                 save_results=self.save_results_var.get(),
-                output_path="outputs/gui_single"
+                output_path="outputs/gui_single",
+                priority="interactive"  # 使用者正在等待，優先於批次 / PDF 頁面
             )
             
             self.current_result = result
@@ -0,0 +1,380 @@
+"""
+監看資料夾模組
+監看一或多個資料夾，新檔案寫入完成後排入持久化工作佇列，由常駐的工作者持續處理，
+模型保持載入狀態，不必每次手動新增資料夾再開始批次
+
+- 有安裝 watchdog 時使用作業系統的檔案通知（inotify / ReadDirectoryChangesW / FSEvents），
+  並以較長的間隔補掃描（網路磁碟可能漏掉通知）；沒有安裝時改為定期輪詢
+- 檔案大小與修改時間在 settle_seconds 內都沒有變化、且可以開啟讀取，才視為寫入完成
+- 以內容雜湊去除重複檔案（同一份掃描以不同檔名放入、或重新複製同一檔案只處理一次）
+
+命令列:
+    python -m src.hot_folder <資料夾>... [--output outputs/hotfolder]
+"""
+
+import os
+import sys
+import time
+import argparse
+import threading
+from pathlib import Path
+from typing import Optional, List, Dict, Tuple, Union, Callable, Any
+import logging
+
+from .image_processor import ImageProcessor
+from .job_manifest import JobManifest, compute_content_hash
+from .job_queue import JobQueue, QueueWorker
+
+logger = logging.getLogger(__name__)
+
+# 監看的檔案類型
+WATCH_EXTENSIONS = set(ImageProcessor.SUPPORTED_FORMATS) | {'.tif', '.pdf'}
+
+# 佇列名稱
+HOT_FOLDER_QUEUE = 'hotfolder'
+
+# 使用檔案通知時，補掃描的間隔（秒）
+RESCAN_INTERVAL = 60.0
+
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+    WATCHDOG_AVAILABLE = True
+except ImportError:
+    Observer = None
+    FileSystemEventHandler = object
+    WATCHDOG_AVAILABLE = False
+
+
+def is_watched_file(path: Path) -> bool:
+    """檢查是否為要處理的檔案（略過隱藏檔與 Office 暫存檔）"""
+    name = path.name
+    if name.startswith('.') or name.startswith('~$'):
+        return False
+    return path.suffix.lower() in WATCH_EXTENSIONS
+
+
+def _file_signature(path: Path) -> Optional[Tuple[int, int]]:
+    """取得 (大小, 修改時間)，檔案已不存在時回傳 None"""
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+
+def _can_open(path: Path) -> bool:
+    """檢查檔案是否可以讀取（Windows 上寫入中的檔案通常被鎖定）"""
+    try:
+        with open(path, 'rb'):
+            return True
+    except OSError:
+        return False
+
+
+class _EventHandler(FileSystemEventHandler):
+    """將 watchdog 事件轉交給 HotFolderWatcher"""
+    
+    def __init__(self, watcher: "HotFolderWatcher"):
+        super().__init__()
+        self.watcher = watcher
+    
+    def on_created(self, event):
+        if not event.is_directory:
+            self.watcher.notify(event.src_path)
+    
+    def on_modified(self, event):
+        if not event.is_directory:
+            self.watcher.notify(event.src_path)
+    
+    def on_moved(self, event):
+        if not event.is_directory:
+            self.watcher.notify(event.dest_path)
+
+
+class HotFolderWatcher:
+    """監看資料夾並把寫入完成的新檔案排入工作佇列"""
+    
+    def __init__(
+        self,
+        folders: List[Union[str, Path]],
+        job_queue: JobQueue,
+        state_dir: Union[str, Path] = "./outputs/hotfolder",
+        queue: str = HOT_FOLDER_QUEUE,
+        options: Optional[Dict[str, Any]] = None,
+        priority: Union[int, str] = 'normal',
+        recursive: bool = True,
+        settle_seconds: float = 2.0,
+        poll_interval: float = 5.0,
+        use_watchdog: bool = True,
+        on_enqueued: Optional[Callable[[Path, int], None]] = None
+    ):
+        """
+        初始化監看器
+        
+        Args:
+            folders: 要監看的資料夾
+            job_queue: 新檔案要排入的 JobQueue
+            state_dir: 保存已排入檔案雜湊的目錄（或 .jsonl 檔案路徑）
+            queue: 佇列名稱
+            options: 排入工作時附帶的 OCR 參數
+            priority: 工作優先順序
+            recursive: 是否包含子資料夾
+            settle_seconds: 檔案需保持不變多久才視為寫入完成
+            poll_interval: 輪詢間隔（秒）
+            use_watchdog: 有安裝 watchdog 時是否使用檔案通知
+            on_enqueued: 排入工作後的回呼 (檔案路徑, 工作 ID)
+        """
+        self.folders = [Path(folder) for folder in folders]
+        self.job_queue = job_queue
+        self.queue = queue
+        self.options = options or {}
+        self.priority = priority
+        self.recursive = recursive
+        self.settle_seconds = settle_seconds
+        self.poll_interval = poll_interval
+        self.use_watchdog = use_watchdog and WATCHDOG_AVAILABLE
+        self.on_enqueued = on_enqueued
+        
+        # 已排入檔案的內容雜湊（鍵與雜湊相同），重新啟動後仍不重複排入
+        self.seen = JobManifest(state_dir, settings={'queue': queue})
+        
+        # 等待寫入完成的檔案: {路徑: (簽章, 簽章開始不變的時間)}
+        self._pending: Dict[Path, Tuple[Tuple[int, int], float]] = {}
+        # 已處理過的檔案簽章，輪詢與重新啟動時不必重新計算雜湊
+        self._known: Dict[Path, Tuple[int, int]] = {}
+        for record in self.seen.records():
+            if 'path' in record and 'size' in record:
+                self._known[Path(record['path'])] = (record['size'], record['mtime_ns'])
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._observer = None
+        
+        self.stats = {'enqueued': 0, 'duplicates': 0, 'errors': 0}
+    
+    def notify(self, path: Union[str, Path]):
+        """標記檔案有變動（由檔案通知或掃描呼叫）"""
+        path = Path(path)
+        if not is_watched_file(path):
+            return
+        
+        signature = _file_signature(path)
+        if signature is None:
+            return
+        
+        with self._lock:
+            if self._known.get(path) == signature:
+                return
+            current = self._pending.get(path)
+            if current is None or current[0] != signature:
+                self._pending[path] = (signature, time.time())
+    
+    def scan(self):
+        """掃描所有監看資料夾，找出新的或有變動的檔案"""
+        for folder in self.folders:
+            if not folder.is_dir():
+                continue
+            walker = folder.rglob('*') if self.recursive else folder.iterdir()
+            for path in walker:
+                if path.is_file():
+                    self.notify(path)
+    
+    def check_pending(self) -> int:
+        """
+        排入已寫入完成的檔案
+        
+        Returns:
+            本次排入的工作數
+        """
+        now = time.time()
+        ready = []
+        with self._lock:
+            for path, (signature, since) in list(self._pending.items()):
+                current = _file_signature(path)
+                if current is None:
+                    del self._pending[path]
+                elif current != signature:
+                    self._pending[path] = (current, now)
+                elif now - since >= self.settle_seconds:
+                    ready.append((path, signature))
+        
+        enqueued = 0
+        for path, signature in ready:
+            if not _can_open(path):
+                continue
+            with self._lock:
+                self._pending.pop(path, None)
+            try:
+                added = self._enqueue(path, signature)
+            except Exception as e:
+                # 暫時性錯誤（例如資料庫鎖定）：不記為已處理，下次掃描時重新排入
+                self.stats['errors'] += 1
+                logger.error(f"排入 {path} 失敗，下次掃描時重試: {e}")
+                continue
+            with self._lock:
+                self._known[path] = signature
+            if added:
+                enqueued += 1
+        return enqueued
+    
+    def _enqueue(self, path: Path, signature: Tuple[int, int]) -> bool:
+        """
+        計算雜湊並排入工作（內容重複時略過）
+        
+        Returns:
+            是否排入新工作
+        
+        Raises:
+            Exception: 讀取檔案或寫入佇列失敗
+        """
+        content_hash = compute_content_hash(path)
+        if self.seen.is_done(content_hash, content_hash):
+            self.stats['duplicates'] += 1
+            logger.info(f"略過重複檔案: {path.name}（與 {self.seen.get(content_hash).get('path')} 相同）")
+            return False
+        
+        job_id = self.job_queue.enqueue(path, self.options, self.priority, self.queue)
+        if job_id is None:
+            return False
+        self.seen.mark_done(content_hash, content_hash, path=str(path), job_id=job_id,
+                            size=signature[0], mtime_ns=signature[1])
+        
+        self.stats['enqueued'] += 1
+        logger.info(f"排入新檔案: {path.name}（工作 {job_id}）")
+        if self.on_enqueued:
+            self.on_enqueued(path, job_id)
+        return True
+    
+    def start(self):
+        """開始監看（背景執行緒）"""
+        if self._thread is not None:
+            return
+        
+        for folder in self.folders:
+            folder.mkdir(parents=True, exist_ok=True)
+        
+        if self.use_watchdog:
+            self._observer = Observer()
+            handler = _EventHandler(self)
+            for folder in self.folders:
+                self._observer.schedule(handler, str(folder), recursive=self.recursive)
+            self._observer.start()
+        
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="hot-folder", daemon=True)
+        self._thread.start()
+        
+        mode = "檔案通知" if self.use_watchdog else f"輪詢（每 {self.poll_interval:.0f} 秒）"
+        logger.info(f"開始監看 {len(self.folders)} 個資料夾，模式: {mode}")
+    
+    def _run(self):
+        """監看主迴圈：檔案通知只標記變動，寫入完成的判斷都在這裡進行"""
+        # 啟動時先掃描一次，處理停止期間放入的檔案
+        self.scan()
+        last_scan = time.time()
+        scan_interval = RESCAN_INTERVAL if self.use_watchdog else self.poll_interval
+        check_interval = min(self.poll_interval, max(0.2, self.settle_seconds / 2))
+        
+        while not self._stop_event.wait(check_interval):
+            if time.time() - last_scan >= scan_interval:
+                self.scan()
+                last_scan = time.time()
+            self.check_pending()
+    
+    def stop(self):
+        """停止監看"""
+        self._stop_event.set()
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join()
+            self._observer = None
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        logger.info("已停止監看")
+    
+    @property
+    def pending_count(self) -> int:
+        """等待寫入完成的檔案數"""
+        with self._lock:
+            return len(self._pending)
+    
+    def __enter__(self):
+        self.start()
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+
+def main():
+    from .config_loader import get_config
+    from .logger import setup_logger
+    
+    config = get_config()
+    
+    parser = argparse.ArgumentParser(description='DeepSeek-OCR 監看資料夾')
+    parser.add_argument('folders', nargs='*', help='要監看的資料夾（預設使用設定檔 hot_folder.folders）')
+    parser.add_argument('--output', default=config.get('hot_folder.output_dir', './outputs/hotfolder'),
+                        help='輸出目錄')
+    parser.add_argument('--model', default=config.get('paths.model_dir', './models/deepseek-ocr'),
+                        help='模型路徑')
+    parser.add_argument('--settle', type=float, default=config.get('hot_folder.settle_seconds', 2.0),
+                        help='檔案保持不變多少秒才開始處理')
+    parser.add_argument('--poll', type=float, default=config.get('hot_folder.poll_interval', 5.0),
+                        help='輪詢間隔（秒）')
+    parser.add_argument('--no-watchdog', action='store_true', help='不使用檔案通知，只輪詢')
+    parser.add_argument('--crop', action='store_true', help='啟用裁切模式')
+    args = parser.parse_args()
+    
+    folders = args.folders or config.get('hot_folder.folders', [])
+    if not folders:
+        print("錯誤: 請指定要監看的資料夾")
+        sys.exit(1)
+    
+    setup_logger("hot_folder", console_output=True, file_output=True)
+    
+    from .ocr_engine import OCREngine
+    
+    job_queue = JobQueue(
+        config.get('queue.db_path', './outputs/queue/jobs.db'),
+        lease_seconds=config.get('queue.lease_seconds', 600),
+        max_attempts=config.get('queue.max_attempts', 3)
+    )
+    watcher = HotFolderWatcher(
+        folders,
+        job_queue,
+        state_dir=args.output,
+        options={'crop_mode': True} if args.crop else {},
+        settle_seconds=args.settle,
+        poll_interval=args.poll,
+        use_watchdog=not args.no_watchdog
+    )
+    
+    engine = OCREngine(model_path=args.model)
+    engine.load_model()
+    
+    worker = QueueWorker(job_queue, engine, args.output, queue=HOT_FOLDER_QUEUE)
+    stop_event = threading.Event()
+    
+    print(f"監看中: {', '.join(str(f) for f in folders)}（Ctrl+C 結束）")
+    if not WATCHDOG_AVAILABLE and not args.no_watchdog:
+        print("未安裝 watchdog，改用輪詢（pip install watchdog 可即時偵測新檔案）")
+    
+    watcher.start()
+    try:
+        worker.run(stop_event, wait=True, poll_interval=1.0)
+    except KeyboardInterrupt:
+        stop_event.set()
+    finally:
+        watcher.stop()
+        print(f"已排入 {watcher.stats['enqueued']} 個檔案，略過重複 {watcher.stats['duplicates']} 個")
+
+
+if __name__ == '__main__':
+    if os.name == 'nt':
+        import codecs
+        sys.stdout = codecs.getwriter('utf-8')(sys.stdout.buffer, 'strict')
+        sys.stderr = codecs.getwriter('utf-8')(sys.stderr.buffer, 'strict')
+    main()
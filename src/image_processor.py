@@ -5,27 +5,80 @@
 
 from PIL import Image
 from pathlib import Path
-from typing import Union, Tuple, Optional
+from typing import Union, Tuple, Optional, Sequence, List, Hashable
+from dataclasses import dataclass
+import numpy as np
+import hashlib
 import logging
+import warnings
 
 # 設定日誌
 logger = logging.getLogger(__name__)
 
 
+@dataclass
+class BlankPageConfig:
+    """空白頁偵測門檻設定"""
+    thumbnail_size: int = 256              # 縮圖最長邊（像素）
+    min_std: float = 2.0                   # 灰階標準差低於此值視為均勻空白
+    ink_delta: int = 60                    # 比背景暗多少視為墨跡
+    max_ink_ratio: float = 0.001           # 墨跡覆蓋率超過此值視為有內容
+    min_component_area: int = 4            # 連通區塊最小面積（縮圖像素）
+    max_components: int = 3                # 有效連通區塊數不超過此值視為近空白
+    enabled: bool = True                   # 未指定 skip_blank 時是否跳過空白頁
+    
+    @classmethod
+    def from_config(cls) -> "BlankPageConfig":
+        """
+        依 system_config.json 的 blank_detection 區段建立設定
+        
+        Returns:
+            BlankPageConfig 實例（設定無效時使用預設門檻）
+        """
+        from src.config_loader import get_config
+        
+        settings = dict(get_config().get('blank_detection', {}) or {})
+        try:
+            return cls(**settings)
+        except TypeError as e:
+            logger.warning(f"空白頁偵測設定無效，使用預設門檻: {e}")
+            return cls(enabled=bool(settings.get('enabled', True)))
+
+
+@dataclass
+class BlankPageResult:
+    """空白頁偵測結果資料類別"""
+    is_blank: bool
+    ink_ratio: float                       # 墨跡覆蓋率
+    gray_std: float                        # 灰階標準差
+    components: int                        # 有效連通區塊數
+    reason: str = ""                       # 判定原因
+
+
 class ImageProcessor:
     """圖片預處理類別"""
     
     # 支援的圖片格式
     SUPPORTED_FORMATS = {'.png', '.jpg', '.jpeg', '.bmp', '.tiff', '.webp'}
     
-    def __init__(self, max_size: Optional[int] = None):
+    # 模型正規化參數（與 BasicImageTransform 相同）
+    MODEL_MEAN = (0.5, 0.5, 0.5)
+    MODEL_STD = (0.5, 0.5, 0.5)
+    
+    def __init__(
+        self,
+        max_size: Optional[int] = None,
+        blank_config: Optional[BlankPageConfig] = None
+    ):
         """
         初始化圖片處理器
         
         Args:
             max_size: 最大圖片尺寸（像素），None 表示不限制
+            blank_config: 空白頁偵測門檻，None 使用預設值
         """
         self.max_size = max_size
+        self.blank_config = blank_config or BlankPageConfig()
         logger.info(f"ImageProcessor 初始化，最大尺寸: {max_size or '無限制'}")
     
     def load_image(self, image_path: Union[str, Path]) -> Image.Image:
@@ -158,6 +211,122 @@ class ImageProcessor:
         logger.info(f"圖片預處理完成: {image_path.name}")
         return image, info
     
+    def to_model_tensor(
+        self,
+        image: Image.Image,
+        size: int,
+        dtype=None,
+        out=None
+    ):
+        """
+        將圖片 letterbox 並轉為模型輸入張量（正規化 + 轉型一次完成）
+        
+        Args:
+            image: PIL Image 物件
+            size: 目標邊長（正方形）
+            dtype: 輸出資料類型，None 表示 torch.bfloat16
+            out: 預先配置的 (3, size, size) 張量
+            
+        Returns:
+            (3, size, size) 張量
+        """
+        return pad_to_tensor(image, size, self.MODEL_MEAN, self.MODEL_STD, dtype=dtype, out=out)
+    
+    def batch_to_model_tensor(
+        self,
+        images: Sequence[Image.Image],
+        size: int,
+        dtype=None,
+        out=None
+    ):
+        """
+        批次 letterbox 並轉為模型輸入張量
+        
+        Args:
+            images: PIL Image 物件列表
+            size: 目標邊長（正方形）
+            dtype: 輸出資料類型，None 表示 torch.bfloat16
+            out: 預先配置的 (N, 3, size, size) 張量
+            
+        Returns:
+            (N, 3, size, size) 張量
+        """
+        return pad_batch_to_tensor(images, size, self.MODEL_MEAN, self.MODEL_STD, dtype=dtype, out=out)
+    
+    def detect_blank_page(
+        self,
+        image: Union[str, Path, Image.Image],
+        config: Optional[BlankPageConfig] = None
+    ) -> BlankPageResult:
+        """
+        以縮圖判斷頁面是否為空白或近空白
+        
+        依序檢查灰階變異、墨跡覆蓋率與連通區塊數，只在前兩項無法
+        判定時才計算連通區塊，因此一般文字頁面只需一次縮圖與統計。
+        
+        Args:
+            image: 圖片檔案路徑或 PIL Image 物件
+            config: 偵測門檻，None 則使用初始化時的設定
+            
+        Returns:
+            BlankPageResult 物件
+        """
+        config = config or self.blank_config
+        gray = _load_gray_thumbnail(image, config.thumbnail_size)
+        
+        gray_std = float(gray.std())
+        if gray_std < config.min_std:
+            return BlankPageResult(True, 0.0, gray_std, 0, reason='uniform')
+        
+        # 以中位數估計紙張背景亮度
+        background = float(np.median(gray))
+        ink = gray < (background - config.ink_delta)
+        ink_ratio = float(ink.mean())
+        
+        if ink_ratio > config.max_ink_ratio:
+            return BlankPageResult(False, ink_ratio, gray_std, -1, reason='ink')
+        
+        components = _count_components(ink, config.min_component_area, config.max_components + 1)
+        is_blank = components <= config.max_components
+        
+        return BlankPageResult(
+            is_blank,
+            ink_ratio,
+            gray_std,
+            components,
+            reason='sparse' if is_blank else 'components'
+        )
+    
+    @staticmethod
+    def compute_perceptual_hashes(
+        images: Sequence[Union[str, Path, Image.Image]],
+        hash_size: int = 16
+    ) -> np.ndarray:
+        """
+        批次計算感知雜湊（DCT pHash）
+        
+        Args:
+            images: 圖片檔案路徑或 PIL Image 物件列表
+            hash_size: 雜湊邊長，位元數為 hash_size²
+            
+        Returns:
+            (N, hash_size² / 8) uint8 陣列，每列為一張圖片的打包位元
+        """
+        return compute_perceptual_hashes(images, hash_size)
+    
+    @staticmethod
+    def compute_content_digest(image: Union[str, Path, Image.Image]) -> str:
+        """
+        計算圖片像素內容的 SHA-256 摘要
+        
+        Args:
+            image: 圖片檔案路徑或 PIL Image 物件
+        
+        Returns:
+            十六進位摘要字串
+        """
+        return compute_content_digest(image)
+    
     @staticmethod
     def get_image_info(image_path: Union[str, Path]) -> dict:
         """
@@ -220,6 +389,347 @@ class ImageProcessor:
             return False
 
 
+def _load_gray_thumbnail(image: Union[str, Path, Image.Image], size: int) -> np.ndarray:
+    """
+    載入灰階縮圖為 uint8 陣列
+    
+    以區塊最小值縮小（保留細筆畫墨跡，避免一般縮放把小字洗淡成背景），
+    JPEG 檔案會先以 draft 模式在解碼時縮小。
+    """
+    if isinstance(image, Image.Image):
+        gray = np.asarray(image.convert('L'))
+    else:
+        with Image.open(image) as img:
+            img.draft('L', (size * 2, size * 2))
+            gray = np.asarray(img.convert('L'))
+    
+    height, width = gray.shape
+    factor = max(1, -(-max(height, width) // size))
+    if factor > 1:
+        gray = gray[:height - height % factor, :width - width % factor]
+        gray = gray.reshape(height // factor, factor, width // factor, factor).min(axis=(1, 3))
+    return gray
+
+
+def _dct_matrix(n: int) -> np.ndarray:
+    """建立 n×n 的 DCT-II 正交矩陣"""
+    k = np.arange(n)[:, None]
+    i = np.arange(n)[None, :]
+    matrix = np.cos(np.pi * (2 * i + 1) * k / (2 * n)) * np.sqrt(2.0 / n)
+    matrix[0] /= np.sqrt(2.0)
+    return matrix.astype(np.float32)
+
+
+# 位元計數查表（0-255 各自的 1 位元數）
+_POPCOUNT_TABLE = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint16)
+
+
+def compute_perceptual_hashes(
+    images: Sequence[Union[str, Path, Image.Image]],
+    hash_size: int = 16
+) -> np.ndarray:
+    """
+    批次計算 DCT 感知雜湊
+    
+    每張圖片只解碼成 (4 × hash_size)² 的灰階縮圖，DCT、中位數比較與
+    位元打包則對整批縮圖一次以矩陣運算完成。
+    
+    Args:
+        images: 圖片檔案路徑或 PIL Image 物件列表
+        hash_size: 雜湊邊長，位元數為 hash_size²
+        
+    Returns:
+        (N, hash_size² / 8) uint8 陣列
+    """
+    side = hash_size * 4
+    thumbs = np.empty((len(images), side, side), dtype=np.float32)
+    
+    for i, image in enumerate(images):
+        if isinstance(image, Image.Image):
+            thumbs[i] = np.asarray(image.convert('L').resize((side, side), Image.BILINEAR))
+        else:
+            with Image.open(image) as img:
+                img.draft('L', (side * 2, side * 2))
+                thumbs[i] = np.asarray(img.convert('L').resize((side, side), Image.BILINEAR))
+    
+    dct = _dct_matrix(side)
+    coeffs = (dct @ thumbs @ dct.T)[:, :hash_size, :hash_size].reshape(len(images), -1)
+    
+    # 以不含 DC 分量的中位數為門檻
+    medians = np.median(coeffs[:, 1:], axis=1, keepdims=True)
+    return np.packbits(coeffs > medians, axis=1)
+
+
+def compute_content_digest(image: Union[str, Path, Image.Image]) -> str:
+    """
+    計算圖片像素內容的 SHA-256 摘要
+    
+    以解碼後的模式、尺寸與像素位元組計算，與檔案格式及中繼資料無關；
+    用於確認感知雜湊相近的頁面確實完全相同。
+    
+    Args:
+        image: 圖片檔案路徑或 PIL Image 物件
+    
+    Returns:
+        十六進位摘要字串
+    """
+    if not isinstance(image, Image.Image):
+        with Image.open(image) as img:
+            return compute_content_digest(img)
+    
+    digest = hashlib.sha256(f"{image.mode}:{image.size[0]}x{image.size[1]}:".encode('ascii'))
+    digest.update(image.tobytes())
+    return digest.hexdigest()
+
+
+def hamming_distances(hashes: np.ndarray, target: np.ndarray) -> np.ndarray:
+    """
+    計算多個雜湊與目標雜湊的漢明距離
+    
+    Args:
+        hashes: (N, B) uint8 打包雜湊
+        target: (B,) uint8 打包雜湊
+        
+    Returns:
+        (N,) 距離陣列
+    """
+    return _POPCOUNT_TABLE[np.bitwise_xor(hashes, target)].sum(axis=1)
+
+
+class DuplicateIndex:
+    """
+    近似重複頁面索引
+    
+    以代表頁的感知雜湊為索引篩選漢明距離在門檻內的候選代表頁，
+    再比對像素內容摘要，只有內容完全相同時才回傳代表頁鍵值；可逐頁（串流）或整批使用。
+    
+    只靠感知雜湊會把同一範本、只差幾個字的頁面（例如編號與金額不同的發票）
+    判為重複，沿用的辨識結果就會是錯的。
+    """
+    
+    def __init__(self, max_distance: int = 10):
+        """
+        初始化近似重複索引
+        
+        Args:
+            max_distance: 視為重複的最大漢明距離
+        """
+        self.max_distance = max_distance
+        self._hashes: Optional[np.ndarray] = None
+        self._keys: List[Hashable] = []
+        self._digests: List[str] = []
+    
+    def __len__(self) -> int:
+        return len(self._keys)
+    
+    def match(self, page_hash: np.ndarray, digest: str) -> Optional[Hashable]:
+        """
+        查詢重複的代表頁
+        
+        Args:
+            page_hash: (B,) uint8 打包雜湊
+            digest: 頁面的像素內容摘要（compute_content_digest）
+        
+        Returns:
+            代表頁鍵值，無符合時為 None
+        """
+        if self._hashes is None:
+            return None
+        
+        distances = hamming_distances(self._hashes, page_hash)
+        for candidate in np.argsort(distances, kind='stable'):
+            if distances[candidate] > self.max_distance:
+                break
+            if self._digests[candidate] == digest:
+                return self._keys[candidate]
+        return None
+    
+    def add(self, page_hash: np.ndarray, key: Hashable, digest: str):
+        """
+        加入代表頁
+        
+        Args:
+            page_hash: (B,) uint8 打包雜湊
+            key: 代表頁鍵值（例如檔案路徑或頁碼）
+            digest: 代表頁的像素內容摘要
+        """
+        row = page_hash[None, :]
+        self._hashes = row.copy() if self._hashes is None else np.vstack([self._hashes, row])
+        self._keys.append(key)
+        self._digests.append(digest)
+
+
+def group_near_duplicates(
+    hashes: np.ndarray,
+    digests: Sequence[str],
+    max_distance: int = 10
+) -> List[int]:
+    """
+    將重複頁面分組
+    
+    Args:
+        hashes: (N, B) uint8 打包雜湊
+        digests: 長度 N 的像素內容摘要
+        max_distance: 候選代表頁的最大漢明距離
+    
+    Returns:
+        長度 N 的列表，每個元素為其代表頁的索引（代表頁指向自己）
+    """
+    index = DuplicateIndex(max_distance)
+    representatives = []
+    
+    for i, page_hash in enumerate(hashes):
+        match = index.match(page_hash, digests[i])
+        if match is None:
+            index.add(page_hash, i, digests[i])
+            representatives.append(i)
+        else:
+            representatives.append(match)
+    
+    return representatives
+
+
+def _count_components(mask: np.ndarray, min_area: int, stop_at: int) -> int:
+    """
+    計算 8 連通區塊中面積達 min_area 的數量，達到 stop_at 即提前結束
+    
+    只走訪前景像素，近空白頁面前景很少，因此成本極低。
+    """
+    height, width = mask.shape
+    visited = np.zeros_like(mask, dtype=bool)
+    count = 0
+    
+    for start_y, start_x in zip(*np.nonzero(mask)):
+        if visited[start_y, start_x]:
+            continue
+        
+        visited[start_y, start_x] = True
+        stack = [(start_y, start_x)]
+        area = 0
+        while stack:
+            y, x = stack.pop()
+            area += 1
+            for ny in range(max(0, y - 1), min(height, y + 2)):
+                for nx in range(max(0, x - 1), min(width, x + 2)):
+                    if mask[ny, nx] and not visited[ny, nx]:
+                        visited[ny, nx] = True
+                        stack.append((ny, nx))
+        
+        if area >= min_area:
+            count += 1
+            if count >= stop_at:
+                break
+    
+    return count
+
+
+def _contain_size(image_size: Tuple[int, int], size: int) -> Tuple[int, int]:
+    """計算等比例縮放後的尺寸（與 ImageOps.contain 相同的捨入規則）"""
+    width, height = image_size
+    if width == height:
+        return size, size
+    if width > height:
+        return size, max(1, round(height / width * size))
+    return max(1, round(width / height * size)), size
+
+
+def pad_to_tensor(
+    image: Image.Image,
+    size: int,
+    mean: Tuple[float, float, float] = ImageProcessor.MODEL_MEAN,
+    std: Tuple[float, float, float] = ImageProcessor.MODEL_STD,
+    dtype=None,
+    out=None
+):
+    """
+    將圖片 letterbox 到 (size, size) 並直接寫入正規化後的張量
+    
+    結果等同於 ImageOps.pad(color=mean*255) + ToTensor + Normalize + .to(dtype)，
+    但只在 uint8 像素上做一次縮放，再以單一 addcmul 完成
+    scale / normalize / 轉型，避免建立多份全解析度 float 副本。
+    
+    Args:
+        image: PIL Image 物件
+        size: 目標邊長（正方形）
+        mean: 各通道平均值
+        std: 各通道標準差
+        dtype: 輸出資料類型，None 表示 torch.bfloat16
+        out: 預先配置的 (3, size, size) 張量，None 則自動配置
+        
+    Returns:
+        (3, size, size) 張量
+    """
+    import torch
+    
+    if image.mode != 'RGB':
+        image = image.convert('RGB')
+    
+    if out is None:
+        out = torch.empty((3, size, size), dtype=dtype or torch.bfloat16)
+    elif tuple(out.shape) != (3, size, size):
+        raise ValueError(f"輸出張量形狀錯誤: {tuple(out.shape)}，應為 (3, {size}, {size})")
+    
+    # 與 ImageOps.pad 相同的縮放與置中規則
+    new_width, new_height = _contain_size(image.size, size)
+    resized = image.resize((new_width, new_height), resample=Image.BICUBIC)
+    x = round((size - new_width) * 0.5)
+    y = round((size - new_height) * 0.5)
+    
+    # 正規化係數：(p / 255 - mean) / std = p * scale + bias
+    scale = torch.tensor([1.0 / (255.0 * s) for s in std], dtype=torch.float32).view(3, 1, 1)
+    bias = torch.tensor([-m / s for m, s in zip(mean, std)], dtype=torch.float32).view(3, 1, 1)
+    
+    # 填充色與 ImageOps.pad(color=int(mean * 255)) 相同
+    if new_width != size or new_height != size:
+        for c in range(3):
+            fill = int(mean[c] * 255)
+            out[c].fill_(fill / (255.0 * std[c]) - mean[c] / std[c])
+    
+    # uint8 像素直接以 (C, H, W) view 讀取，不額外複製（唯讀，僅作為輸入）
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', UserWarning)
+        pixels = torch.from_numpy(np.asarray(resized)).permute(2, 0, 1)
+    region = out[:, y:y + new_height, x:x + new_width]
+    torch.addcmul(bias, pixels, scale, out=region)
+    
+    return out
+
+
+def pad_batch_to_tensor(
+    images: Sequence[Image.Image],
+    size: int,
+    mean: Tuple[float, float, float] = ImageProcessor.MODEL_MEAN,
+    std: Tuple[float, float, float] = ImageProcessor.MODEL_STD,
+    dtype=None,
+    out=None
+):
+    """
+    批次版本的 pad_to_tensor，所有圖片寫入同一個預先配置的張量
+    
+    Args:
+        images: PIL Image 物件列表
+        size: 目標邊長（正方形）
+        mean: 各通道平均值
+        std: 各通道標準差
+        dtype: 輸出資料類型，None 表示 torch.bfloat16
+        out: 預先配置的 (N, 3, size, size) 張量，None 則自動配置
+        
+    Returns:
+        (N, 3, size, size) 張量
+    """
+    import torch
+    
+    if out is None:
+        out = torch.empty((len(images), 3, size, size), dtype=dtype or torch.bfloat16)
+    elif out.shape[0] < len(images):
+        raise ValueError(f"輸出張量批次大小不足: {out.shape[0]} < {len(images)}")
+    
+    for i, image in enumerate(images):
+        pad_to_tensor(image, size, mean, std, out=out[i])
+    
+    return out[:len(images)]
+
+
 # 便利函數
 def load_image(image_path: Union[str, Path], max_size: Optional[int] = None) -> Image.Image:
     """
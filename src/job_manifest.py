@@ -0,0 +1,196 @@
+"""
+工作清單（檢查點）模組
+以 JSONL 逐筆記錄每個頁面/檔案的輸入雜湊、設定與完成狀態，
+中斷後重新執行時可跳過已完成項目、重試失敗項目
+"""
+
+import os
+import json
+import hashlib
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Optional, List, Dict, Union, Any
+import logging
+
+logger = logging.getLogger(__name__)
+
+# 輸出目錄中的工作清單檔名
+MANIFEST_FILENAME = "manifest.jsonl"
+
+# 計算內容雜湊時每次讀取的位元組數
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def compute_content_hash(file_path: Union[str, Path]) -> str:
+    """
+    計算檔案內容的 SHA-256 雜湊
+    
+    Args:
+        file_path: 檔案路徑
+    
+    Returns:
+        十六進位雜湊字串
+    """
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def settings_fingerprint(settings: Dict[str, Any]) -> str:
+    """
+    計算設定的穩定指紋（鍵排序後的 JSON 雜湊）
+    
+    Args:
+        settings: 影響輸出結果的設定
+    
+    Returns:
+        16 字元的十六進位指紋
+    """
+    payload = json.dumps(settings, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
+
+class JobManifest:
+    """
+    工作清單
+    
+    只以附加方式寫入，同一項目以最後一筆紀錄為準；每筆紀錄寫入後立即 fsync，
+    行程被中止時最多遺失正在處理的那一筆。輸入雜湊或設定不同的紀錄不視為已完成。
+    """
+    
+    def __init__(self, path: Union[str, Path], settings: Optional[Dict[str, Any]] = None):
+        """
+        初始化工作清單
+        
+        Args:
+            path: 清單檔案路徑，或輸出目錄（使用 MANIFEST_FILENAME）
+            settings: 影響輸出結果的設定，用於判斷舊紀錄是否仍有效
+        """
+        path = Path(path)
+        if path.suffix != '.jsonl':
+            path = path / MANIFEST_FILENAME
+        
+        self.path = path
+        self.settings = settings or {}
+        self.fingerprint = settings_fingerprint(self.settings)
+        self._records: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._needs_newline = False
+        
+        self._load()
+    
+    def _load(self):
+        """讀取既有紀錄，忽略中斷時寫到一半的最後一行"""
+        if not self.path.exists():
+            return
+        
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line_num, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning(f"工作清單第 {line_num} 行無法解析，已忽略: {self.path}")
+                    continue
+                self._records[record['key']] = record
+        
+        # 中斷時最後一行可能沒有換行，下一筆紀錄需另起一行
+        with open(self.path, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            if f.tell() > 0:
+                f.seek(-1, os.SEEK_END)
+                self._needs_newline = f.read(1) != b'\n'
+        
+        logger.info(f"載入工作清單: {self.path}（{len(self._records)} 筆）")
+    
+    def is_done(self, key: str, input_hash: str) -> bool:
+        """
+        檢查項目是否已以相同輸入與設定完成
+        
+        Args:
+            key: 項目鍵（例如頁碼或檔案路徑）
+            input_hash: 輸入內容雜湊
+        
+        Returns:
+            True 如果可以跳過
+        """
+        record = self._records.get(key)
+        return (
+            record is not None
+            and record['status'] == 'done'
+            and record['input_hash'] == input_hash
+            and record['settings'] == self.fingerprint
+        )
+    
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """取得項目最後一筆紀錄"""
+        return self._records.get(key)
+    
+    def records(self) -> List[Dict[str, Any]]:
+        """取得所有項目的最後一筆紀錄"""
+        with self._lock:
+            return list(self._records.values())
+    
+    def mark_done(self, key: str, input_hash: str, **extra: Any):
+        """
+        記錄項目完成
+        
+        Args:
+            key: 項目鍵
+            input_hash: 輸入內容雜湊
+            **extra: 其他要保存的欄位（例如輸出路徑、處理時間）
+        """
+        self._append(key, input_hash, 'done', extra)
+    
+    def mark_failed(self, key: str, input_hash: str, error: str, **extra: Any):
+        """
+        記錄項目失敗（下次執行時會重試）
+        
+        Args:
+            key: 項目鍵
+            input_hash: 輸入內容雜湊
+            error: 錯誤訊息
+            **extra: 其他要保存的欄位
+        """
+        self._append(key, input_hash, 'failed', dict(extra, error=error))
+    
+    def _append(self, key: str, input_hash: str, status: str, extra: Dict[str, Any]):
+        """附加一筆紀錄並同步到磁碟"""
+        record = {
+            'key': key,
+            'input_hash': input_hash,
+            'settings': self.fingerprint,
+            'status': status,
+            'timestamp': datetime.now().isoformat(),
+            **extra
+        }
+        line = json.dumps(record, ensure_ascii=False, default=str) + '\n'
+        
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, 'a', encoding='utf-8') as f:
+                if self._needs_newline:
+                    f.write('\n')
+                    self._needs_newline = False
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+            self._records[key] = record
+    
+    def summary(self) -> Dict[str, int]:
+        """
+        統計目前設定下各狀態的項目數
+        
+        Returns:
+            {'done': n, 'failed': n}
+        """
+        counts = {'done': 0, 'failed': 0}
+        for record in self._records.values():
+            if record['settings'] == self.fingerprint:
+                counts[record['status']] = counts.get(record['status'], 0) + 1
+        return counts
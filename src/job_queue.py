@@ -0,0 +1,775 @@
+"""
+持久化工作佇列模組
+以 SQLite 保存待處理工作，支援優先順序、租約逾時回收與有限次數重試；
+GUI 或行程中斷後，未完成的工作仍保留在佇列中
+
+工作狀態: enqueued → leased → done / failed
+    租約逾時或持有者行程已結束的工作會重新排入佇列，
+    失敗次數達上限的工作標記為 failed 並保留錯誤訊息
+
+命令列:
+    python -m src.job_queue enqueue <圖片、PDF 或資料夾>... [--priority high]
+    python -m src.job_queue status
+    python -m src.job_queue work [--output outputs/queue]
+    python -m src.job_queue retry-failed
+"""
+
+import os
+import sys
+import json
+import time
+import socket
+import sqlite3
+import argparse
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional, List, Dict, Any, Union, Iterable, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+# 工作狀態
+STATUS_ENQUEUED = 'enqueued'
+STATUS_LEASED = 'leased'
+STATUS_DONE = 'done'
+STATUS_FAILED = 'failed'
+
+# 優先順序（數字越大越先處理）
+PRIORITIES = {
+    'high': 10,
+    'normal': 0,
+    'low': -10,
+}
+
+DEFAULT_DB_PATH = "./outputs/queue/jobs.db"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    queue TEXT NOT NULL DEFAULT 'default',
+    input_path TEXT NOT NULL,
+    options TEXT NOT NULL DEFAULT '{}',
+    priority INTEGER NOT NULL DEFAULT 0,
+    status TEXT NOT NULL DEFAULT 'enqueued',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL DEFAULT 3,
+    lease_owner TEXT,
+    lease_expires REAL,
+    error TEXT,
+    result_path TEXT,
+    enqueued_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_pick ON jobs (queue, status, priority DESC, id);
+CREATE INDEX IF NOT EXISTS idx_jobs_input ON jobs (input_path, status);
+"""
+
+
+@dataclass
+class QueuedJob:
+    """佇列工作資料類別"""
+    job_id: int                        # 工作 ID
+    queue: str                         # 佇列名稱
+    input_path: str                    # 輸入檔案路徑
+    options: Dict[str, Any]            # OCR 參數
+    priority: int                      # 優先順序
+    status: str                        # 工作狀態
+    attempts: int                      # 已嘗試次數（含目前租約）
+    max_attempts: int                  # 最多嘗試次數
+    lease_owner: Optional[str]         # 租約持有者
+    lease_expires: Optional[float]     # 租約到期時間
+    error: Optional[str]               # 最後一次錯誤訊息
+    result_path: Optional[str]         # 輸出路徑
+    enqueued_at: float                 # 排入時間
+    updated_at: float                  # 最後更新時間
+    finished_at: Optional[float]       # 完成時間
+    
+    @classmethod
+    def from_row(cls, row: sqlite3.Row) -> "QueuedJob":
+        data = dict(row)
+        data['job_id'] = data.pop('id')
+        data['options'] = json.loads(data['options'] or '{}')
+        return cls(**data)
+
+
+def default_worker_id() -> str:
+    """預設的租約持有者名稱（主機:PID）"""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class JobQueue:
+    """SQLite 工作佇列（可多執行緒、多行程共用同一個資料庫檔）"""
+    
+    def __init__(
+        self,
+        db_path: Union[str, Path] = DEFAULT_DB_PATH,
+        lease_seconds: float = 600.0,
+        max_attempts: int = 3
+    ):
+        """
+        初始化工作佇列
+        
+        Args:
+            db_path: 資料庫檔案路徑
+            lease_seconds: 租約時間（秒），逾時未完成的工作會被回收
+            max_attempts: 預設最多嘗試次數
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self._local = threading.local()
+        
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+    
+    def _connect(self) -> sqlite3.Connection:
+        """取得目前執行緒的連線（WAL 模式，允許讀寫並行）"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.db_path), timeout=30.0, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+    
+    def _transaction(self):
+        """以 BEGIN IMMEDIATE 開始寫入交易，避免多個工作者取得同一個工作"""
+        return _Transaction(self._connect())
+    
+    def enqueue(
+        self,
+        input_path: Union[str, Path],
+        options: Optional[Dict[str, Any]] = None,
+        priority: Union[int, str] = 0,
+        queue: str = 'default',
+        max_attempts: Optional[int] = None,
+        skip_pending: bool = True
+    ) -> Optional[int]:
+        """
+        排入一個工作
+        
+        Args:
+            input_path: 輸入檔案路徑
+            options: OCR 參數
+            priority: 優先順序（數字或 'high' / 'normal' / 'low'）
+            queue: 佇列名稱
+            max_attempts: 最多嘗試次數，None 使用預設值
+            skip_pending: 同一檔案已在佇列中（未完成）時不重複排入
+        
+        Returns:
+            工作 ID，略過時回傳 None
+        """
+        ids = self.enqueue_many([input_path], options, priority, queue, max_attempts, skip_pending)
+        return ids[0] if ids else None
+    
+    def enqueue_many(
+        self,
+        input_paths: Iterable[Union[str, Path]],
+        options: Optional[Dict[str, Any]] = None,
+        priority: Union[int, str] = 0,
+        queue: str = 'default',
+        max_attempts: Optional[int] = None,
+        skip_pending: bool = True
+    ) -> List[int]:
+        """
+        以單一交易排入多個工作
+        
+        Returns:
+            新工作的 ID 列表（略過的檔案不包含在內）
+        """
+        if isinstance(priority, str):
+            priority = PRIORITIES[priority]
+        options_json = json.dumps(options or {}, ensure_ascii=False, sort_keys=True)
+        max_attempts = max_attempts or self.max_attempts
+        now = time.time()
+        
+        job_ids = []
+        with self._transaction() as conn:
+            for input_path in input_paths:
+                input_path = str(Path(input_path).resolve())
+                if skip_pending and conn.execute(
+                    "SELECT 1 FROM jobs WHERE input_path = ? AND queue = ? AND status IN (?, ?)",
+                    (input_path, queue, STATUS_ENQUEUED, STATUS_LEASED)
+                ).fetchone():
+                    continue
+                
+                cursor = conn.execute(
+                    "INSERT INTO jobs (queue, input_path, options, priority, max_attempts, "
+                    "enqueued_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (queue, input_path, options_json, priority, max_attempts, now, now)
+                )
+                job_ids.append(cursor.lastrowid)
+        
+        if job_ids:
+            logger.info(f"排入 {len(job_ids)} 個工作（佇列 {queue}，優先順序 {priority}）")
+        return job_ids
+    
+    def lease(
+        self,
+        worker_id: Optional[str] = None,
+        queue: Optional[str] = None,
+        lease_seconds: Optional[float] = None
+    ) -> Optional[QueuedJob]:
+        """
+        取得優先順序最高的工作並加上租約
+        
+        Args:
+            worker_id: 租約持有者，None 使用 主機:PID
+            queue: 佇列名稱，None 表示所有佇列
+            lease_seconds: 租約時間，None 使用預設值
+        
+        Returns:
+            QueuedJob 物件，沒有可處理的工作時回傳 None
+        """
+        worker_id = worker_id or default_worker_id()
+        now = time.time()
+        expires = now + (lease_seconds or self.lease_seconds)
+        
+        with self._transaction() as conn:
+            self._reclaim(conn, now)
+            
+            sql = "SELECT id FROM jobs WHERE status = ?"
+            params: List[Any] = [STATUS_ENQUEUED]
+            if queue is not None:
+                sql += " AND queue = ?"
+                params.append(queue)
+            sql += " ORDER BY priority DESC, id LIMIT 1"
+            
+            row = conn.execute(sql, params).fetchone()
+            if row is None:
+                return None
+            
+            conn.execute(
+                "UPDATE jobs SET status = ?, attempts = attempts + 1, lease_owner = ?, "
+                "lease_expires = ?, updated_at = ? WHERE id = ?",
+                (STATUS_LEASED, worker_id, expires, now, row['id'])
+            )
+            job = conn.execute("SELECT * FROM jobs WHERE id = ?", (row['id'],)).fetchone()
+        
+        return QueuedJob.from_row(job)
+    
+    def _reclaim(self, conn: sqlite3.Connection, now: float) -> int:
+        """回收逾時或持有者已結束的租約（需在交易中呼叫）"""
+        stale = []
+        host_prefix = f"{socket.gethostname()}:"
+        for row in conn.execute(
+            "SELECT id, attempts, max_attempts, lease_owner, lease_expires FROM jobs WHERE status = ?",
+            (STATUS_LEASED,)
+        ):
+            owner = row['lease_owner'] or ''
+            expired = row['lease_expires'] is not None and row['lease_expires'] < now
+            # 同一台主機上持有者行程已不存在（例如 GUI 當機），不必等租約到期
+            dead_owner = owner.startswith(host_prefix) and not _pid_alive(owner[len(host_prefix):])
+            if expired or dead_owner:
+                reason = "租約逾時" if expired else f"持有者 {owner} 已結束"
+                stale.append((row, reason))
+        
+        for row, reason in stale:
+            if row['attempts'] >= row['max_attempts']:
+                conn.execute(
+                    "UPDATE jobs SET status = ?, lease_owner = NULL, lease_expires = NULL, "
+                    "error = ?, updated_at = ?, finished_at = ? WHERE id = ?",
+                    (STATUS_FAILED, reason, now, now, row['id'])
+                )
+            else:
+                conn.execute(
+                    "UPDATE jobs SET status = ?, lease_owner = NULL, lease_expires = NULL, "
+                    "error = ?, updated_at = ? WHERE id = ?",
+                    (STATUS_ENQUEUED, reason, now, row['id'])
+                )
+            logger.warning(f"回收工作 {row['id']}: {reason}")
+        
+        return len(stale)
+    
+    def heartbeat(self, job_id: int, worker_id: Optional[str] = None,
+                  lease_seconds: Optional[float] = None) -> bool:
+        """
+        延長租約
+        
+        Returns:
+            True 如果仍持有該工作的租約
+        """
+        worker_id = worker_id or default_worker_id()
+        now = time.time()
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET lease_expires = ?, updated_at = ? "
+                "WHERE id = ? AND status = ? AND lease_owner = ?",
+                (now + (lease_seconds or self.lease_seconds), now, job_id, STATUS_LEASED, worker_id)
+            )
+            return cursor.rowcount == 1
+    
+    def complete(self, job_id: int, worker_id: Optional[str] = None,
+                 result_path: Optional[str] = None) -> bool:
+        """
+        標記工作完成
+        
+        Returns:
+            True 如果仍持有租約並已更新（租約被回收後才完成的工作回傳 False）
+        """
+        worker_id = worker_id or default_worker_id()
+        now = time.time()
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = ?, lease_owner = NULL, lease_expires = NULL, error = NULL, "
+                "result_path = ?, updated_at = ?, finished_at = ? "
+                "WHERE id = ? AND status = ? AND lease_owner = ?",
+                (STATUS_DONE, result_path, now, now, job_id, STATUS_LEASED, worker_id)
+            )
+            return cursor.rowcount == 1
+    
+    def fail(self, job_id: int, error: str, worker_id: Optional[str] = None,
+             retry: bool = True) -> Optional[str]:
+        """
+        記錄工作失敗，未達嘗試上限時重新排入佇列
+        
+        Args:
+            job_id: 工作 ID
+            error: 錯誤訊息
+            worker_id: 租約持有者
+            retry: False 表示不再重試（例如輸入檔不存在）
+        
+        Returns:
+            更新後的狀態，未持有租約時回傳 None
+        """
+        worker_id = worker_id or default_worker_id()
+        now = time.time()
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT attempts, max_attempts FROM jobs WHERE id = ? AND status = ? AND lease_owner = ?",
+                (job_id, STATUS_LEASED, worker_id)
+            ).fetchone()
+            if row is None:
+                return None
+            
+            status = STATUS_ENQUEUED if retry and row['attempts'] < row['max_attempts'] else STATUS_FAILED
+            conn.execute(
+                "UPDATE jobs SET status = ?, lease_owner = NULL, lease_expires = NULL, error = ?, "
+                "updated_at = ?, finished_at = ? WHERE id = ?",
+                (status, error, now, now if status == STATUS_FAILED else None, job_id)
+            )
+        return status
+    
+    def release(self, job_id: int, worker_id: Optional[str] = None) -> bool:
+        """
+        歸還租約（不計入嘗試次數），例如使用者中途停止
+        
+        Returns:
+            True 如果已歸還
+        """
+        worker_id = worker_id or default_worker_id()
+        now = time.time()
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = ?, attempts = MAX(attempts - 1, 0), lease_owner = NULL, "
+                "lease_expires = NULL, updated_at = ? WHERE id = ? AND status = ? AND lease_owner = ?",
+                (STATUS_ENQUEUED, now, job_id, STATUS_LEASED, worker_id)
+            )
+            return cursor.rowcount == 1
+    
+    def retry_failed(self, queue: Optional[str] = None) -> int:
+        """
+        將失敗的工作重新排入佇列（嘗試次數歸零）
+        
+        Returns:
+            重新排入的工作數
+        """
+        sql = ("UPDATE jobs SET status = ?, attempts = 0, finished_at = NULL, updated_at = ? "
+               "WHERE status = ?")
+        params: List[Any] = [STATUS_ENQUEUED, time.time(), STATUS_FAILED]
+        if queue is not None:
+            sql += " AND queue = ?"
+            params.append(queue)
+        with self._transaction() as conn:
+            return conn.execute(sql, params).rowcount
+    
+    def remove_pending(self, queue: Optional[str] = None) -> int:
+        """
+        刪除尚未開始的工作
+        
+        Returns:
+            刪除的工作數
+        """
+        sql = "DELETE FROM jobs WHERE status = ?"
+        params: List[Any] = [STATUS_ENQUEUED]
+        if queue is not None:
+            sql += " AND queue = ?"
+            params.append(queue)
+        with self._transaction() as conn:
+            return conn.execute(sql, params).rowcount
+    
+    def get(self, job_id: int) -> Optional[QueuedJob]:
+        """取得工作"""
+        row = self._connect().execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return QueuedJob.from_row(row) if row else None
+    
+    def list_jobs(
+        self,
+        status: Optional[Union[str, Iterable[str]]] = None,
+        queue: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> List[QueuedJob]:
+        """
+        依處理順序列出工作
+        
+        Args:
+            status: 狀態或狀態列表，None 表示全部
+            queue: 佇列名稱，None 表示全部
+            limit: 最多筆數
+        
+        Returns:
+            QueuedJob 列表
+        """
+        sql = "SELECT * FROM jobs WHERE 1 = 1"
+        params: List[Any] = []
+        if status is not None:
+            statuses = [status] if isinstance(status, str) else list(status)
+            sql += f" AND status IN ({', '.join('?' * len(statuses))})"
+            params.extend(statuses)
+        if queue is not None:
+            sql += " AND queue = ?"
+            params.append(queue)
+        sql += " ORDER BY priority DESC, id"
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+        return [QueuedJob.from_row(row) for row in self._connect().execute(sql, params)]
+    
+    def counts(self, queue: Optional[str] = None) -> Dict[str, int]:
+        """
+        統計各狀態的工作數
+        
+        Returns:
+            {狀態: 數量}，包含所有四種狀態
+        """
+        sql = "SELECT status, COUNT(*) AS n FROM jobs"
+        params: List[Any] = []
+        if queue is not None:
+            sql += " WHERE queue = ?"
+            params.append(queue)
+        sql += " GROUP BY status"
+        
+        counts = {STATUS_ENQUEUED: 0, STATUS_LEASED: 0, STATUS_DONE: 0, STATUS_FAILED: 0}
+        for row in self._connect().execute(sql, params):
+            counts[row['status']] = row['n']
+        return counts
+    
+    def close(self):
+        """關閉目前執行緒的連線"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+class _Transaction:
+    """BEGIN IMMEDIATE 交易的 context manager"""
+    
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+    
+    def __enter__(self) -> sqlite3.Connection:
+        self.conn.execute("BEGIN IMMEDIATE")
+        return self.conn
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.conn.execute("ROLLBACK" if exc_type else "COMMIT")
+
+
+def _pid_alive(pid_text: str) -> bool:
+    """檢查 PID 是否仍在執行（無法判斷時視為仍在執行）"""
+    try:
+        pid = int(pid_text.split(':')[0])
+    except ValueError:
+        return True
+    
+    try:
+        import psutil
+        return psutil.pid_exists(pid)
+    except ImportError:
+        return True
+
+
+class QueueWorker:
+    """從工作佇列取出工作並以 OCREngine 處理"""
+    
+    def __init__(
+        self,
+        job_queue: JobQueue,
+        engine,
+        output_dir: Union[str, Path] = "./outputs/queue",
+        queue: Optional[str] = None,
+        worker_id: Optional[str] = None,
+        max_pages: Optional[int] = None
+    ):
+        """
+        初始化工作者
+        
+        Args:
+            job_queue: JobQueue 實例
+            engine: OCREngine 實例
+            output_dir: 輸出目錄（每個工作一個子目錄）
+            queue: 只處理此佇列，None 表示所有佇列
+            worker_id: 租約持有者，None 使用 主機:PID
+            max_pages: 每個 PDF 最多處理的頁數，None 表示不限制；超過時工作標記為失敗
+        """
+        self.job_queue = job_queue
+        self.engine = engine
+        self.output_dir = Path(output_dir)
+        self.queue = queue
+        self.worker_id = worker_id or default_worker_id()
+        self.max_pages = max_pages
+    
+    def run(
+        self,
+        stop_event: Optional[threading.Event] = None,
+        max_jobs: Optional[int] = None,
+        wait: bool = False,
+        poll_interval: float = 2.0
+    ) -> Dict[str, int]:
+        """
+        持續處理工作
+        
+        Args:
+            stop_event: 設定後在目前工作完成時停止
+            max_jobs: 最多處理的工作數
+            wait: 佇列為空時是否等待新工作（否則直接結束）
+            poll_interval: 等待新工作時的輪詢間隔（秒）
+        
+        Returns:
+            {'done': n, 'failed': n, 'retried': n}
+        """
+        stats = {'done': 0, 'failed': 0, 'retried': 0}
+        processed = 0
+        
+        while not (stop_event and stop_event.is_set()):
+            if max_jobs is not None and processed >= max_jobs:
+                break
+            
+            job = self.job_queue.lease(self.worker_id, self.queue)
+            if job is None:
+                if not wait:
+                    break
+                time.sleep(poll_interval)
+                continue
+            
+            status = self.process(job)
+            stats['retried' if status == STATUS_ENQUEUED else status] += 1
+            processed += 1
+        
+        return stats
+    
+    def process(self, job: QueuedJob) -> str:
+        """
+        處理一個已租用的工作（處理期間定期延長租約）
+        
+        Returns:
+            處理後的狀態（done / enqueued / failed）
+        """
+        input_path = Path(job.input_path)
+        output_path = self.output_dir / f"{input_path.stem}_{job.job_id}"
+        
+        if not input_path.exists():
+            return self.job_queue.fail(job.job_id, f"檔案不存在: {input_path}",
+                                       self.worker_id, retry=False) or STATUS_FAILED
+        
+        stop_heartbeat = threading.Event()
+        heartbeat = threading.Thread(
+            target=self._heartbeat_loop, args=(job.job_id, stop_heartbeat), daemon=True
+        )
+        heartbeat.start()
+        retry = True
+        try:
+            if input_path.suffix.lower() == '.pdf':
+                error, retry = self._process_pdf(job, input_path, output_path)
+            else:
+                result = self.engine.process_image(
+                    input_path,
+                    output_path=str(output_path),
+                    save_results=True,
+                    **job.options
+                )
+                error = None if result.success else (result.error_message or "未知錯誤")
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        finally:
+            stop_heartbeat.set()
+            heartbeat.join()
+        
+        if error is None:
+            self.job_queue.complete(job.job_id, self.worker_id, str(output_path))
+            logger.info(f"工作 {job.job_id} 完成: {input_path.name}")
+            return STATUS_DONE
+        
+        status = self.job_queue.fail(job.job_id, error, self.worker_id, retry=retry) or STATUS_FAILED
+        logger.warning(f"工作 {job.job_id} 失敗（第 {job.attempts} 次，{status}）: {error}")
+        return status
+    
+    def _process_pdf(self, job: QueuedJob, input_path: Path,
+                     output_path: Path) -> Tuple[Optional[str], bool]:
+        """
+        逐頁處理 PDF，結果合併為單一 Markdown 檔
+        
+        Returns:
+            (錯誤訊息, 是否重試)：有任何頁面失敗時回傳錯誤並重試；
+            因 max_pages 截斷時回傳錯誤且不重試；全部成功時為 (None, True)
+        """
+        import shutil
+        from src.config_loader import get_config
+        from src.document_writer import DocumentWriter
+        from src.pdf_converter import PDFConverter
+        
+        config = get_config()
+        converter = PDFConverter(
+            dpi=config.get('pdf.dpi', 200),
+            max_pages=self.max_pages,
+            workers=config.get('pdf.workers', 1),
+            ram_budget_mb=config.get('pdf.ram_budget_mb')
+        )
+        
+        truncated = None
+        if self.max_pages:
+            page_count = converter.count_pages(input_path)
+            if page_count > self.max_pages:
+                truncated = f"共 {page_count} 頁，超過 max_pages {self.max_pages}，僅處理前 {self.max_pages} 頁"
+        
+        errors = []
+        # 每次執行都重新處理所有頁面，不沿用上一次（可能失敗或設定不同）的輸出
+        with DocumentWriter(output_path, input_path.stem, resume=False) as writer:
+            pages = converter.iter_document(
+                input_path,
+                prefetch=2,
+                use_text_layer=config.get('pdf.use_text_layer', True)
+            )
+            for page in pages:
+                if page.source == 'text_layer':
+                    writer.write_page(page.page_number, page.text, source=page.source)
+                    continue
+                
+                page_dir = output_path / f".page_{page.page_number:04d}"
+                result = self.engine.process_image(
+                    page.image,
+                    output_path=str(page_dir),
+                    save_results=True,
+                    source_path=f"{input_path.name}#page={page.page_number}",
+                    **job.options
+                )
+                if result.success:
+                    writer.write_page(page.page_number, result.text_content,
+                                      processing_time=result.processing_time, assets_dir=page_dir)
+                else:
+                    errors.append(f"第 {page.page_number} 頁: {result.error_message}")
+                    writer.write_page(page.page_number, "", status='failed',
+                                      error=result.error_message)
+                shutil.rmtree(page_dir, ignore_errors=True)
+        
+        # 失敗的頁面不會另外重試，整份工作重新排入（重新執行時所有頁面重新處理）
+        if errors:
+            return f"{len(errors)} 頁辨識失敗，{errors[0]}", True
+        if truncated:
+            return truncated, False
+        return None, True
+    
+    def _heartbeat_loop(self, job_id: int, stop: threading.Event):
+        """每三分之一租約時間延長一次租約"""
+        interval = max(1.0, self.job_queue.lease_seconds / 3)
+        while not stop.wait(interval):
+            if not self.job_queue.heartbeat(job_id, self.worker_id):
+                logger.warning(f"工作 {job_id} 的租約已失效")
+                break
+
+
+def _collect_inputs(inputs: List[str]) -> List[Path]:
+    """展開檔案與資料夾（遞迴）"""
+    extensions = {'.png', '.jpg', '.jpeg', '.bmp', '.tiff', '.tif', '.webp', '.pdf'}
+    files = []
+    for item in inputs:
+        path = Path(item)
+        if path.is_dir():
+            files.extend(sorted(p for p in path.rglob('*') if p.suffix.lower() in extensions))
+        elif path.is_file():
+            files.append(path)
+        else:
+            print(f"略過不存在的路徑: {path}")
+    return files
+
+
+def main():
+    from src.config_loader import get_config
+    
+    config = get_config()
+    
+    parser = argparse.ArgumentParser(description='DeepSeek-OCR 工作佇列')
+    parser.add_argument('--db', default=config.get('queue.db_path', DEFAULT_DB_PATH), help='佇列資料庫')
+    parser.add_argument('--queue', default='default', help='佇列名稱')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    
+    enqueue_parser = subparsers.add_parser('enqueue', help='排入圖片或 PDF')
+    enqueue_parser.add_argument('inputs', nargs='+', help='圖片、PDF 或資料夾')
+    enqueue_parser.add_argument('--priority', default='normal', choices=list(PRIORITIES), help='優先順序')
+    enqueue_parser.add_argument('--crop', action='store_true', help='啟用裁切模式')
+    
+    subparsers.add_parser('status', help='顯示佇列狀態')
+    subparsers.add_parser('retry-failed', help='重新排入失敗的工作')
+    
+    work_parser = subparsers.add_parser('work', help='處理佇列中的工作')
+    work_parser.add_argument('--output', default=config.get('queue.output_dir', './outputs/queue'),
+                             help='輸出目錄')
+    work_parser.add_argument('--model', default=config.get('paths.model_dir', './models/deepseek-ocr'),
+                             help='模型路徑')
+    work_parser.add_argument('--wait', action='store_true', help='佇列為空時持續等待新工作')
+    work_parser.add_argument('--max-jobs', type=int, help='最多處理的工作數')
+    work_parser.add_argument('--max-pages', type=int, help='每個 PDF 最多處理的頁數（預設不限制，超過時工作失敗）')
+    
+    args = parser.parse_args()
+    
+    job_queue = JobQueue(
+        args.db,
+        lease_seconds=config.get('queue.lease_seconds', 600),
+        max_attempts=config.get('queue.max_attempts', 3)
+    )
+    
+    if args.command == 'enqueue':
+        files = _collect_inputs(args.inputs)
+        options = {'crop_mode': True} if args.crop else {}
+        job_ids = job_queue.enqueue_many(files, options, args.priority, args.queue)
+        print(f"已排入 {len(job_ids)} 個工作（略過 {len(files) - len(job_ids)} 個已在佇列中的檔案）")
+    
+    elif args.command == 'status':
+        counts = job_queue.counts(args.queue)
+        print(" ".join(f"{status}: {count}" for status, count in counts.items()))
+        for job in job_queue.list_jobs(STATUS_FAILED, args.queue, limit=20):
+            print(f"  ✗ #{job.job_id} {Path(job.input_path).name}（{job.attempts} 次）: {job.error}")
+    
+    elif args.command == 'retry-failed':
+        print(f"已重新排入 {job_queue.retry_failed(args.queue)} 個工作")
+    
+    elif args.command == 'work':
+        from src.logger import setup_logger
+        from src.ocr_engine import OCREngine
+        
+        setup_logger("job_queue", console_output=True, file_output=True)
+        engine = OCREngine(model_path=args.model)
+        engine.load_model()
+        
+        worker = QueueWorker(job_queue, engine, args.output, queue=args.queue, max_pages=args.max_pages)
+        stop_event = threading.Event()
+        try:
+            stats = worker.run(stop_event, max_jobs=args.max_jobs, wait=args.wait)
+        except KeyboardInterrupt:
+            stop_event.set()
+            stats = None
+            print("\n已中斷，處理中的工作會在租約到期或重新啟動時回收")
+        if stats:
+            print(f"完成 {stats['done']}，重試 {stats['retried']}，失敗 {stats['failed']}")
+
+
+if __name__ == '__main__':
+    if os.name == 'nt':
+        import codecs
+        sys.stdout = codecs.getwriter('utf-8')(sys.stdout.buffer, 'strict')
+        sys.stderr = codecs.getwriter('utf-8')(sys.stderr.buffer, 'strict')
+    main()
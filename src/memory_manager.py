@@ -5,7 +5,7 @@
 
 import torch
 import gc
-from typing import Dict, Optional, Tuple
+from typing import Dict, Optional, Tuple, Union
 import logging
 from dataclasses import dataclass
 
@@ -23,6 +23,15 @@ class MemoryInfo:
     device_name: str = ""
 
 
+@dataclass
+class HostMemoryInfo:
+    """主機記憶體資訊資料類別（CPU 模式的記憶體讀數）"""
+    process_rss_gb: float       # 本行程常駐記憶體
+    available_gb: float         # 系統可用記憶體
+    total_gb: float             # 系統總記憶體
+    usage_percent: float        # 系統記憶體使用率
+
+
 class MemoryManager:
     """記憶體管理器類別"""
     
@@ -93,6 +102,50 @@ class MemoryManager:
                 cuda_available=False
             )
     
+    def get_host_memory(self) -> HostMemoryInfo:
+        """
+        取得主機記憶體資訊（行程 RSS 與系統可用記憶體）
+        
+        Returns:
+            HostMemoryInfo 物件
+        """
+        import psutil
+        
+        virtual = psutil.virtual_memory()
+        rss = psutil.Process().memory_info().rss
+        return HostMemoryInfo(
+            process_rss_gb=rss / 1024**3,
+            available_gb=virtual.available / 1024**3,
+            total_gb=virtual.total / 1024**3,
+            usage_percent=virtual.percent
+        )
+    
+    def get_available_memory(self, device: Union[int, str] = 0) -> Tuple[float, float]:
+        """
+        取得推理可用的記憶體（GPU 為 VRAM，CPU 為系統可用記憶體）
+        
+        GPU 使用 cudaMemGetInfo 的實際可用量（含其他行程的佔用），
+        再加上本行程已保留但未配置的快取（PyTorch 可直接重用）。
+        
+        Args:
+            device: GPU 裝置編號；'cpu' 表示讀取系統可用記憶體（CPU 上執行的模型）
+        
+        Returns:
+            (可用 GB, 總量 GB)
+        """
+        if device == 'cpu' or not self.cuda_available:
+            host = self.get_host_memory()
+            return host.available_gb, host.total_gb
+        
+        try:
+            free, total = torch.cuda.mem_get_info(device)
+            cached = torch.cuda.memory_reserved(device) - torch.cuda.memory_allocated(device)
+            return (free + cached) / 1024**3, total / 1024**3
+        except Exception as e:
+            logger.error(f"取得可用 VRAM 失敗: {e}")
+            memory_info = self.get_vram_usage(device)
+            return memory_info.vram_free_gb, memory_info.vram_total_gb
+    
     def clear_cache(self, device: int = 0):
         """
         清理 GPU 快取
@@ -273,6 +326,17 @@ class MemoryManager:
             }
         }
         
+        try:
+            host = self.get_host_memory()
+            report['host'] = {
+                'process_rss_gb': host.process_rss_gb,
+                'available_gb': host.available_gb,
+                'total_gb': host.total_gb,
+                'usage_percent': host.usage_percent
+            }
+        except Exception as e:
+            logger.debug(f"取得主機記憶體資訊失敗: {e}")
+        
         if self.cuda_available:
             try:
                 # 取得更詳細的 CUDA 資訊
@@ -0,0 +1,427 @@
+"""
+模型權重載入模組
+以記憶體映射（mmap）直接使用 safetensors 檔案中的權重，
+多個 CPU 工作行程共用作業系統的頁面快取，不會各自複製一份權重；
+快速載入則以不初始化的模型骨架，平行將映射的權重轉為目標類型並搬到目標裝置
+"""
+
+import os
+import json
+import time
+import hashlib
+import struct
+import argparse
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Optional, Tuple, Union, Any, List
+import logging
+
+import torch
+
+logger = logging.getLogger(__name__)
+
+# safetensors 資料類型對應
+SAFETENSORS_DTYPES = {
+    'BF16': torch.bfloat16,
+    'F16': torch.float16,
+    'F32': torch.float32,
+    'F64': torch.float64,
+    'I64': torch.int64,
+    'I32': torch.int32,
+    'I16': torch.int16,
+    'I8': torch.int8,
+    'U8': torch.uint8,
+    'BOOL': torch.bool,
+}
+
+
+def read_safetensors_header(file_path: Union[str, Path]) -> Tuple[Dict[str, Any], int]:
+    """
+    讀取 safetensors 檔頭
+    
+    Args:
+        file_path: safetensors 檔案路徑
+    
+    Returns:
+        (檔頭字典, 資料區起始位元組)
+    """
+    with open(file_path, 'rb') as f:
+        header_size = struct.unpack('<Q', f.read(8))[0]
+        header = json.loads(f.read(header_size))
+    return header, 8 + header_size
+
+
+def mmap_safetensors(file_path: Union[str, Path]) -> Dict[str, torch.Tensor]:
+    """
+    以記憶體映射開啟 safetensors 檔，回傳指向映射區的張量（不複製資料）
+    
+    映射為私有（copy-on-write）模式：只讀取時各行程共用同一份實體頁面，
+    若有張量被就地修改，也只會複製被寫入的頁面，不會改動檔案。
+    
+    Args:
+        file_path: safetensors 檔案路徑
+    
+    Returns:
+        {權重名稱: 張量} 字典
+    """
+    file_path = Path(file_path)
+    header, data_start = read_safetensors_header(file_path)
+    storage = torch.UntypedStorage.from_file(str(file_path), False, file_path.stat().st_size)
+    
+    tensors = {}
+    for name, info in header.items():
+        if name == '__metadata__':
+            continue
+        
+        dtype = SAFETENSORS_DTYPES[info['dtype']]
+        begin, end = info['data_offsets']
+        element_size = torch.empty((), dtype=dtype).element_size()
+        offset = data_start + begin
+        
+        if offset % element_size != 0:
+            # 未對齊時無法建立檢視，只能複製
+            tensors[name] = torch.frombuffer(
+                bytearray(storage[offset:data_start + end]), dtype=dtype
+            ).reshape(info['shape'])
+            continue
+        
+        tensor = torch.empty(0, dtype=dtype)
+        tensor.set_(storage, offset // element_size, tuple(info['shape']))
+        tensors[name] = tensor
+    
+    return tensors
+
+
+def mmap_state_dict(model_dir: Union[str, Path]) -> Dict[str, torch.Tensor]:
+    """
+    映射模型目錄中的所有 safetensors 權重分片
+    
+    Args:
+        model_dir: 模型目錄（含 model.safetensors 或 model.safetensors.index.json）
+    
+    Returns:
+        {權重名稱: 張量} 字典
+    
+    Raises:
+        FileNotFoundError: 找不到 safetensors 權重
+    """
+    state_dict = {}
+    for shard_file in safetensors_shards(model_dir):
+        state_dict.update(mmap_safetensors(shard_file))
+    return state_dict
+
+
+def safetensors_shards(model_dir: Union[str, Path]) -> List[Path]:
+    """
+    列出模型目錄中的 safetensors 權重分片
+    
+    Args:
+        model_dir: 模型目錄（含 model.safetensors 或 model.safetensors.index.json）
+    
+    Returns:
+        分片檔案路徑列表
+    
+    Raises:
+        FileNotFoundError: 找不到 safetensors 權重
+    """
+    model_dir = Path(model_dir)
+    index_file = model_dir / "model.safetensors.index.json"
+    
+    if index_file.exists():
+        with open(index_file, 'r', encoding='utf-8') as f:
+            shard_names = sorted(set(json.load(f)['weight_map'].values()))
+    elif (model_dir / "model.safetensors").exists():
+        shard_names = ["model.safetensors"]
+    else:
+        raise FileNotFoundError(f"找不到 safetensors 權重: {model_dir}")
+    
+    shard_files = [model_dir / name for name in shard_names]
+    missing = [str(path) for path in shard_files if not path.exists()]
+    if missing:
+        raise FileNotFoundError(f"找不到 safetensors 權重分片: {', '.join(missing)}")
+    return shard_files
+
+
+def checkpoint_bytes(model_dir: Union[str, Path]) -> int:
+    """
+    取得模型權重檔的總大小（位元組）
+    
+    Args:
+        model_dir: 模型目錄
+    
+    Returns:
+        權重位元組數，找不到權重時為 0
+    """
+    model_dir = Path(model_dir)
+    index_file = model_dir / "model.safetensors.index.json"
+    if index_file.exists():
+        with open(index_file, 'r', encoding='utf-8') as f:
+            total = json.load(f).get('metadata', {}).get('total_size')
+        if total:
+            return int(total)
+    return sum(path.stat().st_size for path in model_dir.glob("*.safetensors"))
+
+
+# 影響推理結果的模型檔案（權重、設定、tokenizer 與 trust_remote_code 的模型程式）
+FINGERPRINT_SUFFIXES = {'.safetensors', '.bin', '.json', '.py', '.model', '.txt'}
+
+
+def model_fingerprint(model_dir: Union[str, Path], torch_dtype: Any = None) -> str:
+    """
+    取得模型指紋（結果快取鍵的一部分，模型更新或重載為其他模型後不會沿用舊結果）
+    
+    依模型目錄中各檔案的名稱、大小與修改時間計算，不讀取權重內容；
+    目錄不存在時（例如 Hugging Face 模型 ID）改用路徑字串。
+    
+    Args:
+        model_dir: 模型目錄
+        torch_dtype: 推理使用的資料類型（不同精度的結果可能不同）
+    
+    Returns:
+        16 字元的十六進位指紋
+    """
+    model_dir = Path(model_dir)
+    digest = hashlib.sha1()
+    if model_dir.is_dir():
+        for path in sorted(model_dir.iterdir()):
+            if path.is_file() and path.suffix in FINGERPRINT_SUFFIXES:
+                stat = path.stat()
+                digest.update(f"{path.name}:{stat.st_size}:{stat.st_mtime_ns}\n".encode('utf-8'))
+    else:
+        digest.update(str(model_dir).encode('utf-8'))
+    digest.update(str(torch_dtype).encode('utf-8'))
+    return digest.hexdigest()[:16]
+
+
+def load_model_mmap(
+    model_path: Union[str, Path],
+    torch_dtype: Optional[torch.dtype] = None
+):
+    """
+    建立模型並直接使用映射的權重（CPU）
+    
+    模型先以不初始化權重的方式建立（未觸碰的記憶體不佔實體 RAM），
+    再以 assign 方式把參數換成映射區的張量。torch_dtype 與檔案不同時
+    需要轉換，該部分權重會複製到各行程自己的記憶體中。
+    
+    Args:
+        model_path: 模型目錄
+        torch_dtype: 參數資料類型，None 表示沿用檔案中的類型
+    
+    Returns:
+        eval 模式的模型
+    """
+    from transformers import AutoConfig, AutoModel
+    from transformers.modeling_utils import no_init_weights
+    
+    config = AutoConfig.from_pretrained(model_path, trust_remote_code=True)
+    state_dict = mmap_state_dict(model_path)
+    
+    file_dtype = next(iter(state_dict.values())).dtype
+    dtype = torch_dtype or file_dtype
+    if dtype != file_dtype:
+        logger.warning(f"權重類型 {file_dtype} 與要求的 {dtype} 不同，轉換後無法跨行程共用")
+        state_dict = {
+            name: tensor.to(dtype) if tensor.is_floating_point() else tensor
+            for name, tensor in state_dict.items()
+        }
+    
+    with no_init_weights():
+        model = AutoModel.from_config(config, trust_remote_code=True, torch_dtype=dtype)
+    
+    missing, unexpected = model.load_state_dict(state_dict, strict=False, assign=True)
+    # 共用權重（例如 lm_head 與 embedding）不一定存於檔案中
+    if getattr(config, 'tie_word_embeddings', False):
+        model.tie_weights()
+        missing = [name for name in missing if not name.startswith('lm_head')]
+    if missing:
+        raise RuntimeError(f"權重缺少 {len(missing)} 個參數，例如: {missing[:5]}")
+    if unexpected:
+        logger.warning(f"忽略 {len(unexpected)} 個未使用的權重，例如: {unexpected[:5]}")
+    
+    logger.info(f"✓ 已映射 {len(state_dict)} 個權重張量（PID {os.getpid()}）")
+    return model.eval()
+
+
+# 空參數建構狀態：只有進入 init_empty_parameters 的執行緒建立的參數會放到 meta 裝置上，
+# 其他執行緒（例如同時建構模組的 GUI 或背景重載）照常配置參數
+_empty_init_state = threading.local()
+_empty_init_lock = threading.Lock()
+_empty_init_users = 0
+_original_register_parameter = None
+
+
+def _register_empty_parameter(module, name, param):
+    """register_parameter 的替代版本：在空參數建構中的執行緒上，把參數換成 meta 張量"""
+    _original_register_parameter(module, name, param)
+    if getattr(_empty_init_state, 'depth', 0) and param is not None and param.device.type != 'meta':
+        module._parameters[name] = torch.nn.Parameter(
+            param.to('meta'), requires_grad=param.requires_grad
+        )
+
+
+@contextmanager
+def init_empty_parameters():
+    """
+    建立模型時把參數放在 meta 裝置上（不配置記憶體、不執行隨機初始化）
+    
+    只攔截參數，buffer（例如旋轉位置編碼的 cos/sin 快取，不存於權重檔）照常在建構時計算。
+    只影響目前的執行緒；多個執行緒同時使用時，最後一個離開的才還原 register_parameter。
+    """
+    global _empty_init_users, _original_register_parameter
+    
+    with _empty_init_lock:
+        if _empty_init_users == 0:
+            _original_register_parameter = torch.nn.Module.register_parameter
+            torch.nn.Module.register_parameter = _register_empty_parameter
+        _empty_init_users += 1
+    _empty_init_state.depth = getattr(_empty_init_state, 'depth', 0) + 1
+    try:
+        yield
+    finally:
+        _empty_init_state.depth -= 1
+        with _empty_init_lock:
+            _empty_init_users -= 1
+            if _empty_init_users == 0:
+                torch.nn.Module.register_parameter = _original_register_parameter
+                _original_register_parameter = None
+
+
+def _set_tensor(model: torch.nn.Module, name: str, tensor: torch.Tensor):
+    """把權重放入模型的參數或 buffer（直接替換，不複製）"""
+    module_name, _, attr = name.rpartition('.')
+    module = model.get_submodule(module_name) if module_name else model
+    if attr in module._parameters:
+        module._parameters[attr] = torch.nn.Parameter(tensor, requires_grad=False)
+    elif attr in module._buffers:
+        module._buffers[attr] = tensor
+    else:
+        raise KeyError(name)
+
+
+def load_model_fast(
+    model_path: Union[str, Path],
+    torch_dtype: Optional[torch.dtype] = None,
+    device: Union[str, torch.device] = "cpu",
+    workers: Optional[int] = None
+) -> Tuple[torch.nn.Module, Dict[str, float]]:
+    """
+    快速載入模型：不初始化的骨架 + 平行轉換映射的權重
+    
+    1. 骨架：參數建立在 meta 裝置上，省去配置與隨機初始化
+    2. 映射：以 mmap 開啟各個 safetensors 分片，資料只在轉換時才從磁碟讀入
+    3. 轉換：多執行緒將每個張量轉為目標類型並搬到目標裝置（大張量的複製會釋放 GIL）
+    4. 組裝：直接替換骨架中的參數，buffer 搬到目標裝置
+    
+    目標為 CPU 且類型與檔案相同時不會複製，參數直接指向映射區（與 load_model_mmap 相同）。
+    
+    Args:
+        model_path: 模型目錄
+        torch_dtype: 浮點參數的資料類型，None 表示沿用檔案中的類型
+        device: 目標裝置（cuda / cuda:0 / cpu）
+        workers: 轉換執行緒數，None 依 CPU 核心數決定
+    
+    Returns:
+        (eval 模式的模型, 各階段耗時秒數)
+    
+    Raises:
+        FileNotFoundError: 找不到 safetensors 權重
+        RuntimeError: 權重缺少模型需要的參數
+    """
+    from transformers import AutoConfig, AutoModel
+    
+    device = torch.device(device)
+    workers = workers or min(8, os.cpu_count() or 1)
+    timings: Dict[str, float] = {}
+    
+    def phase(name: str, started: float) -> float:
+        now = time.perf_counter()
+        timings[name] = now - started
+        return now
+    
+    started = total_started = time.perf_counter()
+    config = AutoConfig.from_pretrained(model_path, trust_remote_code=True)
+    started = phase('config', started)
+    
+    with init_empty_parameters():
+        model = AutoModel.from_config(config, trust_remote_code=True, torch_dtype=torch_dtype)
+    started = phase('skeleton', started)
+    
+    shard_files = safetensors_shards(model_path)
+    with ThreadPoolExecutor(max_workers=min(workers, len(shard_files))) as executor:
+        shards = list(executor.map(mmap_safetensors, shard_files))
+    state_dict = {}
+    for shard in shards:
+        state_dict.update(shard)
+    started = phase('mmap', started)
+    
+    def convert(item: Tuple[str, torch.Tensor]) -> Tuple[str, torch.Tensor]:
+        name, tensor = item
+        dtype = torch_dtype if torch_dtype is not None and tensor.is_floating_point() else tensor.dtype
+        return name, tensor.to(device=device, dtype=dtype)
+    
+    # 大張量優先，避免最後只剩一個執行緒在處理最大的張量
+    items = sorted(state_dict.items(), key=lambda item: item[1].numel(), reverse=True)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        converted = list(executor.map(convert, items))
+    if device.type == 'cuda':
+        torch.cuda.synchronize(device)
+    started = phase('convert', started)
+    
+    expected = set(model.state_dict().keys())
+    unexpected = []
+    for name, tensor in converted:
+        if name in expected:
+            _set_tensor(model, name, tensor)
+        else:
+            unexpected.append(name)
+    
+    # 共用權重（例如 lm_head 與 embedding）不一定存於檔案中
+    if getattr(config, 'tie_word_embeddings', False):
+        model.tie_weights()
+    missing = [name for name, param in model.named_parameters() if param.device.type == 'meta']
+    if missing:
+        raise RuntimeError(f"權重缺少 {len(missing)} 個參數，例如: {missing[:5]}")
+    if unexpected:
+        logger.warning(f"忽略 {len(unexpected)} 個未使用的權重，例如: {unexpected[:5]}")
+    
+    # 建構時計算的 buffer 仍在 CPU 上
+    model = model.to(device)
+    phase('assign', started)
+    timings['total'] = time.perf_counter() - total_started
+    
+    logger.info(
+        f"✓ 快速載入 {len(converted)} 個權重張量到 {device}（{workers} 執行緒）: "
+        + ", ".join(f"{name} {seconds:.2f}s" for name, seconds in timings.items())
+    )
+    return model.eval(), timings
+
+
+def main():
+    """命令列介面：量測模型載入各階段耗時"""
+    import sys
+    
+    if os.name == 'nt':
+        import codecs
+        sys.stdout = codecs.getwriter('utf-8')(sys.stdout.buffer, 'strict')
+        sys.stderr = codecs.getwriter('utf-8')(sys.stderr.buffer, 'strict')
+    
+    parser = argparse.ArgumentParser(description='模型快速載入與各階段耗時')
+    parser.add_argument('--model', default='./models/deepseek-ocr', help='模型路徑')
+    parser.add_argument('--device', default='cuda' if torch.cuda.is_available() else 'cpu', help='目標裝置')
+    parser.add_argument('--dtype', default='bfloat16', help='資料類型（bfloat16 / float16 / float32）')
+    parser.add_argument('--workers', type=int, default=None, help='轉換執行緒數')
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    _, timings = load_model_fast(args.model, getattr(torch, args.dtype), args.device, args.workers)
+    
+    print(f"{'階段':<12}{'秒數':>10}")
+    for name, seconds in timings.items():
+        print(f"{name:<12}{seconds:>10.2f}")
+
+
+if __name__ == '__main__':
+    main()
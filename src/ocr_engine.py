@@ -7,18 +7,54 @@ import torch
 from transformers import AutoModel, AutoTokenizer
 from PIL import Image
 from pathlib import Path
-from typing import Union, Optional, Dict, List
-from dataclasses import dataclass
+from typing import Union, Optional, Dict, List, Any
+from dataclasses import dataclass, replace
 from datetime import datetime
+import re
+import gc
+import hashlib
 import time
+import shutil
+import tempfile
+import threading
 import logging
 
-from .image_processor import ImageProcessor
+from .image_processor import ImageProcessor, BlankPageConfig, DuplicateIndex
 from .memory_manager import get_memory_manager
+from .admission import AdmissionController, ACTION_DOWNGRADE
+from .coalescer import RequestCoalescer
+from .job_manifest import compute_content_hash, settings_fingerprint
+from .scheduler import InferenceScheduler, PRIORITY_BULK, PRIORITY_INTERACTIVE
+from .model_loader import model_fingerprint
 
 # 設定日誌
 logger = logging.getLogger(__name__)
 
+# 模型 grounding 輸出: <|ref|>標籤<|/ref|><|det|>[[x1, y1, x2, y2], ...]<|/det|>
+_GROUNDING_PATTERN = re.compile(r'<\|ref\|>(.*?)<\|/ref\|><\|det\|>(.*?)<\|/det\|>', re.DOTALL)
+
+
+def parse_layout(raw_text: str) -> List[Dict[str, Any]]:
+    """
+    從模型原始輸出解析版面區塊
+    
+    Args:
+        raw_text: 含 grounding 標記的模型輸出
+    
+    Returns:
+        [{'label': 標籤, 'boxes': [[x1, y1, x2, y2], ...]}, ...]，座標為 0-999 的相對位置
+    """
+    import ast
+    
+    layout = []
+    for label, boxes_text in _GROUNDING_PATTERN.findall(raw_text):
+        try:
+            boxes = ast.literal_eval(boxes_text.strip())
+        except (ValueError, SyntaxError):
+            continue
+        layout.append({'label': label.strip(), 'boxes': boxes})
+    return layout
+
 
 @dataclass
 class OCRResult:
@@ -32,6 +68,31 @@ class OCRResult:
     model_config: Dict                     # 模型配置
     success: bool = True                   # 是否成功
     error_message: Optional[str] = None    # 錯誤訊息
+    skipped_blank: bool = False            # 是否因空白頁而跳過 OCR
+    duplicate_of: Optional[str] = None     # 重複頁沿用結果時，代表頁的路徑
+    source: str = "ocr"                    # 'ocr' 或 'text_layer'（PDF 內嵌文字層）
+    output_tokens: int = 0                 # 模型輸出的 token 數
+    coalesced: bool = False                # 是否沿用同時進行的相同請求的結果
+    model_fingerprint: Optional[str] = None  # 產生結果的模型指紋（結果儲存的快取鍵之一）
+    layout: Optional[List[Dict[str, Any]]] = None  # 版面區塊（save_results 時由 grounding 輸出解析）
+
+
+def _read_output_files(directory: Union[str, Path]) -> Dict[str, bytes]:
+    """讀取輸出目錄中的所有檔案（相對路徑 -> 內容）"""
+    directory = Path(directory)
+    return {
+        path.relative_to(directory).as_posix(): path.read_bytes()
+        for path in directory.rglob('*') if path.is_file()
+    }
+
+
+def _write_output_files(files: Dict[str, bytes], directory: Union[str, Path]):
+    """將 _read_output_files 讀取的檔案寫入輸出目錄"""
+    directory = Path(directory)
+    for name, data in files.items():
+        target = directory / name
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_bytes(data)
 
 
 class OCREngine:
@@ -42,7 +103,12 @@ class OCREngine:
         model_path: str = "./models/deepseek-ocr",
         device: str = "cuda",
         torch_dtype = torch.bfloat16,
-        max_image_size: Optional[int] = None
+        max_image_size: Optional[int] = None,
+        blank_config: Optional[BlankPageConfig] = None,
+        mmap_weights: bool = False,
+        admission: Optional[AdmissionController] = None,
+        coalesce: bool = True,
+        fast_load: bool = True
     ):
         """
         初始化 OCR 引擎
@@ -52,20 +118,59 @@ class OCREngine:
             device: 運算裝置 (cuda/cpu)
             torch_dtype: PyTorch 資料類型
             max_image_size: 最大圖片尺寸
+            blank_config: 空白頁偵測設定（門檻與是否預設跳過），None 依設定檔 blank_detection 建立
+            mmap_weights: 以記憶體映射直接使用 safetensors 權重（CPU 多行程共用權重）
+            admission: 記憶體准入控制器，None 依設定檔建立
+            coalesce: 合併同時進行、內容與設定相同的請求
+            fast_load: 以不初始化的骨架與平行轉換的映射權重載入模型（失敗時退回 from_pretrained）
         """
         self.model_path = model_path
         self.device = device
         self.torch_dtype = torch_dtype
         self.max_image_size = max_image_size
+        self.mmap_weights = mmap_weights
+        self.fast_load = fast_load
+        self.load_timings: Dict[str, float] = {}
+        self.model_fingerprint: Optional[str] = None
         
         # 初始化圖片處理器
-        self.image_processor = ImageProcessor(max_size=max_image_size)
+        self.image_processor = ImageProcessor(
+            max_size=max_image_size,
+            blank_config=blank_config if blank_config is not None else BlankPageConfig.from_config()
+        )
+        
+        # 全域視圖張量轉換（uint8 -> letterbox -> 正規化 bfloat16，單次完成）
+        self._global_view_transform = lambda image, size: self.image_processor.to_model_tensor(
+            image, size, dtype=torch.bfloat16
+        )
+        
+        # 推理排程：多個執行緒共用引擎時，互動請求優先於批次頁面
+        self.scheduler = InferenceScheduler()
+        
+        # 記憶體准入：送入模型前估計所需記憶體，不足時延後、降級或拒絕
+        self.admission = admission if admission is not None else AdmissionController.from_config(device=device)
+        
+        # 進行中請求合併：相同內容與設定的請求只推理一次
+        self.coalesce = coalesce
+        self.coalescer = RequestCoalescer()
         
         # 模型和 tokenizer（延遲載入）
         self.model = None
         self.tokenizer = None
         self._model_loaded = False
         
+        # 重載與 CPU 備援模型（OOM 時使用，載入一次後重複使用，不卸載主模型）
+        self._reload_lock = threading.Lock()
+        self._reloading = False
+        self.model_generation = 0
+        self._cpu_standby = None
+        self._cpu_standby_lock = threading.Lock()
+        # CPU 備援推理另外排隊：CPU 上的長時間推理不佔用主模型的使用權；准入依系統記憶體判斷
+        self._standby_scheduler = InferenceScheduler()
+        self._standby_admission = AdmissionController.from_config(
+            memory_manager=self.admission.memory_manager, device="cpu"
+        )
+        
         logger.info(f"OCREngine 初始化完成")
         logger.info(f"  模型路徑: {model_path}")
         logger.info(f"  裝置: {device}")
@@ -80,22 +185,10 @@ class OCREngine:
         logger.info("開始載入模型...")
         
         try:
-            # 載入 tokenizer
-            logger.debug("載入 tokenizer...")
-            self.tokenizer = AutoTokenizer.from_pretrained(
-                self.model_path,
-                trust_remote_code=True
-            )
-            
-            # 載入模型
-            logger.debug("載入模型...")
-            self.model = AutoModel.from_pretrained(
-                self.model_path,
-                trust_remote_code=True,
-                torch_dtype=self.torch_dtype,
-                device_map="auto"  # 使用 auto 自動選擇 GPU
+            self.model, self.tokenizer, self.load_timings = self._build_model(
+                self.model_path, self.device, self.torch_dtype
             )
-            self.model = self.model.eval()
+            self.model_fingerprint = model_fingerprint(self.model_path, self.torch_dtype)
             
             # 確認模型在 GPU 上
             if torch.cuda.is_available() and self.device == "cuda":
@@ -118,33 +211,313 @@ class OCREngine:
                     logger.warning("  ⚠ 警告：VRAM 使用量過低，模型可能在 CPU")
             else:
                 logger.warning("  ⚠ CUDA 不可用，使用 CPU 模式")
-            
+        
         except Exception as e:
             logger.error(f"模型載入失敗: {e}")
             raise
     
+    def _build_model(self, model_path: str, device: str, torch_dtype):
+        """
+        建立一組新的模型與 tokenizer（不影響目前服務中的模型）
+        
+        Args:
+            model_path: 模型路徑
+            device: 運算裝置 (cuda/cpu)
+            torch_dtype: PyTorch 資料類型
+        
+        Returns:
+            (eval 模式的模型, tokenizer, 模型載入各階段耗時秒數)
+        """
+        # 載入 tokenizer
+        logger.debug("載入 tokenizer...")
+        tokenizer = AutoTokenizer.from_pretrained(
+            model_path,
+            trust_remote_code=True
+        )
+        
+        # 載入模型
+        logger.debug("載入模型...")
+        model = None
+        timings: Dict[str, float] = {}
+        if self.mmap_weights:
+            from src.model_loader import load_model_mmap
+            model = load_model_mmap(model_path, torch_dtype)
+        elif self.fast_load:
+            from src.model_loader import load_model_fast
+            target = "cuda" if device == "cuda" and torch.cuda.is_available() else "cpu"
+            try:
+                model, timings = load_model_fast(model_path, torch_dtype, target)
+            except Exception as e:
+                logger.warning(f"快速載入失敗，改用 from_pretrained: {e}")
+                model = None
+        
+        if model is None:
+            start_time = time.perf_counter()
+            model = AutoModel.from_pretrained(
+                model_path,
+                trust_remote_code=True,
+                torch_dtype=torch_dtype,
+                device_map="auto" if device == "cuda" else device  # 使用 auto 自動選擇 GPU
+            )
+            timings = {'total': time.perf_counter() - start_time}
+        return model.eval(), tokenizer, timings
+    
+    def _warm_up(self, model, tokenizer):
+        """以小張空白圖片執行一次推理，讓新模型完成初始化與記憶體配置"""
+        warmup_dir = tempfile.mkdtemp(prefix="ocr_warmup_")
+        try:
+            model.infer(
+                tokenizer,
+                prompt="<image>\nFree OCR. ",
+                image_file=Image.new('RGB', (512, 512), 'white'),
+                output_path=warmup_dir,
+                base_size=512,
+                image_size=512,
+                crop_mode=False,
+                save_results=False,
+                test_compress=False,
+                global_view_transform=self._global_view_transform
+            )
+        finally:
+            shutil.rmtree(warmup_dir, ignore_errors=True)
+    
+    @property
+    def is_reloading(self) -> bool:
+        """是否有重載進行中"""
+        return self._reloading
+    
+    def reload_model(
+        self,
+        model_path: Optional[str] = None,
+        device: Optional[str] = None,
+        torch_dtype = None,
+        warmup: bool = True
+    ) -> bool:
+        """
+        不停機重載模型（會阻塞呼叫端，GUI 應在背景執行緒呼叫）
+        
+        新模型在背景建立並暖機，期間目前的模型持續服務；就緒後以最高優先等級取得排程使用權，
+        等進行中的那一頁完成後原子替換，之後的請求都使用新模型，舊模型隨即釋放。
+        記憶體不足以同時容納兩份權重時，退回在使用權內先卸載再載入（請求排隊等待，不會失敗）。
+        
+        Args:
+            model_path: 新的模型路徑，None 沿用目前設定
+            device: 新的運算裝置，None 沿用目前設定
+            torch_dtype: 新的資料類型（torch.dtype 或名稱字串），None 沿用目前設定
+            warmup: 替換前是否以空白圖片暖機
+        
+        Returns:
+            True 表示不停機替換，False 表示因記憶體不足退回卸載後載入
+        
+        Raises:
+            RuntimeError: 已有重載進行中
+        """
+        if not self._reload_lock.acquire(blocking=False):
+            raise RuntimeError("模型重載進行中")
+        
+        self._reloading = True
+        try:
+            model_path = model_path or self.model_path
+            device = device or self.device
+            if isinstance(torch_dtype, str):
+                torch_dtype = getattr(torch, torch_dtype)
+            torch_dtype = torch_dtype or self.torch_dtype
+            
+            # 同時容納兩份權重所需的記憶體（GPU 看 VRAM，CPU 看系統記憶體）
+            from src.model_loader import checkpoint_bytes
+            new_fingerprint = model_fingerprint(model_path, torch_dtype)
+            required_gb = checkpoint_bytes(model_path) / 1024**3
+            available_gb, _ = get_memory_manager().get_available_memory("cpu" if device == "cpu" else 0)
+            seamless = not self._model_loaded or required_gb + self.admission.headroom_gb <= available_gb
+            
+            if seamless:
+                logger.info(f"背景載入新模型: {model_path} ({device}, {torch_dtype})")
+                start_time = time.time()
+                new_model, new_tokenizer, timings = self._build_model(model_path, device, torch_dtype)
+                if warmup:
+                    self._warm_up(new_model, new_tokenizer)
+                logger.info(f"新模型就緒（{time.time() - start_time:.1f} 秒），等待進行中的請求完成後替換")
+                
+                with self.scheduler.slot(PRIORITY_INTERACTIVE):
+                    old_model = self.model
+                    self.model, self.tokenizer = new_model, new_tokenizer
+                    self.load_timings = timings
+                    self.model_path, self.device, self.torch_dtype = model_path, device, torch_dtype
+                    self.model_fingerprint = new_fingerprint
+                    self.admission.device = device
+                    self._model_loaded = True
+                    self.model_generation += 1
+                del old_model, new_model
+            else:
+                logger.warning(
+                    f"記憶體不足以同時容納兩份模型（需要 {required_gb:.1f} GB，可用 {available_gb:.1f} GB），"
+                    f"改為卸載後重新載入，期間請求排隊等待"
+                )
+                with self.scheduler.slot(PRIORITY_INTERACTIVE):
+                    self._release_model()
+                    self.model_path, self.device, self.torch_dtype = model_path, device, torch_dtype
+                    self.admission.device = device
+                    self.model, self.tokenizer, self.load_timings = self._build_model(model_path, device, torch_dtype)
+                    self.model_fingerprint = new_fingerprint
+                    self._model_loaded = True
+                    self.model_generation += 1
+            
+            # CPU 備援模型是以舊模型建立的，下次需要時再以新模型載入
+            self.release_cpu_standby()
+            gc.collect()
+            if torch.cuda.is_available():
+                torch.cuda.empty_cache()
+            logger.info(f"✓ 模型已重載（第 {self.model_generation} 版）")
+            return seamless
+        finally:
+            self._reloading = False
+            self._reload_lock.release()
+    
+    def _ensure_cpu_standby(self):
+        """
+        載入 CPU 備援模型（只載入一次，主模型維持在原裝置上）
+        
+        Returns:
+            (model, tokenizer)；呼叫端持有參考，推理期間被釋放也不受影響
+        """
+        with self._cpu_standby_lock:
+            if self._cpu_standby is None:
+                logger.info("載入 CPU 備援模型...")
+                self._cpu_standby = self._build_model(self.model_path, "cpu", self.torch_dtype)[:2]
+                logger.info("✓ CPU 備援模型就緒")
+            return self._cpu_standby
+    
+    def release_cpu_standby(self):
+        """釋放 CPU 備援模型"""
+        with self._cpu_standby_lock:
+            if self._cpu_standby is not None:
+                self._cpu_standby = None
+                gc.collect()
+                logger.info("已釋放 CPU 備援模型")
+    
     def process_image(
         self,
-        image_path: Union[str, Path],
+        image_path: Union[str, Path, Image.Image],
         prompt: str = "<image>\n<|grounding|>Convert the document to markdown. ",
         base_size: int = 1024,
         image_size: int = 1024,
         crop_mode: bool = False,
         output_path: Optional[str] = None,
-        save_results: bool = False
+        save_results: bool = False,
+        skip_blank: Optional[bool] = None,
+        source_path: Optional[str] = None,
+        priority: str = PRIORITY_BULK,
+        device: Optional[str] = None,
+        content_hash: Optional[str] = None
     ) -> OCRResult:
         """
         處理單張圖片進行 OCR
         
+        內容與設定相同的請求正在處理時，不重複推理，等待並沿用同一份結果。
+        
         Args:
-            image_path: 圖片檔案路徑
+            image_path: 圖片檔案路徑，或已解碼的 PIL Image（例如 PDF 轉換的頁面，不經檔案往返）
             prompt: 提示詞
             base_size: 基礎尺寸
             image_size: 圖片尺寸
             crop_mode: 是否使用裁切模式
             output_path: 輸出路徑
             save_results: 是否儲存結果
-            
+            skip_blank: 偵測為空白頁時跳過模型推理，None 依 blank_detection.enabled
+            source_path: 結果中記錄的來源路徑，None 則使用 image_path
+            priority: 延遲等級，'interactive'（使用者等待中）優先於 'bulk'（批次）
+            device: 'cpu' 時改用 CPU 備援模型（process_with_fallback 使用），None 使用引擎的模型
+            content_hash: 呼叫端已計算的內容雜湊（省去重新計算），None 則由引擎計算
+        
+        Returns:
+            OCRResult 物件
+        """
+        if skip_blank is None:
+            skip_blank = self.image_processor.blank_config.enabled
+        options = {
+            'prompt': prompt,
+            'base_size': base_size,
+            'image_size': image_size,
+            'crop_mode': crop_mode,
+            'output_path': output_path,
+            'save_results': save_results,
+            'skip_blank': skip_blank,
+            'source_path': source_path,
+            'priority': priority,
+            'device': device
+        }
+        if not self.coalesce:
+            return self._process_image(image_path, **options)
+        
+        try:
+            key = self._request_key(image_path, content_hash, options)
+        except Exception as e:
+            logger.warning(f"無法計算請求鍵，不合併請求: {e}")
+            return self._process_image(image_path, **options)
+        
+        def lead():
+            if not save_results:
+                return self._process_image(image_path, **options), {}
+            # 在私有暫存目錄推理並將輸出檔讀入記憶體：每個請求各自寫入自己的輸出目錄，
+            # 不受共用目錄（outputs/temp）被其他請求覆寫、或呼叫端刪除輸出目錄的影響
+            private_dir = tempfile.mkdtemp(prefix="ocr_request_")
+            try:
+                result = self._process_image(image_path, **{**options, 'output_path': private_dir})
+                return result, _read_output_files(private_dir)
+            finally:
+                shutil.rmtree(private_dir, ignore_errors=True)
+        
+        (result, output_files), shared = self.coalescer.run(key, lead)
+        if output_files:
+            _write_output_files(output_files, output_path or "outputs/temp")
+        if not shared:
+            return result
+        
+        # 沿用其他請求的結果：換成自己的來源路徑
+        if isinstance(image_path, Image.Image):
+            own_source = source_path or getattr(image_path, 'filename', '') or "<memory>"
+        else:
+            own_source = source_path or str(image_path)
+        logger.info(f"與進行中的相同請求合併: {Path(own_source).name}")
+        return replace(result, file_path=own_source, coalesced=True)
+    
+    def _request_key(
+        self,
+        image_path: Union[str, Path, Image.Image],
+        content_hash: Optional[str],
+        options: Dict[str, Any]
+    ) -> tuple:
+        """請求合併鍵：內容雜湊 + 影響結果的設定（不含來源路徑、延遲等級與輸出目錄）"""
+        if content_hash is None:
+            if isinstance(image_path, Image.Image):
+                digest = hashlib.blake2b(image_path.tobytes(), digest_size=20)
+                digest.update(f"{image_path.mode}:{image_path.size}".encode('utf-8'))
+                content_hash = digest.hexdigest()
+            else:
+                content_hash = compute_content_hash(image_path)
+        settings = {
+            name: value for name, value in options.items()
+            if name not in ('source_path', 'priority', 'output_path')
+        }
+        return content_hash, settings_fingerprint(settings)
+    
+    def _process_image(
+        self,
+        image_path: Union[str, Path, Image.Image],
+        prompt: str = "<image>\n<|grounding|>Convert the document to markdown. ",
+        base_size: int = 1024,
+        image_size: int = 1024,
+        crop_mode: bool = False,
+        output_path: Optional[str] = None,
+        save_results: bool = False,
+        skip_blank: bool = False,
+        source_path: Optional[str] = None,
+        priority: str = PRIORITY_BULK,
+        device: Optional[str] = None
+    ) -> OCRResult:
+        """
+        處理單張圖片進行 OCR（實際執行，參數同 process_image）
+        
         Returns:
             OCRResult 物件
         """
@@ -152,71 +525,149 @@ class OCREngine:
         if not self._model_loaded:
             self.load_model()
         
-        image_path = Path(image_path)
+        use_standby = device == "cpu" and self.device != "cpu"
+        standby = self._ensure_cpu_standby() if use_standby else None
+        
         start_time = time.time()
         
+        if isinstance(image_path, Image.Image):
+            # 記憶體中的圖片：直接交給模型，不需要再次解碼
+            image_input = image_path.convert('RGB') if image_path.mode != 'RGB' else image_path
+            source_path = source_path or getattr(image_path, 'filename', '') or "<memory>"
+            image_path = Path(source_path)
+        else:
+            image_path = Path(image_path)
+            image_input = str(image_path)
+            source_path = source_path or str(image_path)
+        
         try:
             logger.info(f"開始處理圖片: {image_path.name}")
             
             # 載入圖片資訊
-            image_info = self.image_processor.get_image_info(image_path)
+            if isinstance(image_input, Image.Image):
+                image_info = {'size': image_input.size}
+            else:
+                image_info = self.image_processor.get_image_info(image_path)
             logger.debug(f"  圖片尺寸: {image_info['size']}")
             
-            # 執行 OCR（使用模型的 infer 方法）
+            # 空白頁預先過濾（縮圖統計，不呼叫模型）
+            if skip_blank:
+                blank = self.image_processor.detect_blank_page(image_input)
+                if blank.is_blank:
+                    logger.info(
+                        f"  偵測為空白頁 ({blank.reason}, 墨跡 {blank.ink_ratio:.4f})，跳過 OCR"
+                    )
+                    return OCRResult(
+                        text_content="",
+                        file_path=source_path,
+                        processing_time=time.time() - start_time,
+                        image_size=image_info['size'],
+                        vram_used_gb=0.0,
+                        timestamp=datetime.now(),
+                        model_config={},
+                        success=True,
+                        skipped_blank=True,
+                        model_fingerprint=self.model_fingerprint
+                    )
+            
+            # 執行 OCR（使用模型的 infer 方法），依延遲等級排隊取得模型使用權
             logger.debug("  執行 OCR 推理...")
             output_dir = output_path or "outputs/temp"
-            result_text = self.model.infer(
-                self.tokenizer,
-                prompt=prompt,
-                image_file=str(image_path),
-                output_path=output_dir,
-                base_size=base_size,
-                image_size=image_size,
-                crop_mode=crop_mode,
-                save_results=save_results,
-                test_compress=False  # 不顯示壓縮資訊
-            )
             
-            # 如果 infer 沒有返回文字，從檔案讀取
-            if not result_text or (isinstance(result_text, str) and result_text.strip() == ""):
-                result_file = Path(output_dir) / "result.mmd"
-                if result_file.exists():
-                    logger.debug(f"  從檔案讀取結果: {result_file}")
-                    with open(result_file, 'r', encoding='utf-8') as f:
-                        result_text = f.read()
-                    logger.debug(f"  讀取到 {len(result_text)} 字元")
+            # 排隊取得使用權之前先決定准入：延後等待記憶體釋放時不佔用使用權，其他請求照常推理
+            admission = self._standby_admission if use_standby else self.admission
+            decision = admission.admit(image_info['size'], base_size, image_size, crop_mode)
+            if not decision.admitted:
+                raise MemoryError(decision.reason)
+            requested = {'base_size': base_size, 'image_size': image_size, 'crop_mode': crop_mode}
+            base_size, image_size, crop_mode = decision.base_size, decision.image_size, decision.crop_mode
+            
+            # CPU 備援模型有自己的排程，不佔用主模型的使用權
+            scheduler = self._standby_scheduler if use_standby else self.scheduler
+            with scheduler.slot(priority):
+                # 在使用權內取用模型：重載替換也需要使用權，進行中的請求會用舊模型完成
+                if use_standby:
+                    model, tokenizer = standby
                 else:
-                    logger.warning(f"  未找到結果檔案: {result_file}")
-                    result_text = ""
+                    model, tokenizer = self.model, self.tokenizer
+                fingerprint = self.model_fingerprint
+                
+                measure_peak = not use_standby and torch.cuda.is_available() and self.device == "cuda"
+                if measure_peak:
+                    torch.cuda.reset_peak_memory_stats()
+                    allocated_before = torch.cuda.memory_allocated()
+                
+                result_text = model.infer(
+                    tokenizer,
+                    prompt=prompt,
+                    image_file=image_input,
+                    output_path=output_dir,
+                    base_size=base_size,
+                    image_size=image_size,
+                    crop_mode=crop_mode,
+                    save_results=save_results,
+                    test_compress=False,  # 不顯示壓縮資訊
+                    global_view_transform=self._global_view_transform
+                )
+                
+                if measure_peak:
+                    peak_gb = (torch.cuda.max_memory_allocated() - allocated_before) / 1024**3
+                    self.admission.observe(decision.estimate, peak_gb)
+                
+                # 如果 infer 沒有返回文字，從檔案讀取（同一輸出目錄可能被下一個請求覆寫，需在釋放前讀取）
+                if not result_text or (isinstance(result_text, str) and result_text.strip() == ""):
+                    result_file = Path(output_dir) / "result.mmd"
+                    if result_file.exists():
+                        logger.debug(f"  從檔案讀取結果: {result_file}")
+                        with open(result_file, 'r', encoding='utf-8') as f:
+                            result_text = f.read()
+                        logger.debug(f"  讀取到 {len(result_text)} 字元")
+                    else:
+                        logger.warning(f"  未找到結果檔案: {result_file}")
+                        result_text = ""
+                
+                layout = None
+                raw_file = Path(output_dir) / "result_raw.mmd"
+                if save_results and raw_file.exists():
+                    layout = parse_layout(raw_file.read_text(encoding='utf-8'))
             
             # 計算處理時間
             processing_time = time.time() - start_time
+            output_tokens = len(tokenizer.encode(result_text, add_special_tokens=False)) if result_text else 0
             
             # 取得 VRAM 使用
             vram_used = 0.0
             if torch.cuda.is_available():
                 vram_used = torch.cuda.memory_allocated(0) / 1024**3
             
+            model_config = {
+                'base_size': base_size,
+                'image_size': image_size,
+                'crop_mode': crop_mode,
+                'prompt': prompt
+            }
+            if decision.action == ACTION_DOWNGRADE:
+                # 記錄原本要求的設定，結果快取不應把降級結果當成原設定的結果
+                model_config['downgraded_from'] = requested
+            
             # 建立結果物件
             result = OCRResult(
                 text_content=result_text or "",
-                file_path=str(image_path),
+                file_path=source_path,
                 processing_time=processing_time,
                 image_size=image_info['size'],
                 vram_used_gb=vram_used,
                 timestamp=datetime.now(),
-                model_config={
-                    'base_size': base_size,
-                    'image_size': image_size,
-                    'crop_mode': crop_mode,
-                    'prompt': prompt
-                },
-                success=True
+                model_config=model_config,
+                success=True,
+                output_tokens=output_tokens,
+                layout=layout,
+                model_fingerprint=fingerprint
             )
             
             logger.info(f"✓ OCR 完成，處理時間: {processing_time:.2f} 秒")
             return result
-            
+        
         except Exception as e:
             processing_time = time.time() - start_time
             logger.error(f"OCR 處理失敗: {e}")
@@ -224,7 +675,7 @@ class OCREngine:
             # 返回錯誤結果
             return OCRResult(
                 text_content="",
-                file_path=str(image_path),
+                file_path=source_path,
                 processing_time=processing_time,
                 image_size=(0, 0),
                 vram_used_gb=0.0,
@@ -234,6 +685,33 @@ class OCREngine:
                 error_message=str(e)
             )
     
+    def get_scheduler_stats(self) -> Dict:
+        """
+        取得各延遲等級的等待與處理時間統計
+        
+        Returns:
+            InferenceScheduler.get_stats() 的結果
+        """
+        return self.scheduler.get_stats()
+    
+    def get_admission_stats(self) -> Dict:
+        """
+        取得記憶體准入統計
+        
+        Returns:
+            AdmissionController.get_stats() 的結果
+        """
+        return self.admission.get_stats()
+    
+    def get_coalescer_stats(self) -> Dict:
+        """
+        取得進行中請求合併統計
+        
+        Returns:
+            RequestCoalescer.get_stats() 的結果
+        """
+        return self.coalescer.get_stats()
+    
     def get_model_info(self) -> Dict:
         """
         取得模型資訊
@@ -252,7 +730,9 @@ class OCREngine:
             'model_path': self.model_path,
             'device': self.device,
             'torch_dtype': str(self.torch_dtype),
-            'parameters': sum(p.numel() for p in self.model.parameters()) / 1e9
+            'parameters': sum(p.numel() for p in self.model.parameters()) / 1e9,
+            'fingerprint': self.model_fingerprint,
+            'load_timings': dict(self.load_timings)
         }
         
         if torch.cuda.is_available():
@@ -265,6 +745,10 @@ class OCREngine:
         self,
         image_paths: List[Union[str, Path]],
         base_batch_size: int = 4,
+        skip_blank: Optional[bool] = None,
+        dedup: Optional[bool] = None,
+        dedup_distance: Optional[int] = None,
+        hash_size: Optional[int] = None,
         **kwargs
     ) -> List[OCRResult]:
         """
@@ -273,8 +757,12 @@ class OCREngine:
         Args:
             image_paths: 圖片檔案路徑列表
             base_batch_size: 基礎批次大小
+            skip_blank: 跳過空白頁（回傳 skipped_blank 的空結果），None 依 blank_detection.enabled
+            dedup: 是否只 OCR 每組重複頁的代表頁，None 依 dedup.enabled
+            dedup_distance: 候選代表頁的最大漢明距離，None 依 dedup.max_distance
+            hash_size: 感知雜湊邊長，None 依 dedup.hash_size
             **kwargs: 其他參數傳遞給 process_image
-            
+        
         Returns:
             OCRResult 列表
         """
@@ -287,19 +775,52 @@ class OCREngine:
         
         logger.info(f"開始批次處理 {len(image_paths)} 張圖片")
         
+        # 感知雜湊（整批向量化計算）篩選候選代表頁，像素內容相同的重複頁只 OCR 代表頁
+        page_hashes = None
+        duplicate_index = None
+        from src.config_loader import get_config
+        config = get_config()
+        if dedup is None:
+            dedup = config.get("dedup.enabled", False)
+        if dedup and len(image_paths) > 1:
+            if dedup_distance is None:
+                dedup_distance = config.get("dedup.max_distance", 10)
+            if hash_size is None:
+                hash_size = config.get("dedup.hash_size", 16)
+            try:
+                page_hashes = self.image_processor.compute_perceptual_hashes(image_paths, hash_size=hash_size)
+                duplicate_index = DuplicateIndex(dedup_distance)
+            except Exception as e:
+                logger.warning(f"感知雜湊計算失敗，停用去重: {e}")
+        
         for i, image_path in enumerate(image_paths):
             logger.info(f"處理進度: {i+1}/{len(image_paths)} - {Path(image_path).name}")
             
             try:
-                # 檢查記憶體狀況
-                if memory_manager.is_vram_critical():
-                    logger.warning("VRAM 使用率過高，執行清理")
-                    memory_manager.clear_cache()
+                # 重複頁直接沿用代表頁結果
+                digest = None
+                if duplicate_index is not None:
+                    digest = self.image_processor.compute_content_digest(image_path)
+                    representative = duplicate_index.match(page_hashes[i], digest)
+                    if representative is not None:
+                        source = results[representative]
+                        logger.info(f"  與 {Path(source.file_path).name} 內容相同，沿用結果")
+                        results.append(replace(
+                            source,
+                            file_path=str(image_path),
+                            processing_time=0.0,
+                            timestamp=datetime.now(),
+                            duplicate_of=source.file_path
+                        ))
+                        continue
                 
-                # 處理單張圖片
-                result = self.process_image(image_path, **kwargs)
+                # 處理單張圖片（記憶體檢查由 process_image 的准入控制在推理前進行）
+                result = self.process_image(image_path, skip_blank=skip_blank, **kwargs)
                 results.append(result)
                 
+                if duplicate_index is not None and result.success:
+                    duplicate_index.add(page_hashes[i], i, digest)
+                
                 # 記錄進度
                 if (i + 1) % 10 == 0:
                     vram_info = memory_manager.get_vram_usage()
@@ -324,9 +845,14 @@ class OCREngine:
         # 統計結果
         successful = sum(1 for r in results if r.success)
         failed = len(results) - successful
+        skipped = sum(1 for r in results if r.skipped_blank)
+        duplicates = sum(1 for r in results if r.duplicate_of)
         total_time = sum(r.processing_time for r in results)
         
-        logger.info(f"批次處理完成: 成功 {successful}, 失敗 {failed}, 總時間 {total_time:.2f} 秒")
+        logger.info(
+            f"批次處理完成: 成功 {successful} (空白頁跳過 {skipped}, 重複沿用 {duplicates}), "
+            f"失敗 {failed}, 總時間 {total_time:.2f} 秒"
+        )
         
         return results
     
@@ -341,7 +867,7 @@ class OCREngine:
         Args:
             image_path: 圖片檔案路徑
             **kwargs: 其他參數
-            
+        
         Returns:
             OCRResult 物件
         """
@@ -353,60 +879,56 @@ class OCREngine:
                 logger.warning("VRAM 使用率過高，嘗試清理快取")
                 memory_manager.clear_cache()
             
-            # 嘗試 GPU 處理
-            return self.process_image(image_path, **kwargs)
+            # 嘗試 GPU 處理（process_image 會把例外轉為失敗結果，OOM 需從錯誤訊息判斷）
+            result = self.process_image(image_path, **kwargs)
+            if result.success or self.device == "cpu" or "out of memory" not in (result.error_message or "").lower():
+                return result
         
         except torch.cuda.OutOfMemoryError:
-            logger.warning("GPU 記憶體不足，切換到 CPU 模式")
-            
-            # 清理 GPU 快取
-            memory_manager.clear_cache()
-            
-            # 暫時切換到 CPU
-            original_device = self.device
-            try:
-                # 重新載入模型到 CPU
-                self.unload_model()
-                self.device = "cpu"
-                self.load_model()
-                
-                # 在 CPU 上處理
-                result = self.process_image(image_path, **kwargs)
-                
-                # 恢復 GPU 模式
-                self.unload_model()
-                self.device = original_device
-                self.load_model()
-                
-                return result
-            
-            except Exception as e:
-                logger.error(f"CPU fallback 也失敗: {e}")
-                return OCRResult(
-                    text_content="",
-                    file_path=str(image_path),
-                    processing_time=0.0,
-                    image_size=(0, 0),
-                    vram_used_gb=0.0,
-                    timestamp=datetime.now(),
-                    model_config={},
-                    success=False,
-                    error_message=f"GPU 和 CPU 處理都失敗: {str(e)}"
-                )
+            pass
+        
+        logger.warning("GPU 記憶體不足，改用 CPU 備援模型處理此頁")
+        
+        # 清理 GPU 快取
+        memory_manager.clear_cache()
+        
+        # 主模型留在 GPU 上繼續服務其他請求，此頁交給 CPU 備援模型（首次使用時載入，之後重複使用）
+        try:
+            kwargs.pop("device", None)
+            return self.process_image(image_path, device="cpu", **kwargs)
+        
+        except Exception as e:
+            logger.error(f"CPU fallback 也失敗: {e}")
+            return OCRResult(
+                text_content="",
+                file_path=str(image_path),
+                processing_time=0.0,
+                image_size=(0, 0),
+                vram_used_gb=0.0,
+                timestamp=datetime.now(),
+                model_config={},
+                success=False,
+                error_message=f"GPU 和 CPU 處理都失敗: {str(e)}"
+            )
+    
+    def _release_model(self):
+        """釋放主模型與 tokenizer"""
+        del self.model
+        del self.tokenizer
+        self.model = None
+        self.tokenizer = None
+        self._model_loaded = False
+        
+        gc.collect()
+        if torch.cuda.is_available():
+            torch.cuda.empty_cache()
     
     def unload_model(self):
-        """卸載模型以釋放記憶體"""
+        """卸載模型以釋放記憶體（含 CPU 備援模型）"""
+        self.release_cpu_standby()
         if self._model_loaded:
             logger.info("卸載模型...")
-            del self.model
-            del self.tokenizer
-            self.model = None
-            self.tokenizer = None
-            self._model_loaded = False
-            
-            if torch.cuda.is_available():
-                torch.cuda.empty_cache()
-            
+            self._release_model()
             logger.info("✓ 模型已卸載")
 
 
@@ -423,7 +945,7 @@ def process_image(
         image_path: 圖片檔案路徑
         model_path: 模型路徑
         **kwargs: 其他參數傳遞給 OCREngine.process_image
-        
+    
     Returns:
         OCRResult 物件
     """
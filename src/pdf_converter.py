@@ -3,13 +3,25 @@ PDF 轉換模組
 將 PDF 文件轉換為圖片以進行 OCR 處理
 """
 
-from pdf2image import convert_from_path
+from pdf2image import convert_from_path, pdfinfo_from_path
 from PIL import Image
 from pathlib import Path
-from typing import List, Union, Optional, Tuple
+from typing import List, Union, Optional, Tuple, Iterator, Sequence, Dict
 import logging
 from dataclasses import dataclass
 import os
+import re
+import math
+import shutil
+import tempfile
+import platform
+import subprocess
+import queue
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+
+from .crop_grid import CROP_TILE_SIZE, crop_grid
 
 logger = logging.getLogger(__name__)
 
@@ -31,6 +43,260 @@ def get_poppler_path() -> Optional[str]:
     return None
 
 
+# pdfinfo 每頁輸出格式，例如 "Page    1 size: 612 x 792 pts (letter)"
+_PAGE_SIZE_RE = re.compile(r'^Page\s+(\d+)\s+size$')
+_PAGE_ROT_RE = re.compile(r'^Page\s+(\d+)\s+rot$')
+_SIZE_VALUE_RE = re.compile(r'([\d.]+)\s*x\s*([\d.]+)')
+
+# PDF 結構資訊快取：(路徑, mtime, 檔案大小) -> 資訊字典
+_PDF_STRUCTURE_CACHE: "OrderedDict[tuple, dict]" = OrderedDict()
+_PDF_STRUCTURE_CACHE_SIZE = 128
+_PDF_STRUCTURE_CACHE_LOCK = threading.Lock()
+
+
+def read_pdf_structure(pdf_path: Union[str, Path], poppler_path: Optional[str] = None) -> dict:
+    """
+    以 pdfinfo 讀取 PDF 結構資訊（頁數、每頁尺寸、中繼資料），不轉換任何頁面
+    
+    結果依檔案路徑、修改時間與大小快取，檔案變更後會自動重新讀取。
+    
+    Args:
+        pdf_path: PDF 檔案路徑
+        poppler_path: Poppler 執行檔目錄，None 表示系統 PATH
+    
+    Returns:
+        {'total_pages', 'page_sizes', 'metadata'} 字典，
+        page_sizes 為已套用旋轉的 (寬, 高) 點數（1/72 英吋）列表
+    """
+    pdf_path = Path(pdf_path).resolve()
+    stat = pdf_path.stat()
+    key = (str(pdf_path), stat.st_mtime_ns, stat.st_size)
+    
+    with _PDF_STRUCTURE_CACHE_LOCK:
+        if key in _PDF_STRUCTURE_CACHE:
+            _PDF_STRUCTURE_CACHE.move_to_end(key)
+            return _PDF_STRUCTURE_CACHE[key]
+    
+    kwargs = {'poppler_path': poppler_path} if poppler_path else {}
+    
+    # 第一次呼叫取得總頁數與中繼資料，第二次取得所有頁面尺寸
+    metadata = pdfinfo_from_path(str(pdf_path), **kwargs)
+    total_pages = int(metadata['Pages'])
+    page_info = pdfinfo_from_path(str(pdf_path), first_page=1, last_page=total_pages, **kwargs)
+    
+    sizes = {}
+    rotations = {}
+    for field, value in page_info.items():
+        size_match = _PAGE_SIZE_RE.match(field)
+        if size_match:
+            value_match = _SIZE_VALUE_RE.search(str(value))
+            if value_match:
+                sizes[int(size_match.group(1))] = (
+                    float(value_match.group(1)), float(value_match.group(2))
+                )
+            continue
+        rot_match = _PAGE_ROT_RE.match(field)
+        if rot_match:
+            rotations[int(rot_match.group(1))] = int(str(value).strip() or 0)
+    
+    page_sizes = []
+    default_size = _parse_size(metadata.get('Page size', ''))
+    for page in range(1, total_pages + 1):
+        width, height = sizes.get(page, default_size)
+        if rotations.get(page, 0) % 180 == 90:
+            width, height = height, width
+        page_sizes.append((width, height))
+    
+    info = {
+        'total_pages': total_pages,
+        'page_sizes': page_sizes,
+        'metadata': {k: v for k, v in metadata.items() if k not in ('Pages', 'Page size', 'Page rot')}
+    }
+    
+    with _PDF_STRUCTURE_CACHE_LOCK:
+        _PDF_STRUCTURE_CACHE[key] = info
+        while len(_PDF_STRUCTURE_CACHE) > _PDF_STRUCTURE_CACHE_SIZE:
+            _PDF_STRUCTURE_CACHE.popitem(last=False)
+    
+    return info
+
+
+def _parse_size(value: str) -> Tuple[float, float]:
+    """解析 "612 x 792 pts" 格式的頁面尺寸，無法解析時回傳 (0, 0)"""
+    match = _SIZE_VALUE_RE.search(str(value))
+    if not match:
+        return (0.0, 0.0)
+    return (float(match.group(1)), float(match.group(2)))
+
+
+@dataclass
+class PDFPage:
+    """PDF 單頁內容資料類別"""
+    page_number: int                        # 頁碼（從 1 開始）
+    source: str                             # 'text_layer' 或 'ocr'
+    image: Optional[Image.Image] = None     # 需 OCR 時的頁面圖片
+    text: Optional[str] = None              # 可用文字層內容
+
+
+def is_usable_text_layer(text: str, min_chars: int = 20) -> bool:
+    """
+    判斷文字層是否可直接使用
+    
+    Args:
+        text: pdftotext 擷取的頁面文字
+        min_chars: 最少非空白字元數
+    
+    Returns:
+        True 如果文字量足夠且多為可讀字元
+    """
+    compact = ''.join(text.split())
+    if len(compact) < min_chars:
+        return False
+    
+    readable = sum(1 for ch in compact if ch.isalnum())
+    garbled = compact.count('\ufffd') + sum(1 for ch in compact if ord(ch) < 32)
+    return readable / len(compact) >= 0.5 and garbled / len(compact) < 0.05
+
+
+def _split_ranges(
+    pages: Sequence[int],
+    chunk_size: int,
+    page_dpis: Optional[Dict[int, int]] = None
+) -> List[Tuple[int, int]]:
+    """
+    將頁碼切成連續且不超過 chunk_size 頁的 (起始, 結束) 範圍
+    
+    提供 page_dpis 時，DPI 不同的頁面不會併入同一段（單次 pdftoppm 只能使用一種 DPI）。
+    """
+    page_dpis = page_dpis or {}
+    ranges = []
+    for page in pages:
+        if (ranges and page == ranges[-1][1] + 1 and page - ranges[-1][0] < chunk_size
+                and page_dpis.get(page) == page_dpis.get(ranges[-1][0])):
+            ranges[-1] = (ranges[-1][0], page)
+        else:
+            ranges.append((page, page))
+    return ranges
+
+
+def estimate_page_bytes(page_size: Tuple[float, float], dpi: int) -> int:
+    """
+    估算頁面以指定 DPI 轉換後的 RGB 圖片大小
+    
+    Args:
+        page_size: 頁面尺寸 (寬, 高)，單位為點
+        dpi: 轉換 DPI
+    
+    Returns:
+        位元組數
+    """
+    width = math.ceil(page_size[0] / 72 * dpi)
+    height = math.ceil(page_size[1] / 72 * dpi)
+    return width * height * 3
+
+
+def _check_rendered(start: int, end: int, items: Sequence[Union[Image.Image, str]]):
+    """
+    確認 pdftoppm 產出了整段頁面
+    
+    頁面損毀或轉換行程被終止時產出的頁數會較少，依位置編號會讓之後每一頁的頁碼錯位。
+    
+    Raises:
+        RuntimeError: 產出頁數與要求的頁數不符
+    """
+    expected = end - start + 1
+    if len(items) == expected:
+        return
+    
+    # 落地的頁面檔名帶有頁碼，可指出缺少哪些頁；記憶體中的頁面只能指出所在段落
+    detail = f"頁面 {start}-{end} 的產出頁數不符"
+    numbers = [re.search(r'-(\d+)\.[^.]+$', item) for item in items if isinstance(item, str)]
+    if len(numbers) == len(items) and all(numbers):
+        rendered = {int(match.group(1)) for match in numbers}
+        missing = [page for page in range(start, end + 1) if page not in rendered]
+        if missing:
+            detail = f"缺少頁面 {', '.join(map(str, missing))}"
+    raise RuntimeError(f"pdftoppm 只轉換了 {len(items)}/{expected} 頁：{detail}")
+
+
+def _load_spilled(path: str) -> Image.Image:
+    """讀回落地的頁面圖片並刪除暫存檔"""
+    with Image.open(path) as image:
+        image.load()
+    os.remove(path)
+    return image
+
+
+# 自動 DPI 的下限，避免極大頁面轉換後文字無法辨識
+MIN_AUTO_DPI = 72
+
+
+def _required_pixels(
+    width: float,
+    height: float,
+    base_size: int,
+    image_size: int,
+    crop_mode: bool
+) -> Tuple[float, float]:
+    """回傳模型在此 OCR 模式下實際使用的最小寬高（像素），不足時模型會放大圖片"""
+    if not crop_mode:
+        if image_size <= CROP_TILE_SIZE:
+            # 模型直接縮放為 image_size × image_size 正方形
+            return image_size, image_size
+        # 全域視圖等比例縮放至長邊 image_size
+        scale = image_size / max(width, height)
+        return width * scale, height * scale
+    
+    # 全域視圖等比例縮放至長邊 base_size；切片則縮放為 640 × 欄列數
+    scale = base_size / max(width, height)
+    columns, rows = crop_grid(width, height)
+    return (
+        max(width * scale, CROP_TILE_SIZE * columns),
+        max(height * scale, CROP_TILE_SIZE * rows)
+    )
+
+
+def compute_page_dpi(
+    page_size: Tuple[float, float],
+    base_size: int = 1024,
+    image_size: int = 1024,
+    crop_mode: bool = False,
+    max_dpi: int = 200
+) -> int:
+    """
+    依頁面實體尺寸與 OCR 解析度模式計算轉換 DPI
+    
+    轉換後的圖片只需要與模型實際使用的解析度相同，
+    更高的 DPI 只會增加轉換時間、記憶體與後續縮放成本。
+    
+    Args:
+        page_size: 頁面尺寸 (寬, 高)，單位為點（1/72 英吋）
+        base_size: 模型全域視圖尺寸
+        image_size: 模型圖片尺寸
+        crop_mode: 是否使用裁切模式
+        max_dpi: DPI 上限（通常為設定檔的 DPI）
+    
+    Returns:
+        介於 MIN_AUTO_DPI 與 max_dpi 之間的 DPI
+    """
+    width_in, height_in = page_size[0] / 72, page_size[1] / 72
+    if width_in <= 0 or height_in <= 0:
+        return max_dpi
+    
+    # 切片數由長寬比決定，與 DPI 無關；以 max_dpi 的像素尺寸判斷平手時的選擇
+    full_width, full_height = width_in * max_dpi, height_in * max_dpi
+    need_width, need_height = _required_pixels(
+        full_width, full_height, base_size, image_size, crop_mode)
+    
+    dpi = math.ceil(max(need_width / width_in, need_height / height_in))
+    dpi = max(MIN_AUTO_DPI, min(max_dpi, dpi))
+    
+    # 降低 DPI 後切片數必須維持不變，否則改用 max_dpi
+    if crop_mode and crop_grid(width_in * dpi, height_in * dpi) != crop_grid(full_width, full_height):
+        return max_dpi
+    return dpi
+
+
 @dataclass
 class PDFConversionResult:
     """PDF 轉換結果資料類別"""
@@ -50,25 +316,38 @@ class PDFConverter:
         self,
         dpi: int = 200,
         output_format: str = 'PNG',
-        max_pages: Optional[int] = None
+        max_pages: Optional[int] = None,
+        workers: int = 1,
+        ocr_mode: Optional[Tuple[int, int, bool]] = None,
+        ram_budget_mb: Optional[int] = None
     ):
         """
         初始化 PDF 轉換器
         
         Args:
-            dpi: 輸出圖片的 DPI（解析度）
+            dpi: 輸出圖片的 DPI（解析度）；設定 ocr_mode 時為 DPI 上限
             output_format: 輸出格式 (PNG, JPEG)
             max_pages: 最大處理頁數，None 表示無限制
+            workers: 平行轉換的 pdftoppm 行程數，頁碼範圍會分段交給各行程
+            ocr_mode: OCR 解析度模式 (base_size, image_size, crop_mode)，
+                設定時依每頁實體尺寸計算 DPI，None 表示固定使用 dpi
+            ram_budget_mb: 轉換中頁面的記憶體預算（MB），依頁面尺寸決定分段大小，
+                超過時落地至暫存目錄；None 表示只依 chunk_size 分段
         """
         self.dpi = dpi
         self.output_format = output_format.upper()
         self.max_pages = max_pages
+        self.workers = max(1, workers)
+        self.ocr_mode = ocr_mode
+        self.ram_budget_mb = ram_budget_mb
         self.poppler_path = get_poppler_path()
         
         logger.info(f"PDFConverter 初始化")
-        logger.info(f"  DPI: {dpi}")
+        logger.info(f"  DPI: {dpi}" + ("（依頁面尺寸自動調整）" if ocr_mode else ""))
         logger.info(f"  格式: {output_format}")
         logger.info(f"  最大頁數: {max_pages or '無限制'}")
+        logger.info(f"  轉換行程數: {self.workers}")
+        logger.info(f"  RAM 預算: {f'{ram_budget_mb} MB' if ram_budget_mb else '無限制'}")
         logger.info(f"  Poppler 路徑: {self.poppler_path or '系統 PATH'}")
     
     def convert_pdf(
@@ -76,7 +355,8 @@ class PDFConverter:
         pdf_path: Union[str, Path],
         output_dir: Union[str, Path],
         page_range: Optional[Tuple[int, int]] = None,
-        prefix: str = "page"
+        prefix: str = "page",
+        chunk_size: int = 8
     ) -> PDFConversionResult:
         """
         轉換 PDF 為圖片
@@ -86,7 +366,8 @@ class PDFConverter:
             output_dir: 輸出目錄
             page_range: 頁碼範圍 (start, end)，None 表示全部
             prefix: 輸出檔案前綴
-            
+            chunk_size: 每個 pdftoppm 行程一次轉換的頁數上限
+        
         Returns:
             PDFConversionResult 物件
         """
@@ -111,63 +392,7 @@ class PDFConverter:
         try:
             logger.info(f"開始轉換 PDF: {pdf_path.name}")
             
-            # 設定轉換參數
-            convert_kwargs = {
-                'dpi': self.dpi,
-                'fmt': self.output_format.lower()
-            }
-            
-            # 加入 Poppler 路徑
-            if self.poppler_path:
-                convert_kwargs['poppler_path'] = self.poppler_path
-            
-            # 設定頁碼範圍
-            if page_range:
-                start_page, end_page = page_range
-                convert_kwargs['first_page'] = start_page
-                convert_kwargs['last_page'] = end_page
-                logger.info(f"  頁碼範圍: {start_page}-{end_page}")
-            
-            # 轉換 PDF
-            images = convert_from_path(str(pdf_path), **convert_kwargs)
-            
-            total_pages = len(images)
-            logger.info(f"  總頁數: {total_pages}")
-            
-            # 檢查最大頁數限制
-            if self.max_pages and total_pages > self.max_pages:
-                logger.warning(f"頁數 {total_pages} 超過限制 {self.max_pages}，僅處理前 {self.max_pages} 頁")
-                images = images[:self.max_pages]
-            
-            # 儲存圖片
-            image_paths = []
-            for i, image in enumerate(images, 1):
-                # 生成檔案名稱
-                if page_range:
-                    page_num = page_range[0] + i - 1
-                else:
-                    page_num = i
-                
-                filename = f"{prefix}_{page_num:04d}.{self.output_format.lower()}"
-                image_path = output_dir / filename
-                
-                # 儲存圖片
-                image.save(image_path, self.output_format)
-                image_paths.append(str(image_path))
-                
-                logger.debug(f"  已儲存: {filename}")
-            
-            converted_pages = len(image_paths)
-            logger.info(f"✓ PDF 轉換完成: {converted_pages} 頁")
-            
-            return PDFConversionResult(
-                success=True,
-                pdf_path=str(pdf_path),
-                total_pages=total_pages,
-                converted_pages=converted_pages,
-                image_paths=image_paths,
-                output_dir=str(output_dir)
-            )
+            return self._convert_pdf_chunked(pdf_path, output_dir, page_range, prefix, chunk_size)
         
         except Exception as e:
             logger.error(f"PDF 轉換失敗: {e}")
@@ -181,13 +406,480 @@ class PDFConverter:
                 error_message=str(e)
             )
     
-    def get_pdf_info(self, pdf_path: Union[str, Path]) -> dict:
+    def _convert_pdf_chunked(
+        self,
+        pdf_path: Path,
+        output_dir: Path,
+        page_range: Optional[Tuple[int, int]],
+        prefix: str,
+        chunk_size: int
+    ) -> PDFConversionResult:
+        """
+        分段轉換並依頁碼順序儲存
+        
+        頁碼範圍先依 max_pages 截斷，超出的頁面不會被轉換；
+        每段轉換完即存檔釋放，記憶體用量由 chunk_size / ram_budget_mb 控制。
+        """
+        first_page, last_page = self.resolve_page_range(pdf_path, page_range)
+        total_pages = last_page - first_page + 1
+        logger.info(f"  頁碼範圍: {first_page}-{last_page}（{self.workers} 個轉換行程）")
+        
+        image_paths = []
+        pages = range(first_page, last_page + 1)
+        for page_num, image in self._render_pages(pdf_path, pages, chunk_size):
+            filename = f"{prefix}_{page_num:04d}.{self.output_format.lower()}"
+            image_path = output_dir / filename
+            image.save(image_path, self.output_format, **self._save_kwargs())
+            image_paths.append(str(image_path))
+            logger.debug(f"  已儲存: {filename}")
+        
+        logger.info(f"✓ PDF 轉換完成: {len(image_paths)} 頁")
+        
+        return PDFConversionResult(
+            success=True,
+            pdf_path=str(pdf_path),
+            total_pages=total_pages,
+            converted_pages=len(image_paths),
+            image_paths=image_paths,
+            output_dir=str(output_dir)
+        )
+    
+    def _render_range(
+        self,
+        pdf_path: Path,
+        first_page: int,
+        last_page: int,
+        dpi: Optional[int] = None,
+        spill_dir: Optional[str] = None
+    ) -> List[Union[Image.Image, str]]:
+        """
+        以單一 pdftoppm 行程轉換一段連續頁面
+        
+        指定 spill_dir 時頁面寫入該目錄並回傳檔案路徑，不讀入記憶體。
+        """
+        convert_kwargs = self._convert_kwargs(dpi)
+        if spill_dir:
+            convert_kwargs.update(output_folder=spill_dir, paths_only=True)
+        
+        images = convert_from_path(
+            str(pdf_path),
+            first_page=first_page,
+            last_page=last_page,
+            **convert_kwargs
+        )
+        logger.debug(f"  已轉換頁面 {first_page}-{last_page}（{dpi or self.dpi} DPI）")
+        return images
+    
+    def page_dpis(self, pdf_path: Union[str, Path], pages: Sequence[int]) -> Dict[int, int]:
         """
-        取得 PDF 基本資訊
+        計算每頁的轉換 DPI
         
         Args:
             pdf_path: PDF 檔案路徑
+            pages: 頁碼列表
+        
+        Returns:
+            {頁碼: DPI} 字典；未設定 ocr_mode 時為空字典（全部使用 self.dpi）
+        """
+        if not self.ocr_mode or not pages:
+            return {}
+        
+        base_size, image_size, crop_mode = self.ocr_mode
+        page_sizes = read_pdf_structure(pdf_path, self.poppler_path)['page_sizes']
+        return {
+            page: compute_page_dpi(page_sizes[page - 1], base_size, image_size, crop_mode, self.dpi)
+            for page in pages
+        }
+    
+    def _plan_ranges(
+        self,
+        pdf_path: Path,
+        pages: Sequence[int],
+        chunk_size: int,
+        prefetch: int = 0
+    ) -> List[Tuple[int, int, Optional[int], bool]]:
+        """
+        規劃轉換段落，回傳 (起始頁, 結束頁, DPI, 是否落地) 列表
+        
+        未設定 RAM 預算時每段 chunk_size 頁；設定時依頁面尺寸與 DPI 估算
+        每頁解碼後的大小。預算先扣除預先轉換佇列（prefetch 頁，加上背景執行緒
+        等待放入的 1 頁，以最大頁面估計），其餘由同時存在的段落平分：
+        workers > 1 時為轉換中的 workers 段加上正在產出的 1 段，否則為 1 段。
+        單頁即超過每段預算的段落改為由 pdftoppm 直接寫入暫存目錄，再逐頁讀回。
+        """
+        dpis = self.page_dpis(pdf_path, pages)
+        ranges = _split_ranges(pages, max(1, chunk_size), dpis)
+        if not self.ram_budget_mb:
+            return [(start, end, dpis.get(start), False) for start, end in ranges]
+        
+        page_sizes = read_pdf_structure(pdf_path, self.poppler_path)['page_sizes']
+        page_bytes = {
+            page: estimate_page_bytes(page_sizes[page - 1], dpis.get(page) or self.dpi)
+            for page in pages
+        }
+        budget = self.ram_budget_mb * 1024 * 1024
+        reserved = (prefetch + 1) * max(page_bytes.values()) if prefetch > 0 and page_bytes else 0
+        if reserved >= budget:
+            logger.warning(
+                f"  預先轉換佇列（{prefetch} 頁）已用盡 RAM 預算 {self.ram_budget_mb} MB，"
+                f"所有頁面改為暫存至磁碟"
+            )
+        concurrent_chunks = self.workers + 1 if self.workers > 1 else 1
+        chunk_budget = max(0, budget - reserved) / concurrent_chunks
+        
+        planned = []
+        for range_start, range_end in ranges:
+            start, used = range_start, 0
+            for page in range(range_start, range_end + 1):
+                if page > start and used + page_bytes[page] > chunk_budget:
+                    planned.append((start, page - 1, dpis.get(start), used > chunk_budget))
+                    start, used = page, 0
+                used += page_bytes[page]
+            planned.append((start, range_end, dpis.get(start), used > chunk_budget))
+        
+        spilled = sum(1 for *_, spill in planned if spill)
+        if spilled:
+            logger.info(f"  {spilled} 段頁面超過 RAM 預算，改為暫存至磁碟")
+        return planned
+    
+    def _render_pages(
+        self,
+        pdf_path: Path,
+        pages: Sequence[int],
+        chunk_size: int,
+        prefetch: int = 0
+    ) -> Iterator[Tuple[int, Image.Image]]:
+        """
+        分段轉換指定頁碼，依頁碼順序逐頁產出 (頁碼, 圖片)
+        
+        workers > 1 時最多同時有 workers 段由各自的 pdftoppm 行程轉換，產出中的那一段
+        仍在記憶體中，因此記憶體上限為 workers + 1 段（RAM 預算依此分段，並扣除
+        prefetch 頁的預先轉換佇列）；落地的段落只保留檔案路徑，產出時才逐頁讀回。
+        """
+        ranges = self._plan_ranges(pdf_path, pages, chunk_size, prefetch)
+        spill_dir = None
+        if any(spill for *_, spill in ranges):
+            spill_dir = tempfile.mkdtemp(prefix="pdf_spill_")
+        
+        def submit(executor, start, end, dpi, spill):
+            return executor.submit(self._render_range, pdf_path, start, end, dpi,
+                                   spill_dir if spill else None)
+        
+        def emit(start, end, items):
+            _check_rendered(start, end, items)
+            for offset, item in enumerate(items):
+                yield start + offset, _load_spilled(item) if isinstance(item, str) else item
+        
+        if self.workers <= 1 or len(ranges) <= 1:
+            try:
+                for start, end, dpi, spill in ranges:
+                    items = self._render_range(pdf_path, start, end, dpi, spill_dir if spill else None)
+                    yield from emit(start, end, items)
+            finally:
+                if spill_dir:
+                    shutil.rmtree(spill_dir, ignore_errors=True)
+            return
+        
+        executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="pdftoppm")
+        pending = deque()
+        remaining = iter(ranges)
+        try:
+            for planned in remaining:
+                pending.append((planned[0], planned[1], submit(executor, *planned)))
+                if len(pending) >= self.workers:
+                    break
             
+            while pending:
+                start, end, future = pending.popleft()
+                items = future.result()
+                
+                next_range = next(remaining, None)
+                if next_range is not None:
+                    pending.append((next_range[0], next_range[1], submit(executor, *next_range)))
+                
+                yield from emit(start, end, items)
+        finally:
+            for *_, future in pending:
+                future.cancel()
+            executor.shutdown(wait=False)
+            if spill_dir:
+                shutil.rmtree(spill_dir, ignore_errors=True)
+    
+    def iter_pages(
+        self,
+        pdf_path: Union[str, Path],
+        page_range: Optional[Tuple[int, int]] = None,
+        chunk_size: int = 4,
+        prefetch: int = 0
+    ) -> Iterator[Tuple[int, Image.Image]]:
+        """
+        逐頁串流轉換 PDF，每轉換完一小段即依序產出頁面
+        
+        記憶體中同時存在的頁面數不超過 (workers + 1) × chunk_size + prefetch + 1，
+        且不會轉換超過 max_pages 的頁面。
+        
+        Args:
+            pdf_path: PDF 檔案路徑
+            page_range: 頁碼範圍 (start, end)，None 表示全部
+            chunk_size: 每次呼叫 pdftoppm 轉換的頁數
+            prefetch: 背景執行緒預先轉換的頁數，0 表示在呼叫端執行緒同步轉換
+        
+        Yields:
+            (頁碼, PIL Image) 元組，頁碼從 1 開始
+        
+        Raises:
+            FileNotFoundError: PDF 檔案不存在
+        """
+        pdf_path = Path(pdf_path)
+        if not pdf_path.exists():
+            raise FileNotFoundError(f"PDF 檔案不存在: {pdf_path}")
+        
+        first_page, last_page = self.resolve_page_range(pdf_path, page_range)
+        yield from self._iter_rendered(pdf_path, range(first_page, last_page + 1), chunk_size, prefetch)
+    
+    def iter_document(
+        self,
+        pdf_path: Union[str, Path],
+        page_range: Optional[Tuple[int, int]] = None,
+        chunk_size: int = 4,
+        prefetch: int = 0,
+        use_text_layer: bool = True,
+        pages: Optional[Sequence[int]] = None
+    ) -> Iterator["PDFPage"]:
+        """
+        逐頁產出 PDF 內容：有可用文字層的頁面直接回傳文字，其餘頁面才轉換為圖片
+        
+        Args:
+            pdf_path: PDF 檔案路徑
+            page_range: 頁碼範圍 (start, end)，None 表示全部
+            chunk_size: 每次呼叫 pdftoppm 轉換的頁數
+            prefetch: 背景執行緒預先轉換的頁數
+            use_text_layer: 是否使用內嵌文字層，False 則所有頁面都轉換
+            pages: 只處理範圍內的這些頁碼（例如續傳時尚未完成的頁面），None 表示全部
+        
+        Yields:
+            PDFPage 物件，依頁碼順序
+        
+        Raises:
+            FileNotFoundError: PDF 檔案不存在
+        """
+        pdf_path = Path(pdf_path)
+        if not pdf_path.exists():
+            raise FileNotFoundError(f"PDF 檔案不存在: {pdf_path}")
+        
+        first_page, last_page = self.resolve_page_range(pdf_path, page_range)
+        if pages is None:
+            selected = list(range(first_page, last_page + 1))
+        else:
+            selected = sorted(p for p in set(pages) if first_page <= p <= last_page)
+        if not selected:
+            return
+        
+        text_layer = {}
+        if use_text_layer:
+            try:
+                text_layer = self.extract_text_layer(pdf_path, (selected[0], selected[-1]))
+            except Exception as e:
+                logger.warning(f"文字層讀取失敗，所有頁面改用 OCR: {e}")
+        
+        ocr_pages = [p for p in selected if text_layer.get(p) is None]
+        logger.info(
+            f"  文字層頁面: {len(selected) - len(ocr_pages)}，"
+            f"需 OCR 頁面: {len(ocr_pages)}"
+        )
+        
+        rendered = self._iter_rendered(pdf_path, ocr_pages, chunk_size, prefetch)
+        try:
+            for page_num in selected:
+                text = text_layer.get(page_num)
+                if text is not None:
+                    yield PDFPage(page_num, source='text_layer', text=text)
+                else:
+                    item = next(rendered, None)
+                    if item is None:
+                        raise RuntimeError(f"頁面 {page_num} 未轉換：pdftoppm 產出的頁面少於要求的頁數")
+                    rendered_num, image = item
+                    if rendered_num != page_num:
+                        raise RuntimeError(f"轉換頁碼不符：預期第 {page_num} 頁，取得第 {rendered_num} 頁")
+                    yield PDFPage(rendered_num, source='ocr', image=image)
+        finally:
+            rendered.close()
+    
+    def extract_text_layer(
+        self,
+        pdf_path: Union[str, Path],
+        page_range: Tuple[int, int],
+        min_chars: int = 20
+    ) -> Dict[int, Optional[str]]:
+        """
+        以 pdftotext / pdfimages 判斷每頁是否有可用的內嵌文字層
+        
+        頁面文字量不足、可讀字元比例過低，或有圖片覆蓋大半頁面
+        （掃描頁加上隱藏文字層）時視為不可用，需交給 OCR。
+        
+        Args:
+            pdf_path: PDF 檔案路徑
+            page_range: 頁碼範圍 (start, end)
+            min_chars: 可用文字層的最少非空白字元數
+        
+        Returns:
+            {頁碼: 文字或 None} 字典，None 表示該頁需要 OCR
+        """
+        first_page, last_page = page_range
+        output = self._run_poppler(
+            'pdftotext', '-enc', 'UTF-8', '-f', str(first_page), '-l', str(last_page),
+            str(pdf_path), '-'
+        )
+        # pdftotext 以換頁字元分隔各頁
+        page_texts = output.split('\f')
+        
+        image_pages = self._find_image_pages(pdf_path, page_range)
+        
+        result = {}
+        for offset, page_num in enumerate(range(first_page, last_page + 1)):
+            text = page_texts[offset].strip() if offset < len(page_texts) else ''
+            if page_num in image_pages or not is_usable_text_layer(text, min_chars):
+                result[page_num] = None
+            else:
+                result[page_num] = text
+        return result
+    
+    def _find_image_pages(self, pdf_path: Union[str, Path], page_range: Tuple[int, int]) -> set:
+        """找出有圖片覆蓋超過一半頁面面積的頁碼"""
+        first_page, last_page = page_range
+        output = self._run_poppler(
+            'pdfimages', '-list', '-f', str(first_page), '-l', str(last_page), str(pdf_path)
+        )
+        page_sizes = read_pdf_structure(pdf_path, self.poppler_path)['page_sizes']
+        
+        coverage = {}
+        # 欄位: page num type width height color comp bpc enc interp object ID x-ppi y-ppi size ratio
+        for line in output.splitlines()[2:]:
+            fields = line.split()
+            if len(fields) < 14 or fields[2] != 'image':
+                continue
+            try:
+                page = int(fields[0])
+                width, height = int(fields[3]), int(fields[4])
+                x_ppi, y_ppi = float(fields[12]), float(fields[13])
+            except ValueError:
+                continue
+            if x_ppi <= 0 or y_ppi <= 0:
+                continue
+            # 圖片面積（點數²）
+            area = (width / x_ppi * 72) * (height / y_ppi * 72)
+            coverage[page] = coverage.get(page, 0.0) + area
+        
+        image_pages = set()
+        for page, area in coverage.items():
+            page_width, page_height = page_sizes[page - 1]
+            if page_width * page_height > 0 and area / (page_width * page_height) > 0.5:
+                image_pages.add(page)
+        return image_pages
+    
+    def _run_poppler(self, command: str, *args: str) -> str:
+        """執行 Poppler 命令列工具並回傳標準輸出"""
+        if platform.system() == 'Windows':
+            command += '.exe'
+        if self.poppler_path:
+            command = os.path.join(self.poppler_path, command)
+        
+        proc = subprocess.run([command, *args], capture_output=True, timeout=300)
+        if proc.returncode != 0:
+            raise RuntimeError(
+                f"{os.path.basename(command)} 失敗 ({proc.returncode}): "
+                f"{proc.stderr.decode('utf-8', 'ignore').strip()}"
+            )
+        return proc.stdout.decode('utf-8', 'ignore')
+    
+    def _iter_rendered(
+        self,
+        pdf_path: Path,
+        pages: Sequence[int],
+        chunk_size: int,
+        prefetch: int
+    ) -> Iterator[Tuple[int, Image.Image]]:
+        """依序轉換指定頁碼，可選擇以背景執行緒預先轉換"""
+        rendered = self._render_pages(pdf_path, pages, chunk_size, prefetch)
+        
+        if prefetch <= 0:
+            yield from rendered
+            return
+        
+        yield from _prefetch(rendered, prefetch)
+    
+    def count_pages(self, pdf_path: Union[str, Path]) -> int:
+        """
+        取得 PDF 總頁數（讀取 PDF 結構，不轉換頁面）
+        
+        Args:
+            pdf_path: PDF 檔案路徑
+        
+        Returns:
+            總頁數
+        """
+        return read_pdf_structure(pdf_path, self.poppler_path)['total_pages']
+    
+    def resolve_page_range(
+        self,
+        pdf_path: Path,
+        page_range: Optional[Tuple[int, int]]
+    ) -> Tuple[int, int]:
+        """
+        依總頁數與 max_pages 計算實際要轉換的頁碼範圍
+        
+        Args:
+            pdf_path: PDF 檔案路徑
+            page_range: 頁碼範圍 (start, end)，None 表示全部
+        
+        Returns:
+            (起始頁, 結束頁) 元組（含結束頁）
+        """
+        total_pages = self.count_pages(pdf_path)
+        
+        if page_range:
+            first_page = max(1, page_range[0])
+            last_page = min(page_range[1], total_pages)
+        else:
+            first_page, last_page = 1, total_pages
+        
+        if self.max_pages and last_page - first_page + 1 > self.max_pages:
+            logger.warning(
+                f"頁數 {last_page - first_page + 1} 超過限制 {self.max_pages}，"
+                f"僅處理前 {self.max_pages} 頁"
+            )
+            last_page = first_page + self.max_pages - 1
+        
+        return first_page, last_page
+    
+    def _convert_kwargs(self, dpi: Optional[int] = None) -> dict:
+        """
+        組合 convert_from_path 的共用參數
+        
+        pdftoppm 一律輸出未壓縮的 PPM：頁面只在記憶體中解析一次，
+        需要存檔時才依 output_format 編碼，避免 PNG 編碼後又立即解碼。
+        """
+        convert_kwargs = {
+            'dpi': dpi or self.dpi,
+            'fmt': 'ppm'
+        }
+        if self.poppler_path:
+            convert_kwargs['poppler_path'] = self.poppler_path
+        return convert_kwargs
+    
+    def _save_kwargs(self) -> dict:
+        """頁面圖片存檔參數（PNG 使用快速壓縮等級）"""
+        if self.output_format == 'PNG':
+            return {'compress_level': PAGE_IMAGE_COMPRESS_LEVEL}
+        return {}
+    
+    def get_pdf_info(self, pdf_path: Union[str, Path]) -> dict:
+        """
+        取得 PDF 基本資訊（讀取 PDF 結構，不轉換頁面）
+        
+        Args:
+            pdf_path: PDF 檔案路徑
+        
         Returns:
             PDF 資訊字典
         """
@@ -200,42 +892,29 @@ class PDFConverter:
             }
         
         try:
-            # 準備轉換參數
-            convert_kwargs = {}
-            poppler_path = get_poppler_path()
-            if poppler_path:
-                convert_kwargs['poppler_path'] = poppler_path
-            
-            # 嘗試轉換第一頁來取得資訊
-            images = convert_from_path(
-                str(pdf_path),
-                dpi=72,  # 低解析度，僅用於取得資訊
-                first_page=1,
-                last_page=1,
-                **convert_kwargs
-            )
+            structure = read_pdf_structure(pdf_path, self.poppler_path)
+            total_pages = structure['total_pages']
             
-            if images:
-                first_page = images[0]
-                
-                # 嘗試取得總頁數（轉換所有頁面的低解析度版本）
-                all_images = convert_from_path(str(pdf_path), dpi=72, **convert_kwargs)
-                total_pages = len(all_images)
-                
-                return {
-                    'exists': True,
-                    'file_path': str(pdf_path),
-                    'file_name': pdf_path.name,
-                    'file_size_mb': pdf_path.stat().st_size / (1024 * 1024),
-                    'total_pages': total_pages,
-                    'first_page_size': first_page.size,
-                    'estimated_conversion_time': total_pages * 2  # 估計每頁 2 秒
-                }
-            else:
+            if total_pages == 0:
                 return {
                     'exists': True,
                     'error': 'PDF 無法讀取或為空白文件'
                 }
+            
+            # 點數（1/72 英吋）即 72 DPI 下的像素尺寸
+            first_width, first_height = structure['page_sizes'][0]
+            
+            return {
+                'exists': True,
+                'file_path': str(pdf_path),
+                'file_name': pdf_path.name,
+                'file_size_mb': pdf_path.stat().st_size / (1024 * 1024),
+                'total_pages': total_pages,
+                'first_page_size': (round(first_width), round(first_height)),
+                'page_sizes': structure['page_sizes'],
+                'metadata': structure['metadata'],
+                'estimated_conversion_time': total_pages * 2  # 估計每頁 2 秒
+            }
         
         except Exception as e:
             return {
@@ -260,7 +939,7 @@ class PDFConverter:
             start_page: 起始頁碼（從 1 開始）
             end_page: 結束頁碼
             **kwargs: 其他參數
-            
+        
         Returns:
             PDFConversionResult 物件
         """
@@ -286,7 +965,7 @@ class PDFConverter:
             output_dir: 輸出目錄
             page_number: 頁碼（從 1 開始）
             **kwargs: 其他參數
-            
+        
         Returns:
             PDFConversionResult 物件
         """
@@ -298,6 +977,116 @@ class PDFConverter:
         )
 
 
+# 頁面圖片僅供稽核，以速度優先的 PNG 壓縮等級存檔
+PAGE_IMAGE_COMPRESS_LEVEL = 1
+
+
+class PageImageWriter:
+    """
+    非同步頁面圖片寫入器
+    
+    在背景執行緒中以快速壓縮等級儲存頁面圖片，OCR 不需等待存檔完成。
+    佇列有上限，寫入跟不上時 submit 會阻塞，避免頁面在記憶體中累積。
+    """
+    
+    def __init__(self, output_format: str = 'PNG', max_pending: int = 8):
+        """
+        初始化頁面圖片寫入器
+        
+        Args:
+            output_format: 輸出格式 (PNG, JPEG)
+            max_pending: 等待寫入的最大頁面數
+        """
+        self.output_format = output_format.upper()
+        self.errors: List[str] = []
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max(1, max_pending))
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+    
+    def submit(self, image: Image.Image, path: Union[str, Path]):
+        """
+        排入一張待寫入的頁面圖片
+        
+        Args:
+            image: PIL Image 物件（寫入前不可再修改）
+            path: 輸出檔案路徑
+        """
+        self._queue.put((image, Path(path)))
+    
+    def close(self):
+        """等待所有頁面寫入完成並停止背景執行緒"""
+        self._queue.put(None)
+        self._thread.join()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+    
+    def _run(self):
+        save_kwargs = {'compress_level': PAGE_IMAGE_COMPRESS_LEVEL} if self.output_format == 'PNG' else {}
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            image, path = item
+            try:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                image.save(path, self.output_format, **save_kwargs)
+                logger.debug(f"  已儲存頁面圖片: {path.name}")
+            except Exception as e:
+                logger.error(f"頁面圖片儲存失敗 {path}: {e}")
+                self.errors.append(f"{path}: {e}")
+
+
+_PREFETCH_DONE = object()
+
+
+def _prefetch(iterator: Iterator, depth: int) -> Iterator:
+    """
+    在背景執行緒中預先取出 iterator 的元素（最多 depth 個）
+    
+    背景執行緒的例外會在呼叫端重新拋出；呼叫端提前結束時背景執行緒
+    會在下一次放入佇列時停止（包含結束標記與例外，不會因佇列已滿而永久阻塞）。
+    """
+    buffer: "queue.Queue" = queue.Queue(maxsize=depth)
+    stop = threading.Event()
+    
+    def put(item) -> bool:
+        """放入佇列，呼叫端已結束時放棄並回傳 False"""
+        while not stop.is_set():
+            try:
+                buffer.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+    
+    def worker():
+        try:
+            for item in iterator:
+                if not put(item):
+                    return
+            put(_PREFETCH_DONE)
+        except BaseException as e:
+            put(e)
+    
+    thread = threading.Thread(target=worker, daemon=True)
+    thread.start()
+    
+    try:
+        while True:
+            item = buffer.get()
+            if item is _PREFETCH_DONE:
+                return
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        stop.set()
+
+
 # 便利函數
 def convert_pdf_to_images(
     pdf_path: Union[str, Path],
@@ -315,7 +1104,7 @@ def convert_pdf_to_images(
         dpi: 解析度
         max_pages: 最大頁數
         **kwargs: 其他參數
-        
+    
     Returns:
         PDFConversionResult 物件
     """
@@ -329,7 +1118,7 @@ def get_pdf_info(pdf_path: Union[str, Path]) -> dict:
     
     Args:
         pdf_path: PDF 檔案路徑
-        
+    
     Returns:
         PDF 資訊字典
     """
@@ -0,0 +1,416 @@
+"""
+結果儲存模組
+以單一 SQLite 檔保存 OCRResult（文字、版面區塊、處理時間、設定），
+依內容雜湊 + 設定 + 模型指紋查詢（快取、續傳）或依工作 ID 依頁碼範圍掃描（報表、匯出），
+不必走訪輸出目錄讀取各處的 result.mmd
+
+命令列:
+    python -m src.result_store stats
+    python -m src.result_store export <輸出檔> [--job JOB_ID] [--format jsonl|markdown]
+"""
+
+import os
+import sys
+import json
+import time
+import sqlite3
+import argparse
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional, List, Dict, Union, Iterator, Any
+import logging
+
+from src.job_manifest import settings_fingerprint
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DB_PATH = "./outputs/results/results.db"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    content_hash TEXT NOT NULL,
+    settings_hash TEXT NOT NULL,
+    model TEXT,
+    job_id TEXT,
+    page INTEGER,
+    source_path TEXT,
+    success INTEGER NOT NULL,
+    skipped_blank INTEGER NOT NULL DEFAULT 0,
+    source TEXT NOT NULL DEFAULT 'ocr',
+    text TEXT NOT NULL DEFAULT '',
+    layout TEXT,
+    error TEXT,
+    processing_time REAL NOT NULL DEFAULT 0,
+    output_tokens INTEGER NOT NULL DEFAULT 0,
+    image_width INTEGER,
+    image_height INTEGER,
+    settings TEXT NOT NULL DEFAULT '{}',
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_results_hash ON results (content_hash, settings_hash, success);
+CREATE INDEX IF NOT EXISTS idx_results_job ON results (job_id, page);
+"""
+
+# 舊版資料庫缺少的欄位（開啟時補上；舊紀錄的 model 為 NULL，不會被當成任何模型的快取結果）
+_ADDED_COLUMNS = {
+    'model': "TEXT",
+    'skipped_blank': "INTEGER NOT NULL DEFAULT 0",
+}
+
+
+@dataclass
+class StoredResult:
+    """已儲存的結果"""
+    result_id: int                             # 紀錄 ID
+    content_hash: str                          # 輸入內容雜湊
+    settings_hash: str                         # 設定指紋
+    model: Optional[str]                       # 模型指紋
+    job_id: Optional[str]                      # 工作 ID
+    page: Optional[int]                        # 頁碼（單張圖片為 None）
+    source_path: Optional[str]                 # 來源路徑
+    success: bool                              # 是否成功
+    skipped_blank: bool                        # 是否因空白頁而跳過 OCR
+    source: str                                # 'ocr' 或 'text_layer'
+    text: str                                  # 辨識文字
+    layout: Optional[List[Dict[str, Any]]]     # 版面區塊
+    error: Optional[str]                       # 錯誤訊息
+    processing_time: float                     # 處理時間（秒）
+    output_tokens: int                         # 輸出 token 數
+    image_size: Optional[tuple]                # 圖片尺寸
+    settings: Dict[str, Any]                   # OCR 設定
+    created_at: float                          # 儲存時間
+    
+    @classmethod
+    def from_row(cls, row: sqlite3.Row) -> "StoredResult":
+        image_size = None
+        if row['image_width'] is not None:
+            image_size = (row['image_width'], row['image_height'])
+        return cls(
+            result_id=row['id'],
+            content_hash=row['content_hash'],
+            settings_hash=row['settings_hash'],
+            model=row['model'],
+            job_id=row['job_id'],
+            page=row['page'],
+            source_path=row['source_path'],
+            success=bool(row['success']),
+            skipped_blank=bool(row['skipped_blank']),
+            source=row['source'],
+            text=row['text'],
+            layout=json.loads(row['layout']) if row['layout'] else None,
+            error=row['error'],
+            processing_time=row['processing_time'],
+            output_tokens=row['output_tokens'],
+            image_size=image_size,
+            settings=json.loads(row['settings'] or '{}'),
+            created_at=row['created_at']
+        )
+    
+    def to_ocr_result(self):
+        """轉回 OCRResult（快取命中時使用，處理時間為 0）"""
+        from datetime import datetime
+        from src.ocr_engine import OCRResult
+        
+        return OCRResult(
+            text_content=self.text,
+            file_path=self.source_path or '',
+            processing_time=0.0,
+            image_size=self.image_size or (0, 0),
+            vram_used_gb=0.0,
+            timestamp=datetime.now(),
+            model_config=self.settings,
+            success=self.success,
+            error_message=self.error,
+            skipped_blank=self.skipped_blank,
+            source=self.source,
+            output_tokens=self.output_tokens,
+            layout=self.layout,
+            model_fingerprint=self.model
+        )
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """轉為可序列化為 JSON 的字典"""
+        data = dict(self.__dict__)
+        data['image_size'] = list(self.image_size) if self.image_size else None
+        return data
+
+
+class ResultStore:
+    """OCR 結果儲存（可多執行緒共用）"""
+    
+    def __init__(self, db_path: Union[str, Path] = DEFAULT_DB_PATH):
+        """
+        初始化結果儲存
+        
+        Args:
+            db_path: 資料庫檔案路徑
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        
+        conn = self._connect()
+        conn.executescript(_SCHEMA)
+        columns = {row['name'] for row in conn.execute("PRAGMA table_info(results)")}
+        for name, definition in _ADDED_COLUMNS.items():
+            if name not in columns:
+                conn.execute(f"ALTER TABLE results ADD COLUMN {name} {definition}")
+    
+    def _connect(self) -> sqlite3.Connection:
+        """取得目前執行緒的連線"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.db_path), timeout=30.0, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+    
+    def put(
+        self,
+        result,
+        content_hash: str,
+        job_id: Optional[str] = None,
+        page: Optional[int] = None,
+        settings: Optional[Dict[str, Any]] = None,
+        model: Optional[str] = None
+    ) -> int:
+        """
+        保存一筆 OCRResult
+        
+        Args:
+            result: OCRResult 物件
+            content_hash: 輸入內容雜湊（頁面為 PDF 雜湊時，以 page 區分）
+            job_id: 工作 ID（例如佇列工作、PDF 名稱或批次輸出檔）
+            page: 頁碼
+            settings: 影響結果的設定，None 使用 result.model_config
+            model: 模型指紋，None 使用 result.model_fingerprint
+        
+        Returns:
+            紀錄 ID
+        """
+        settings = settings if settings is not None else dict(result.model_config or {})
+        model = model if model is not None else getattr(result, 'model_fingerprint', None)
+        image_size = tuple(result.image_size) if result.image_size else (None, None)
+        
+        cursor = self._connect().execute(
+            "INSERT INTO results (content_hash, settings_hash, model, job_id, page, source_path, success, "
+            "skipped_blank, source, text, layout, error, processing_time, output_tokens, image_width, "
+            "image_height, settings, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                content_hash,
+                settings_fingerprint(settings),
+                model,
+                job_id,
+                page,
+                result.file_path,
+                int(result.success),
+                int(getattr(result, 'skipped_blank', False)),
+                getattr(result, 'source', 'ocr'),
+                result.text_content or '',
+                json.dumps(result.layout, ensure_ascii=False) if getattr(result, 'layout', None) else None,
+                result.error_message,
+                result.processing_time,
+                getattr(result, 'output_tokens', 0),
+                image_size[0],
+                image_size[1],
+                json.dumps(settings, ensure_ascii=False, sort_keys=True, default=str),
+                time.time()
+            )
+        )
+        return cursor.lastrowid
+    
+    def get(
+        self,
+        content_hash: str,
+        settings: Optional[Dict[str, Any]] = None,
+        page: Optional[int] = None,
+        model: Optional[str] = None
+    ) -> Optional[StoredResult]:
+        """
+        依內容雜湊查詢最新的成功結果
+        
+        Args:
+            content_hash: 輸入內容雜湊
+            settings: 設定，None 表示不限設定
+            page: 頁碼（PDF 頁面）
+            model: 模型指紋（OCREngine.model_fingerprint），None 表示不限模型
+        
+        Returns:
+            StoredResult，找不到時回傳 None
+        """
+        sql = "SELECT * FROM results WHERE content_hash = ? AND success = 1"
+        params: List[Any] = [content_hash]
+        if settings is not None:
+            sql += " AND settings_hash = ?"
+            params.append(settings_fingerprint(settings))
+        if model is not None:
+            sql += " AND model = ?"
+            params.append(model)
+        if page is not None:
+            sql += " AND page = ?"
+            params.append(page)
+        sql += " ORDER BY id DESC LIMIT 1"
+        
+        row = self._connect().execute(sql, params).fetchone()
+        return StoredResult.from_row(row) if row else None
+    
+    def iter_job(
+        self,
+        job_id: str,
+        first_page: Optional[int] = None,
+        last_page: Optional[int] = None
+    ) -> Iterator[StoredResult]:
+        """
+        依頁碼順序掃描工作的結果（同一頁面或圖片有多筆時只取最新一筆）
+        
+        Args:
+            job_id: 工作 ID
+            first_page: 起始頁（含），None 表示不限
+            last_page: 結束頁（含），None 表示不限
+        
+        Yields:
+            StoredResult 物件
+        """
+        sql = ("SELECT * FROM results WHERE id IN ("
+               "SELECT MAX(id) FROM results WHERE job_id = ?")
+        params: List[Any] = [job_id]
+        if first_page is not None:
+            sql += " AND page >= ?"
+            params.append(first_page)
+        if last_page is not None:
+            sql += " AND page <= ?"
+            params.append(last_page)
+        sql += " GROUP BY page, content_hash) ORDER BY page, id"
+        
+        for row in self._connect().execute(sql, params):
+            yield StoredResult.from_row(row)
+    
+    def jobs(self) -> List[Dict[str, Any]]:
+        """
+        列出所有工作的統計
+        
+        Returns:
+            [{'job_id', 'results', 'failed', 'processing_time', 'last_update'}, ...]
+        """
+        rows = self._connect().execute(
+            "SELECT job_id, COUNT(*) AS results, SUM(1 - success) AS failed, "
+            "SUM(processing_time) AS processing_time, MAX(created_at) AS last_update "
+            "FROM results WHERE job_id IS NOT NULL GROUP BY job_id ORDER BY last_update DESC"
+        )
+        return [dict(row) for row in rows]
+    
+    def stats(self) -> Dict[str, Any]:
+        """整體統計"""
+        row = self._connect().execute(
+            "SELECT COUNT(*) AS results, COALESCE(SUM(success), 0) AS successful, "
+            "COUNT(DISTINCT content_hash) AS unique_inputs, "
+            "COALESCE(SUM(processing_time), 0) AS processing_time, "
+            "COALESCE(SUM(output_tokens), 0) AS output_tokens FROM results"
+        ).fetchone()
+        stats = dict(row)
+        stats['db_size_mb'] = round(self.db_path.stat().st_size / 1024**2, 2)
+        return stats
+    
+    def export(
+        self,
+        output_path: Union[str, Path],
+        job_id: Optional[str] = None,
+        format: str = 'jsonl'
+    ) -> int:
+        """
+        匯出結果
+        
+        Args:
+            output_path: 輸出檔案
+            job_id: 只匯出此工作（依頁碼排序），None 表示全部（依儲存順序）
+            format: 'jsonl' 或 'markdown'
+        
+        Returns:
+            匯出筆數
+        
+        Raises:
+            ValueError: 不支援的格式
+        """
+        if format not in ('jsonl', 'markdown'):
+            raise ValueError(f"不支援的匯出格式: {format}")
+        
+        if job_id is not None:
+            results = self.iter_job(job_id)
+        else:
+            results = (StoredResult.from_row(row) for row in
+                       self._connect().execute("SELECT * FROM results ORDER BY id"))
+        
+        output_path = Path(output_path)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        count = 0
+        with open(output_path, 'w', encoding='utf-8') as f:
+            for stored in results:
+                if format == 'jsonl':
+                    f.write(json.dumps(stored.to_dict(), ensure_ascii=False) + '\n')
+                else:
+                    title = f"第 {stored.page} 頁" if stored.page else Path(stored.source_path or '').name
+                    f.write(f"<!-- {title} -->\n\n{stored.text}\n\n")
+                count += 1
+        
+        logger.info(f"匯出 {count} 筆結果: {output_path}")
+        return count
+    
+    def close(self):
+        """關閉目前執行緒的連線"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+# 全域結果儲存實例
+_result_store = None
+
+
+def get_result_store() -> ResultStore:
+    """取得全域結果儲存實例（路徑取自設定檔 results.db_path）"""
+    global _result_store
+    if _result_store is None:
+        from src.config_loader import get_config
+        _result_store = ResultStore(get_config().get('results.db_path', DEFAULT_DB_PATH))
+    return _result_store
+
+
+def main():
+    parser = argparse.ArgumentParser(description='DeepSeek-OCR 結果儲存')
+    parser.add_argument('--db', help='資料庫路徑（預設使用設定檔）')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    
+    subparsers.add_parser('stats', help='顯示統計與工作列表')
+    
+    export_parser = subparsers.add_parser('export', help='匯出結果')
+    export_parser.add_argument('output', help='輸出檔案')
+    export_parser.add_argument('--job', help='只匯出此工作')
+    export_parser.add_argument('--format', default='jsonl', choices=['jsonl', 'markdown'], help='匯出格式')
+    
+    args = parser.parse_args()
+    store = ResultStore(args.db) if args.db else get_result_store()
+    
+    if args.command == 'stats':
+        stats = store.stats()
+        print(f"結果: {stats['results']}（成功 {stats['successful']}，不同輸入 {stats['unique_inputs']}）")
+        print(f"處理時間: {stats['processing_time']:.1f} 秒，輸出 tokens: {stats['output_tokens']}")
+        print(f"資料庫: {store.db_path}（{stats['db_size_mb']} MB）")
+        for job in store.jobs()[:20]:
+            print(f"  {job['job_id']}: {job['results']} 筆，失敗 {job['failed']}")
+    
+    elif args.command == 'export':
+        count = store.export(args.output, job_id=args.job, format=args.format)
+        print(f"已匯出 {count} 筆結果到 {args.output}")
+
+
+if __name__ == '__main__':
+    if os.name == 'nt':
+        import codecs
+        sys.stdout = codecs.getwriter('utf-8')(sys.stdout.buffer, 'strict')
+        sys.stderr = codecs.getwriter('utf-8')(sys.stderr.buffer, 'strict')
+    main()
@@ -0,0 +1,156 @@
+"""
+推理排程模組
+多個頁籤（單張、批次、PDF）與服務共用同一個 OCREngine 時，依延遲等級決定下一個使用模型的請求：
+互動請求（使用者正在等待的單張圖片）優先於大量批次頁面，批次工作在互動請求完成後繼續
+
+模型推理無法中途切換，因此以「頁」為單位讓位：互動請求最多等待目前正在處理的那一頁，
+不會排在其他等待中的批次頁面之後
+"""
+
+import math
+import time
+import heapq
+import itertools
+import threading
+from contextlib import contextmanager
+from collections import deque
+from typing import Dict, Any, Deque, List, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+# 延遲等級（數字越小越先處理）
+PRIORITY_INTERACTIVE = 'interactive'
+PRIORITY_BULK = 'bulk'
+PRIORITY_RANKS = {
+    PRIORITY_INTERACTIVE: 0,
+    PRIORITY_BULK: 1,
+}
+
+# 每個等級保留的延遲樣本數
+LATENCY_HISTORY = 1000
+
+
+def _percentile(values: List[float], percent: float) -> float:
+    """計算百分位數（最近排名法）"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, math.ceil(percent / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+class InferenceScheduler:
+    """
+    依延遲等級分配模型使用權的優先鎖
+    
+    同一時間只有一個請求使用模型；釋放時交給等待中等級最高、最早到達的請求。
+    """
+    
+    def __init__(self, history: int = LATENCY_HISTORY):
+        """
+        初始化排程器
+        
+        Args:
+            history: 每個等級保留的延遲樣本數
+        """
+        self._condition = threading.Condition()
+        self._waiting: List[Tuple[int, int]] = []
+        self._sequence = itertools.count()
+        self._busy = False
+        self._active_priority = None
+        
+        self._samples: Dict[str, Dict[str, Deque[float]]] = {
+            priority: {'wait': deque(maxlen=history), 'service': deque(maxlen=history)}
+            for priority in PRIORITY_RANKS
+        }
+        self._counts = {priority: 0 for priority in PRIORITY_RANKS}
+        # 互動請求到達時有批次頁面在等待（因而插隊）的次數
+        self._jumps = 0
+    
+    @contextmanager
+    def slot(self, priority: str = PRIORITY_BULK):
+        """
+        取得模型使用權（context manager），離開時交給下一個請求
+        
+        Args:
+            priority: 'interactive' 或 'bulk'
+        
+        Raises:
+            ValueError: 不支援的等級
+        """
+        if priority not in PRIORITY_RANKS:
+            raise ValueError(f"不支援的延遲等級: {priority}（可用: {', '.join(PRIORITY_RANKS)}）")
+        
+        ticket = (PRIORITY_RANKS[priority], next(self._sequence))
+        enqueued_at = time.perf_counter()
+        
+        with self._condition:
+            if priority == PRIORITY_INTERACTIVE and any(
+                    rank > ticket[0] for rank, _ in self._waiting):
+                self._jumps += 1
+            heapq.heappush(self._waiting, ticket)
+            try:
+                while self._busy or self._waiting[0] != ticket:
+                    self._condition.wait()
+            except BaseException:
+                # 等待中被中斷時移除排隊紀錄，避免後面的請求永遠等不到
+                self._waiting.remove(ticket)
+                heapq.heapify(self._waiting)
+                self._condition.notify_all()
+                raise
+            heapq.heappop(self._waiting)
+            self._busy = True
+            self._active_priority = priority
+        
+        started_at = time.perf_counter()
+        try:
+            yield
+        finally:
+            finished_at = time.perf_counter()
+            with self._condition:
+                self._busy = False
+                self._active_priority = None
+                samples = self._samples[priority]
+                samples['wait'].append(started_at - enqueued_at)
+                samples['service'].append(finished_at - started_at)
+                self._counts[priority] += 1
+                self._condition.notify_all()
+    
+    def waiting(self) -> Dict[str, int]:
+        """目前等待中的請求數（依等級）"""
+        with self._condition:
+            counts = {priority: 0 for priority in PRIORITY_RANKS}
+            ranks = {rank: priority for priority, rank in PRIORITY_RANKS.items()}
+            for rank, _ in self._waiting:
+                counts[ranks[rank]] += 1
+            return counts
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        取得各等級的延遲統計
+        
+        Returns:
+            {等級: {count, waiting, wait_avg, wait_p95, service_avg, latency_p50, latency_p95}, ...}
+            以及 active（正在處理的等級）與 interactive_jumps（互動請求插隊次數）
+        """
+        waiting = self.waiting()
+        with self._condition:
+            stats: Dict[str, Any] = {
+                'active': self._active_priority,
+                'interactive_jumps': self._jumps
+            }
+            for priority, samples in self._samples.items():
+                waits = list(samples['wait'])
+                services = list(samples['service'])
+                latencies = [w + s for w, s in zip(waits, services)]
+                stats[priority] = {
+                    'count': self._counts[priority],
+                    'waiting': waiting[priority],
+                    'wait_avg': round(sum(waits) / len(waits), 3) if waits else 0.0,
+                    'wait_p95': round(_percentile(waits, 95), 3),
+                    'service_avg': round(sum(services) / len(services), 3) if services else 0.0,
+                    'latency_p50': round(_percentile(latencies, 50), 3),
+                    'latency_p95': round(_percentile(latencies, 95), 3)
+                }
+            return stats
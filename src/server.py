@@ -0,0 +1,690 @@
+"""
+本地 HTTP OCR 服務
+以單一常駐的 OCREngine 處理佇列中的圖片 / PDF 工作，模型只載入一次
+
+啟動:
+    python -m src.server --port 8000
+
+端點:
+    POST /jobs?filename=a.pdf          上傳檔案（請求本文為檔案內容），回傳工作 ID
+    GET  /jobs                         列出工作
+    GET  /jobs/<id>                    查詢工作狀態
+    GET  /jobs/<id>/events             以 Server-Sent Events 串流狀態變化
+    GET  /jobs/<id>/result             取得結果（?format=markdown 回傳合併 Markdown）
+    GET  /health                       服務狀態
+    GET  /metrics                      處理統計與記憶體資訊
+"""
+
+import os
+import sys
+import json
+import time
+import uuid
+import queue
+import shutil
+import argparse
+import threading
+from dataclasses import dataclass, field, asdict
+from http import HTTPStatus
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from pathlib import Path
+from typing import Optional, Dict, List, Any
+from urllib.parse import urlparse, parse_qs
+import logging
+
+logger = logging.getLogger(__name__)
+
+# 可接受的上傳副檔名
+IMAGE_EXTENSIONS = {'.png', '.jpg', '.jpeg', '.bmp', '.tiff', '.tif', '.webp'}
+PDF_EXTENSIONS = {'.pdf'}
+
+# 工作狀態
+JOB_QUEUED = 'queued'
+JOB_RUNNING = 'running'
+JOB_DONE = 'done'
+JOB_FAILED = 'failed'
+
+# 事件串流無變化時送出心跳的間隔（秒）
+EVENT_HEARTBEAT_SECONDS = 15.0
+
+# 已結束工作（含逐頁文字）保留的預設秒數
+DEFAULT_JOB_TTL_SECONDS = 3600.0
+
+
+@dataclass
+class Job:
+    """OCR 工作資料類別"""
+    job_id: str                                # 工作 ID
+    file_name: str                             # 上傳檔名
+    input_path: str                            # 上傳檔案暫存路徑
+    kind: str                                  # 'image' 或 'pdf'
+    options: Dict[str, Any]                    # OCR 參數
+    status: str = JOB_QUEUED                   # 工作狀態
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    pages_total: int = 0                       # 總頁數（圖片為 1）
+    pages_done: int = 0                        # 已完成頁數
+    truncated: bool = False                    # PDF 超過 max_pages，只處理了前段頁面
+    pages: List[Dict[str, Any]] = field(default_factory=list)  # 逐頁結果
+    error: Optional[str] = None                # 錯誤訊息
+    version: int = 0                           # 每次狀態更新遞增，供事件串流判斷變化
+    
+    @property
+    def finished(self) -> bool:
+        """工作是否已結束"""
+        return self.status in (JOB_DONE, JOB_FAILED)
+    
+    def to_dict(self, include_pages: bool = False) -> Dict[str, Any]:
+        """
+        轉換為字典
+        
+        Args:
+            include_pages: 是否包含逐頁結果
+        
+        Returns:
+            工作資訊字典
+        """
+        data = asdict(self)
+        data.pop('input_path')
+        if not include_pages:
+            data.pop('pages')
+        return data
+    
+    def to_markdown(self) -> str:
+        """將逐頁結果合併為含頁面錨點的 Markdown"""
+        if self.kind == 'image':
+            return self.pages[0]['text'] if self.pages else ""
+        
+        return "\n\n".join(
+            f'<a id="page-{page["page"]}"></a>\n\n{page["text"]}'
+            for page in self.pages
+        )
+
+
+class OCRService:
+    """
+    OCR 服務
+    
+    持有一個常駐的 OCREngine 與單一工作執行緒，上傳的工作依序排入佇列處理；
+    HTTP 執行緒只讀取工作狀態，不會直接呼叫模型。
+    上傳檔案在工作結束時刪除，已結束的工作保留 job_ttl_seconds 後移除。
+    """
+    
+    def __init__(
+        self,
+        engine,
+        work_dir: str = "./outputs/server",
+        pdf_options: Optional[Dict] = None,
+        job_ttl_seconds: float = DEFAULT_JOB_TTL_SECONDS
+    ):
+        """
+        初始化 OCR 服務
+        
+        Args:
+            engine: OCREngine 實例
+            work_dir: 上傳檔案與模型輸出的工作目錄
+            pdf_options: PDF 轉換設定（dpi、workers、ram_budget_mb、max_pages、use_text_layer）；
+                未指定 max_pages 時不限制頁數
+            job_ttl_seconds: 已結束工作的保留秒數，逾時後無法再查詢
+        """
+        self.engine = engine
+        self.work_dir = Path(work_dir)
+        self.upload_dir = self.work_dir / "uploads"
+        self.upload_dir.mkdir(parents=True, exist_ok=True)
+        self.pdf_options = pdf_options or {}
+        self.job_ttl_seconds = job_ttl_seconds
+        
+        self._queue: "queue.Queue[Optional[str]]" = queue.Queue()
+        self._jobs: Dict[str, Job] = {}
+        self._changed = threading.Condition()
+        self._worker: Optional[threading.Thread] = None
+        
+        self.started_at = time.time()
+        self._stats = {
+            'jobs_submitted': 0,
+            'jobs_completed': 0,
+            'jobs_failed': 0,
+            'pages_processed': 0,
+            'processing_seconds': 0.0
+        }
+        self._latencies: List[float] = []
+    
+    def start(self, load_model: bool = True):
+        """
+        啟動工作執行緒
+        
+        Args:
+            load_model: 是否先載入模型（服務啟動即完成暖機）
+        """
+        if load_model:
+            self.engine.load_model()
+        
+        self._worker = threading.Thread(target=self._run, name="ocr-worker", daemon=True)
+        self._worker.start()
+        logger.info("OCR 服務工作執行緒已啟動")
+    
+    def stop(self, timeout: Optional[float] = None):
+        """停止工作執行緒（處理中的工作會完成）"""
+        if self._worker is None:
+            return
+        self._queue.put(None)
+        self._worker.join(timeout)
+        self._worker = None
+    
+    def submit(self, data: bytes, file_name: str, options: Optional[Dict[str, Any]] = None) -> Job:
+        """
+        提交工作
+        
+        Args:
+            data: 檔案內容
+            file_name: 原始檔名（用於判斷類型）
+            options: OCR 參數（prompt、base_size、image_size、crop_mode、skip_blank）
+        
+        Returns:
+            Job 物件
+        
+        Raises:
+            ValueError: 不支援的檔案類型或空檔案
+        """
+        extension = Path(file_name).suffix.lower()
+        if extension in PDF_EXTENSIONS:
+            kind = 'pdf'
+        elif extension in IMAGE_EXTENSIONS:
+            kind = 'image'
+        else:
+            raise ValueError(f"不支援的檔案類型: {extension or file_name}")
+        if not data:
+            raise ValueError("上傳內容為空")
+        
+        job_id = uuid.uuid4().hex
+        input_path = self.upload_dir / f"{job_id}{extension}"
+        with open(input_path, 'wb') as f:
+            f.write(data)
+        
+        job = Job(
+            job_id=job_id,
+            file_name=Path(file_name).name,
+            input_path=str(input_path),
+            kind=kind,
+            options=dict(options or {}),
+            pages_total=1 if kind == 'image' else 0
+        )
+        
+        with self._changed:
+            self._expire_jobs()
+            self._jobs[job_id] = job
+            self._stats['jobs_submitted'] += 1
+        self._queue.put(job_id)
+        
+        logger.info(f"收到工作 {job_id}: {job.file_name} ({kind})")
+        return job
+    
+    def get(self, job_id: str) -> Optional[Job]:
+        """取得工作"""
+        with self._changed:
+            self._expire_jobs()
+            return self._jobs.get(job_id)
+    
+    def list_jobs(self) -> List[Job]:
+        """依提交時間列出工作"""
+        with self._changed:
+            self._expire_jobs()
+            return sorted(self._jobs.values(), key=lambda job: job.created_at)
+    
+    def _expire_jobs(self):
+        """移除結束超過 job_ttl_seconds 的工作（呼叫端需持有 _changed）"""
+        deadline = time.time() - self.job_ttl_seconds
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job.finished and job.finished_at is not None and job.finished_at < deadline
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+        if expired:
+            logger.debug(f"移除 {len(expired)} 個過期工作")
+            self._changed.notify_all()
+    
+    def wait_for_update(self, job_id: str, version: int, timeout: float) -> Optional[Job]:
+        """
+        等待工作狀態變化
+        
+        Args:
+            job_id: 工作 ID
+            version: 呼叫端已看過的版本
+            timeout: 最長等待秒數
+        
+        Returns:
+            Job 物件（版本可能未變，代表逾時），工作不存在時為 None
+        """
+        with self._changed:
+            self._changed.wait_for(
+                lambda: job_id not in self._jobs or self._jobs[job_id].version != version,
+                timeout
+            )
+            return self._jobs.get(job_id)
+    
+    def health(self) -> Dict[str, Any]:
+        """服務狀態"""
+        model_loaded = bool(getattr(self.engine, '_model_loaded', False))
+        worker_alive = self._worker is not None and self._worker.is_alive()
+        return {
+            'status': 'ok' if model_loaded and worker_alive else 'starting',
+            'model_loaded': model_loaded,
+            'worker_alive': worker_alive,
+            'queue_depth': self._queue.qsize(),
+            'uptime_seconds': round(time.time() - self.started_at, 1)
+        }
+    
+    def metrics(self) -> Dict[str, Any]:
+        """處理統計與記憶體資訊"""
+        with self._changed:
+            stats = dict(self._stats)
+            latencies = sorted(self._latencies)
+            running = sum(1 for job in self._jobs.values() if job.status == JOB_RUNNING)
+        
+        stats['queue_depth'] = self._queue.qsize()
+        stats['jobs_running'] = running
+        stats['processing_seconds'] = round(stats['processing_seconds'], 3)
+        stats['job_latency_seconds'] = _latency_summary(latencies)
+        if hasattr(self.engine, 'get_scheduler_stats'):
+            stats['scheduler'] = self.engine.get_scheduler_stats()
+        if hasattr(self.engine, 'get_admission_stats'):
+            stats['admission'] = self.engine.get_admission_stats()
+        if hasattr(self.engine, 'get_coalescer_stats'):
+            stats['coalescer'] = self.engine.get_coalescer_stats()
+        
+        try:
+            from src.memory_manager import get_memory_manager
+            stats['memory'] = get_memory_manager().get_memory_report()
+        except Exception as e:
+            stats['memory'] = {'error': str(e)}
+        
+        return stats
+    
+    def _update(self, job: Job, **changes):
+        """更新工作欄位並通知等待中的事件串流"""
+        with self._changed:
+            for key, value in changes.items():
+                setattr(job, key, value)
+            job.version += 1
+            self._changed.notify_all()
+    
+    def _add_page(self, job: Job, page: Dict[str, Any]):
+        """加入一頁結果"""
+        with self._changed:
+            job.pages.append(page)
+            job.pages_done += 1
+            job.version += 1
+            self._stats['pages_processed'] += 1
+            self._stats['processing_seconds'] += page.get('processing_time', 0.0)
+            self._changed.notify_all()
+    
+    def _run(self):
+        """工作執行緒：依序處理佇列中的工作"""
+        while True:
+            job_id = self._queue.get()
+            if job_id is None:
+                break
+            
+            job = self.get(job_id)
+            if job is None:
+                continue
+            
+            self._update(job, status=JOB_RUNNING, started_at=time.time())
+            job_dir = self.work_dir / "jobs" / job.job_id
+            try:
+                if job.kind == 'pdf':
+                    self._process_pdf(job, job_dir)
+                else:
+                    self._process_image(job, job_dir)
+                
+                failed_pages = [page for page in job.pages if not page['success']]
+                if failed_pages and len(failed_pages) == len(job.pages):
+                    raise RuntimeError(failed_pages[0].get('error') or "所有頁面辨識失敗")
+                if job.truncated:
+                    limit = self.pdf_options.get('max_pages')
+                    raise RuntimeError(f"共 {job.pages_total} 頁，超過 max_pages {limit}，僅處理前 {limit} 頁")
+                self._finish(job, JOB_DONE)
+            
+            except Exception as e:
+                logger.error(f"工作 {job.job_id} 失敗: {e}")
+                self._finish(job, JOB_FAILED, error=str(e))
+            
+            finally:
+                shutil.rmtree(job_dir, ignore_errors=True)
+                Path(job.input_path).unlink(missing_ok=True)
+    
+    def _finish(self, job: Job, status: str, error: Optional[str] = None):
+        """結束工作並記錄統計"""
+        finished_at = time.time()
+        with self._changed:
+            self._stats['jobs_completed' if status == JOB_DONE else 'jobs_failed'] += 1
+            self._latencies.append(finished_at - job.created_at)
+            if len(self._latencies) > 1000:
+                del self._latencies[:-1000]
+        self._update(job, status=status, finished_at=finished_at, error=error)
+        logger.info(f"工作 {job.job_id} {status}（{job.pages_done}/{job.pages_total} 頁）")
+    
+    def _ocr_kwargs(self, job: Job) -> Dict[str, Any]:
+        """組合 process_image 參數"""
+        allowed = ('prompt', 'base_size', 'image_size', 'crop_mode', 'skip_blank', 'priority')
+        return {key: value for key, value in job.options.items() if key in allowed}
+    
+    def _process_image(self, job: Job, job_dir: Path):
+        """處理單張圖片"""
+        result = self.engine.process_image(
+            job.input_path,
+            output_path=str(job_dir),
+            save_results=True,
+            source_path=job.file_name,
+            **self._ocr_kwargs(job)
+        )
+        self._add_page(job, _page_result(1, result))
+    
+    def _process_pdf(self, job: Job, job_dir: Path):
+        """逐頁處理 PDF（有文字層的頁面直接取文字）"""
+        from src.pdf_converter import PDFConverter
+        
+        options = self.pdf_options
+        max_pages = options.get('max_pages')
+        converter = PDFConverter(
+            dpi=options.get('dpi', 200),
+            max_pages=max_pages,
+            workers=options.get('workers', 1),
+            ram_budget_mb=options.get('ram_budget_mb')
+        )
+        
+        # pages_total 為文件實際頁數；超過 max_pages 時標記截斷，工作結束時視為失敗
+        page_count = converter.count_pages(job.input_path)
+        first_page, last_page = converter.resolve_page_range(job.input_path, None)
+        self._update(job, pages_total=page_count,
+                     truncated=last_page - first_page + 1 < page_count)
+        
+        pages = converter.iter_document(
+            job.input_path,
+            page_range=(first_page, last_page),
+            prefetch=2,
+            use_text_layer=options.get('use_text_layer', True)
+        )
+        for page in pages:
+            if page.source == 'text_layer':
+                self._add_page(job, {
+                    'page': page.page_number,
+                    'text': page.text,
+                    'source': page.source,
+                    'success': True,
+                    'processing_time': 0.0
+                })
+                continue
+            
+            page_dir = job_dir / f"page_{page.page_number:04d}"
+            result = self.engine.process_image(
+                page.image,
+                output_path=str(page_dir),
+                save_results=True,
+                source_path=f"{job.file_name}#page={page.page_number}",
+                **self._ocr_kwargs(job)
+            )
+            self._add_page(job, _page_result(page.page_number, result))
+            shutil.rmtree(page_dir, ignore_errors=True)
+
+
+def _page_result(page_number: int, result) -> Dict[str, Any]:
+    """將 OCRResult 轉為逐頁結果字典"""
+    return {
+        'page': page_number,
+        'text': result.text_content,
+        'source': result.source,
+        'success': result.success,
+        'skipped_blank': result.skipped_blank,
+        'processing_time': round(result.processing_time, 3),
+        'error': result.error_message
+    }
+
+
+def _latency_summary(latencies: List[float]) -> Dict[str, Optional[float]]:
+    """計算延遲統計（已排序列表）"""
+    if not latencies:
+        return {'count': 0, 'avg': None, 'p50': None, 'p95': None, 'max': None}
+    
+    def percentile(p: float) -> float:
+        return round(latencies[min(len(latencies) - 1, int(len(latencies) * p))], 3)
+    
+    return {
+        'count': len(latencies),
+        'avg': round(sum(latencies) / len(latencies), 3),
+        'p50': percentile(0.5),
+        'p95': percentile(0.95),
+        'max': round(latencies[-1], 3)
+    }
+
+
+def _parse_options(query: Dict[str, List[str]]) -> Dict[str, Any]:
+    """從查詢參數解析 OCR 參數"""
+    options = {}
+    if 'prompt' in query:
+        options['prompt'] = query['prompt'][0]
+    for key in ('base_size', 'image_size'):
+        if key in query:
+            options[key] = int(query[key][0])
+    for key in ('crop_mode', 'skip_blank'):
+        if key in query:
+            options[key] = query[key][0].lower() in ('1', 'true', 'yes')
+    if 'priority' in query:
+        from src.scheduler import PRIORITY_RANKS
+        if query['priority'][0] not in PRIORITY_RANKS:
+            raise ValueError(f"priority 需為 {' / '.join(PRIORITY_RANKS)}")
+        options['priority'] = query['priority'][0]
+    return options
+
+
+class OCRRequestHandler(BaseHTTPRequestHandler):
+    """HTTP 請求處理器（service 與 max_upload_bytes 由伺服器提供）"""
+    
+    server_version = "DeepSeekOCR/1.0"
+    protocol_version = "HTTP/1.1"
+    
+    @property
+    def service(self) -> OCRService:
+        return self.server.service
+    
+    def log_message(self, format, *args):
+        logger.debug(f"{self.address_string()} - {format % args}")
+    
+    def _send_json(self, payload: Any, status: int = HTTPStatus.OK):
+        """回傳 JSON"""
+        body = json.dumps(payload, ensure_ascii=False, default=str).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def _send_error(self, status: int, message: str):
+        """回傳錯誤 JSON"""
+        self._send_json({'error': message}, status)
+    
+    def do_POST(self):
+        url = urlparse(self.path)
+        if url.path.rstrip('/') != '/jobs':
+            self._send_error(HTTPStatus.NOT_FOUND, f"找不到路徑: {url.path}")
+            return
+        
+        query = parse_qs(url.query)
+        file_name = query.get('filename', [self.headers.get('X-Filename', '')])[0]
+        if not file_name:
+            self._send_error(HTTPStatus.BAD_REQUEST, "缺少 filename 參數")
+            return
+        
+        try:
+            length = int(self.headers.get('Content-Length', ''))
+        except ValueError:
+            length = -1
+        if length < 0:
+            self._send_error(HTTPStatus.BAD_REQUEST, "缺少或無效的 Content-Length")
+            return
+        if length > self.server.max_upload_bytes:
+            self._send_error(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "上傳檔案過大")
+            return
+        
+        data = self.rfile.read(length)
+        try:
+            job = self.service.submit(data, file_name, _parse_options(query))
+        except ValueError as e:
+            self._send_error(HTTPStatus.BAD_REQUEST, str(e))
+            return
+        
+        self._send_json(job.to_dict(), HTTPStatus.ACCEPTED)
+    
+    def do_GET(self):
+        url = urlparse(self.path)
+        parts = [part for part in url.path.split('/') if part]
+        query = parse_qs(url.query)
+        
+        if parts == ['health']:
+            self._send_json(self.service.health())
+        elif parts == ['metrics']:
+            self._send_json(self.service.metrics())
+        elif parts == ['jobs']:
+            self._send_json([job.to_dict() for job in self.service.list_jobs()])
+        elif len(parts) >= 2 and parts[0] == 'jobs':
+            job = self.service.get(parts[1])
+            if job is None:
+                self._send_error(HTTPStatus.NOT_FOUND, f"找不到工作: {parts[1]}")
+            elif len(parts) == 2:
+                self._send_json(job.to_dict())
+            elif parts[2:] == ['events']:
+                self._stream_events(job)
+            elif parts[2:] == ['result']:
+                self._send_result(job, query.get('format', ['json'])[0])
+            else:
+                self._send_error(HTTPStatus.NOT_FOUND, f"找不到路徑: {url.path}")
+        else:
+            self._send_error(HTTPStatus.NOT_FOUND, f"找不到路徑: {url.path}")
+    
+    def _send_result(self, job: Job, result_format: str):
+        """回傳工作結果"""
+        if not job.finished:
+            self._send_json(job.to_dict(), HTTPStatus.ACCEPTED)
+            return
+        
+        if result_format in ('markdown', 'md'):
+            body = job.to_markdown().encode('utf-8')
+            self.send_response(HTTPStatus.OK)
+            self.send_header('Content-Type', 'text/markdown; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+        
+        self._send_json(job.to_dict(include_pages=True))
+    
+    def _stream_events(self, job: Job):
+        """以 Server-Sent Events 串流工作狀態，直到工作結束"""
+        self.send_response(HTTPStatus.OK)
+        self.send_header('Content-Type', 'text/event-stream; charset=utf-8')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        self.close_connection = True
+        
+        version = -1
+        try:
+            while True:
+                job = self.service.wait_for_update(job.job_id, version, EVENT_HEARTBEAT_SECONDS)
+                if job is None:
+                    break
+                
+                if job.version == version:
+                    self.wfile.write(b": heartbeat\n\n")
+                else:
+                    version = job.version
+                    payload = json.dumps(job.to_dict(), ensure_ascii=False, default=str)
+                    self.wfile.write(f"event: status\ndata: {payload}\n\n".encode('utf-8'))
+                self.wfile.flush()
+                
+                if job.finished:
+                    break
+        except (BrokenPipeError, ConnectionResetError):
+            logger.debug(f"事件串流用戶端已中斷: {job.job_id}")
+
+
+def create_server(
+    service: OCRService,
+    host: str = "127.0.0.1",
+    port: int = 8000,
+    max_upload_mb: int = 200
+) -> ThreadingHTTPServer:
+    """
+    建立 HTTP 伺服器
+    
+    Args:
+        service: OCRService 實例
+        host: 監聽位址
+        port: 監聽埠（0 表示自動選擇）
+        max_upload_mb: 上傳檔案大小上限（MB）
+    
+    Returns:
+        ThreadingHTTPServer 實例（尚未開始 serve_forever）
+    """
+    server = ThreadingHTTPServer((host, port), OCRRequestHandler)
+    server.daemon_threads = True
+    server.service = service
+    server.max_upload_bytes = max_upload_mb * 1024 * 1024
+    return server
+
+
+def main():
+    from src.config_loader import get_config
+    from src.logger import setup_logger
+    
+    config = get_config()
+    
+    parser = argparse.ArgumentParser(description='DeepSeek-OCR 本地 HTTP 服務')
+    parser.add_argument('--host', default=config.get('server.host', '127.0.0.1'), help='監聽位址')
+    parser.add_argument('--port', type=int, default=config.get('server.port', 8000), help='監聽埠')
+    parser.add_argument('--model', default=config.get('paths.model_dir', './models/deepseek-ocr'),
+                        help='模型路徑')
+    parser.add_argument('--work-dir', default=config.get('server.work_dir', './outputs/server'),
+                        help='工作目錄')
+    args = parser.parse_args()
+    
+    setup_logger("server", console_output=True, file_output=True)
+    
+    from src.ocr_engine import OCREngine
+    from src.image_processor import BlankPageConfig
+    
+    # 請求未指定 skip_blank 時依 blank_detection.enabled 決定
+    engine = OCREngine(model_path=args.model, blank_config=BlankPageConfig.from_config())
+    
+    # pdf.max_pages 是 GUI 的預設上限，服務不截斷上傳的 PDF
+    pdf_options = {key: value for key, value in config.get('pdf', {}).items() if key != 'max_pages'}
+    service = OCRService(
+        engine,
+        work_dir=args.work_dir,
+        pdf_options=pdf_options,
+        job_ttl_seconds=config.get('server.job_ttl_seconds', DEFAULT_JOB_TTL_SECONDS)
+    )
+    service.start()
+    
+    server = create_server(service, args.host, args.port, config.get('server.max_upload_mb', 200))
+    logger.info(f"OCR 服務啟動: http://{args.host}:{server.server_address[1]}")
+    print(f"OCR 服務啟動: http://{args.host}:{server.server_address[1]}")
+    
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n正在停止服務...")
+    finally:
+        server.shutdown()
+        server.server_close()
+        service.stop(timeout=5)
+
+
+if __name__ == '__main__':
+    if os.name == 'nt':
+        import codecs
+        sys.stdout = codecs.getwriter('utf-8')(sys.stdout.buffer, 'strict')
+        sys.stderr = codecs.getwriter('utf-8')(sys.stderr.buffer, 'strict')
+    main()
@@ -0,0 +1,229 @@
+"""
+輸入分片與結果合併模組
+多台機器分工處理大量檔案：每台以 --shard i/N 只處理自己的分片，
+分片由檔案鍵的雜湊決定（與輸入順序、檔案數量無關），重新執行時同一檔案必定落在同一分片；
+處理完成後以 merge_results 合併各分片的 JSONL 結果，並回報缺漏與重複的頁面
+"""
+
+import json
+import hashlib
+import argparse
+from pathlib import Path
+from typing import Optional, List, Dict, Tuple, Union, Iterable, Callable, TypeVar, Any
+import logging
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+
+def parse_shard(text: str) -> Tuple[int, int]:
+    """
+    解析 i/N 格式的分片參數
+    
+    Args:
+        text: 例如 "0/4"
+    
+    Returns:
+        (分片索引, 分片總數)
+    
+    Raises:
+        argparse.ArgumentTypeError: 格式錯誤（可直接作為 argparse 的 type）
+    """
+    try:
+        index, count = (int(part) for part in text.split('/'))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"分片格式應為 i/N，例如 0/4: {text}")
+    if count < 1 or not 0 <= index < count:
+        raise argparse.ArgumentTypeError(f"分片索引需介於 0 到 N-1: {text}")
+    return index, count
+
+
+def shard_key(path: Union[str, Path], root: Optional[Union[str, Path]] = None) -> str:
+    """
+    取得檔案的分片鍵
+    
+    各機器的掛載位置可能不同，因此使用相對於輸入根目錄（或清單檔目錄）的路徑，
+    並統一為 / 分隔。
+    
+    Args:
+        path: 檔案路徑
+        root: 輸入根目錄，None 表示直接使用 path
+    
+    Returns:
+        分片鍵字串
+    """
+    path = Path(path)
+    if root is not None:
+        try:
+            path = path.resolve().relative_to(Path(root).resolve())
+        except ValueError:
+            pass
+    return path.as_posix()
+
+
+def assign_shard(key: str, count: int) -> int:
+    """
+    以 SHA-1 雜湊將鍵分配到分片（跨機器、跨 Python 版本穩定，不受 PYTHONHASHSEED 影響）
+    
+    Args:
+        key: 分片鍵
+        count: 分片總數
+    
+    Returns:
+        分片索引（0 到 count-1）
+    """
+    digest = hashlib.sha1(key.encode('utf-8')).digest()
+    return int.from_bytes(digest[:8], 'big') % count
+
+
+def select_shard(
+    items: Iterable[T],
+    index: int,
+    count: int,
+    key: Callable[[T], str] = str
+) -> List[T]:
+    """
+    取出屬於第 index 個分片的項目（維持原順序）
+    
+    Args:
+        items: 項目
+        index: 分片索引
+        count: 分片總數
+        key: 取得分片鍵的函數
+    
+    Returns:
+        該分片的項目列表
+    """
+    return [item for item in items if assign_shard(key(item), count) == index]
+
+
+def _record_key(record: Dict[str, Any]) -> str:
+    """結果紀錄的檔案鍵（舊紀錄沒有 key 欄位時使用 path）"""
+    return record.get('key') or record.get('path', '')
+
+
+def merge_results(
+    shard_files: List[Union[str, Path]],
+    output_path: Union[str, Path],
+    expected_keys: Optional[Iterable[str]] = None,
+    page_counts: Optional[Dict[str, int]] = None
+) -> Dict[str, Any]:
+    """
+    合併各分片的 JSONL 結果
+    
+    結果檔在每次重新執行時附加寫入，因此先去除過期的紀錄：同一檔案只保留最新一筆紀錄的
+    內容雜湊（sha256）對應的紀錄；之後的執行已產出頁面紀錄時，較早的整份文件失敗紀錄也不再計入。
+    同一頁面（檔案鍵 + 頁碼）有多筆紀錄時，保留最後一筆成功的紀錄；
+    在不同分片檔中都有成功紀錄的頁面回報為重複（通常代表分片參數不一致）。
+    
+    Args:
+        shard_files: 各分片的 JSONL 結果檔
+        output_path: 合併後的 JSONL 檔（依檔案鍵、頁碼排序）
+        expected_keys: 預期的檔案鍵，提供時回報完全沒有結果的檔案
+        page_counts: {檔案鍵: 總頁數}，補充紀錄中的 page_count（例如由 read_pdf_structure 讀取）
+    
+    Returns:
+        合併報告字典
+    """
+    records: List[Tuple[str, Dict[str, Any]]] = []
+    latest: Dict[str, Dict[str, Any]] = {}
+    records_read = 0
+    invalid_lines = 0
+    
+    for shard_file in shard_files:
+        with open(shard_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    invalid_lines += 1
+                    continue
+                
+                records_read += 1
+                records.append((str(shard_file), record))
+                key = _record_key(record)
+                current = latest.get(key)
+                if current is None or (record.get('timestamp') or '') >= (current.get('timestamp') or ''):
+                    latest[key] = record
+    
+    best: Dict[Tuple[str, int], Dict[str, Any]] = {}
+    sources: Dict[Tuple[str, int], set] = {}
+    stale_records = 0
+    for shard_file, record in records:
+        key = _record_key(record)
+        current_hash = latest[key].get('sha256')
+        if record.get('sha256') and current_hash and record['sha256'] != current_hash:
+            # 檔案內容已變更，舊內容的結果不再有效
+            stale_records += 1
+            continue
+        
+        page_key = (key, record.get('page') or 0)
+        current = best.get(page_key)
+        if record.get('success'):
+            sources.setdefault(page_key, set()).add(shard_file)
+            best[page_key] = record
+        elif current is None or not current.get('success'):
+            best[page_key] = record
+    
+    # 已有頁面紀錄的文件：整份文件的失敗紀錄（page 為空）只有在它是最新一筆時才保留
+    paged_keys = {key for key, page in best if page}
+    for key in paged_keys:
+        record = best.get((key, 0))
+        if record is not None and record is not latest[key]:
+            del best[(key, 0)]
+            sources.pop((key, 0), None)
+            stale_records += 1
+    
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_path, 'w', encoding='utf-8') as f:
+        for page_key in sorted(best):
+            f.write(json.dumps(best[page_key], ensure_ascii=False) + '\n')
+    
+    failed = sorted(f"{key}#page={page}" if page else key
+                    for (key, page), record in best.items() if not record.get('success'))
+    duplicates = sorted(f"{key}#page={page}" if page else key
+                        for (key, page), files in sources.items() if len(files) > 1)
+    
+    # PDF 缺少的頁面：依紀錄的總頁數（page_count）或 page_counts，包含末尾被截斷的頁面；
+    # 沒有總頁數時只能找出已知最大頁碼以下的缺口
+    pages_by_key: Dict[str, List[int]] = {}
+    for key, page in best:
+        if page:
+            pages_by_key.setdefault(key, []).append(page)
+    expected_pages: Dict[str, int] = dict(page_counts or {})
+    for (key, _), record in best.items():
+        if record.get('page_count'):
+            expected_pages[key] = max(expected_pages.get(key, 0), record['page_count'])
+    missing_pages = []
+    for key, pages in sorted(pages_by_key.items()):
+        present = set(pages)
+        last_page = max(max(pages), expected_pages.get(key, 0))
+        missing_pages.extend(f"{key}#page={page}" for page in range(1, last_page + 1) if page not in present)
+    
+    done_keys = {key for (key, _), record in best.items() if record.get('success')}
+    missing_files = sorted(set(expected_keys) - {key for key, _ in best}) if expected_keys is not None else []
+    
+    report = {
+        'shard_files': len(shard_files),
+        'records_read': records_read,
+        'invalid_lines': invalid_lines,
+        'stale_records': stale_records,
+        'files': len({key for key, _ in best}),
+        'files_with_results': len(done_keys),
+        'pages': len(best),
+        'failed': failed,
+        'duplicates': duplicates,
+        'missing_pages': missing_pages,
+        'missing_files': missing_files,
+        'output': str(output_path)
+    }
+    logger.info(
+        f"合併 {len(shard_files)} 個分片: {len(best)} 頁，失敗 {len(failed)}，"
+        f"重複 {len(duplicates)}，缺頁 {len(missing_pages)}，缺檔 {len(missing_files)}"
+    )
+    return report
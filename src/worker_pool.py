@@ -0,0 +1,301 @@
+"""
+CPU 多行程 OCR 工作池
+每個工作行程各有一個 OCREngine，以 torch.set_num_threads 分配 CPU 核心，
+模型權重透過記憶體映射共用；頁面由共用佇列分派，閒置的行程先取得下一頁
+"""
+
+import os
+import time
+import queue
+import shutil
+import tempfile
+import multiprocessing as mp
+from pathlib import Path
+from typing import Optional, List, Dict, Union, Iterable, Iterator, Callable, Any
+import logging
+
+import psutil
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+# 每個工作行程最多排隊的頁面數，避免記憶體中堆積大量待處理頁面
+TASKS_PER_WORKER = 2
+
+
+def physical_cpu_count() -> int:
+    """取得實體核心數（無法取得時使用邏輯核心數）"""
+    return psutil.cpu_count(logical=False) or os.cpu_count() or 1
+
+
+def create_cpu_engine(model_path: str, engine_kwargs: Dict[str, Any]):
+    """
+    建立 CPU 工作行程使用的 OCREngine（預設的 engine_factory）
+    
+    Args:
+        model_path: 模型路徑
+        engine_kwargs: 其他 OCREngine 參數
+    
+    Returns:
+        OCREngine 實例
+    """
+    import torch
+    from src.ocr_engine import OCREngine
+    
+    kwargs = dict(device='cpu', torch_dtype=torch.bfloat16, mmap_weights=True)
+    kwargs.update(engine_kwargs)
+    return OCREngine(model_path=model_path, **kwargs)
+
+
+def _worker_main(
+    worker_id: int,
+    num_threads: int,
+    engine_factory: Callable,
+    model_path: str,
+    engine_kwargs: Dict[str, Any],
+    tasks: mp.Queue,
+    results: mp.Queue
+):
+    """工作行程主迴圈"""
+    import torch
+    
+    torch.set_num_threads(num_threads)
+    torch.set_num_interop_threads(1)
+    
+    start_time = time.time()
+    try:
+        engine = engine_factory(model_path, engine_kwargs)
+        engine.load_model()
+    except Exception as e:
+        results.put(('error', worker_id, None, f"{type(e).__name__}: {e}"))
+        return
+    
+    results.put(('ready', worker_id, None, time.time() - start_time))
+    
+    # 每個行程使用自己的模型輸出目錄，避免 result.mmd 互相覆寫
+    default_output = Path(tempfile.gettempdir()) / f"deepseek_ocr_worker_{os.getpid()}"
+    
+    while True:
+        task = tasks.get()
+        if task is None:
+            break
+        
+        task_id, image, kwargs = task
+        # 頁面文字由模型寫出的 result.mmd 取得，未儲存時不會回傳文字
+        kwargs.setdefault('save_results', True)
+        if kwargs.setdefault('output_path', str(default_output)) == str(default_output):
+            # 清除上一頁的輸出，避免讀到舊的 result.mmd
+            shutil.rmtree(default_output, ignore_errors=True)
+        result = engine.process_image(image, **kwargs)
+        results.put(('result', worker_id, task_id, result))
+
+
+class OCRWorkerPool:
+    """CPU 多行程 OCR 工作池"""
+    
+    def __init__(
+        self,
+        num_workers: Optional[int] = None,
+        model_path: str = "./models/deepseek-ocr",
+        threads_per_worker: Optional[int] = None,
+        engine_factory: Callable = create_cpu_engine,
+        engine_kwargs: Optional[Dict[str, Any]] = None,
+        start_timeout: float = 1800.0
+    ):
+        """
+        初始化工作池
+        
+        Args:
+            num_workers: 工作行程數，None 表示實體核心數的一半（至少 1）
+            model_path: 模型路徑
+            threads_per_worker: 每個行程的 torch 執行緒數，None 表示平均分配實體核心
+            engine_factory: 在工作行程中建立引擎的函數 (model_path, engine_kwargs)，需可被 pickle
+            engine_kwargs: 傳給 engine_factory 的其他參數
+            start_timeout: 等待所有行程載入模型的秒數
+        """
+        cores = physical_cpu_count()
+        self.num_workers = max(1, num_workers or cores // 2)
+        self.threads_per_worker = threads_per_worker or max(1, cores // self.num_workers)
+        self.model_path = model_path
+        self.engine_factory = engine_factory
+        self.engine_kwargs = engine_kwargs or {}
+        self.start_timeout = start_timeout
+        
+        self._context = mp.get_context('spawn')
+        self._tasks = None
+        self._results = None
+        self._processes: List[mp.Process] = []
+        self._next_task_id = 0
+        self.load_times: Dict[int, float] = {}
+        
+        logger.info(f"OCRWorkerPool 初始化")
+        logger.info(f"  工作行程數: {self.num_workers}")
+        logger.info(f"  每行程執行緒數: {self.threads_per_worker}（實體核心 {cores}）")
+    
+    def start(self):
+        """
+        啟動工作行程並等待模型載入完成
+        
+        Raises:
+            RuntimeError: 任一行程載入失敗或逾時
+        """
+        if self._processes:
+            return
+        
+        self._tasks = self._context.Queue()
+        self._results = self._context.Queue()
+        
+        for worker_id in range(self.num_workers):
+            process = self._context.Process(
+                target=_worker_main,
+                args=(worker_id, self.threads_per_worker, self.engine_factory,
+                      self.model_path, self.engine_kwargs, self._tasks, self._results),
+                name=f"ocr-worker-{worker_id}",
+                daemon=True
+            )
+            process.start()
+            self._processes.append(process)
+        
+        deadline = time.time() + self.start_timeout
+        while len(self.load_times) < self.num_workers:
+            try:
+                kind, worker_id, _, payload = self._results.get(timeout=max(0.1, deadline - time.time()))
+            except queue.Empty:
+                self.close()
+                raise RuntimeError("工作行程載入模型逾時")
+            
+            if kind == 'error':
+                self.close()
+                raise RuntimeError(f"工作行程 {worker_id} 載入失敗: {payload}")
+            self.load_times[worker_id] = payload
+            logger.info(f"  工作行程 {worker_id} 就緒（載入 {payload:.1f} 秒）")
+    
+    def imap(
+        self,
+        images: Iterable[Union[str, Path, Image.Image]],
+        **kwargs
+    ) -> Iterator:
+        """
+        依輸入順序產出 OCRResult
+        
+        佇列中最多保留 num_workers × TASKS_PER_WORKER 頁，閒置的行程會先取得下一頁，
+        因此處理時間長短不一的頁面也能平均分配。
+        
+        Args:
+            images: 圖片路徑或 PIL 圖片
+            **kwargs: 傳遞給 process_image 的參數
+        
+        Yields:
+            OCRResult 物件
+        """
+        self.start()
+        
+        max_in_flight = self.num_workers * TASKS_PER_WORKER
+        pending: Dict[int, Any] = {}
+        next_yield = self._next_task_id
+        in_flight = 0
+        
+        image_iter = iter(images)
+        exhausted = False
+        while True:
+            while not exhausted and in_flight < max_in_flight:
+                image = next(image_iter, None)
+                if image is None:
+                    exhausted = True
+                    break
+                if isinstance(image, Path):
+                    image = str(image)
+                self._tasks.put((self._next_task_id, image, dict(kwargs)))
+                self._next_task_id += 1
+                in_flight += 1
+            
+            if in_flight == 0:
+                break
+            
+            kind, worker_id, task_id, payload = self._get_result()
+            pending[task_id] = payload
+            in_flight -= 1
+            
+            while next_yield in pending:
+                yield pending.pop(next_yield)
+                next_yield += 1
+    
+    def process_images(self, images: Iterable[Union[str, Path, Image.Image]], **kwargs) -> List:
+        """
+        處理多張圖片
+        
+        Args:
+            images: 圖片路徑或 PIL 圖片
+            **kwargs: 傳遞給 process_image 的參數
+        
+        Returns:
+            依輸入順序的 OCRResult 列表
+        """
+        return list(self.imap(images, **kwargs))
+    
+    def _get_result(self):
+        """取得一筆結果，同時檢查工作行程是否意外結束"""
+        while True:
+            try:
+                return self._results.get(timeout=5.0)
+            except queue.Empty:
+                dead = [p.name for p in self._processes if not p.is_alive()]
+                if dead:
+                    raise RuntimeError(f"工作行程意外結束: {', '.join(dead)}")
+    
+    def worker_memory(self) -> List[Dict[str, float]]:
+        """
+        取得各工作行程的記憶體用量
+        
+        RSS 會把共用的映射權重算進每個行程；PSS 將共用頁面依行程數平均分攤，
+        USS 只計算行程獨占的記憶體，兩者較能反映實際增加的 RAM。
+        
+        Returns:
+            每個行程一筆 {'pid', 'rss_mb', 'pss_mb', 'uss_mb'}（平台不支援的欄位為 None）
+        """
+        stats = []
+        for process in self._processes:
+            try:
+                proc = psutil.Process(process.pid)
+                try:
+                    full = proc.memory_full_info()
+                    pss = getattr(full, 'pss', None)
+                    uss = getattr(full, 'uss', None)
+                    rss = full.rss
+                except psutil.AccessDenied:
+                    pss = uss = None
+                    rss = proc.memory_info().rss
+            except psutil.NoSuchProcess:
+                continue
+            
+            to_mb = lambda value: round(value / 1024**2, 1) if value is not None else None
+            stats.append({
+                'pid': process.pid,
+                'rss_mb': to_mb(rss),
+                'pss_mb': to_mb(pss),
+                'uss_mb': to_mb(uss)
+            })
+        return stats
+    
+    def close(self, timeout: float = 10.0):
+        """停止所有工作行程"""
+        if not self._processes:
+            return
+        
+        for _ in self._processes:
+            self._tasks.put(None)
+        for process in self._processes:
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+        
+        self._processes = []
+        self.load_times = {}
+        logger.info("工作池已關閉")
+    
+    def __enter__(self):
+        self.start()
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
@@ -0,0 +1,123 @@
+"""
+工作佇列回歸測試
+以替身轉換器與引擎執行一個 PDF 工作（不需要模型、poppler）
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from PIL import Image
+
+import src.pdf_converter
+from src.job_queue import JobQueue, QueueWorker, STATUS_DONE, STATUS_ENQUEUED, STATUS_FAILED
+from src.ocr_engine import OCRResult
+from src.pdf_converter import PDFPage
+
+
+class StubConverter:
+    """第 1 頁為文字層、第 2 頁需要 OCR 的替身轉換器"""
+    
+    def __init__(self, *args, **kwargs):
+        pass
+    
+    def iter_document(self, pdf_path, **kwargs):
+        yield PDFPage(1, 'text_layer', text="文字層內容")
+        yield PDFPage(2, 'ocr', image=Image.new('RGB', (64, 64), 'white'))
+
+
+class LongStubConverter:
+    """共 5 頁、依 max_pages 截斷的替身轉換器"""
+    
+    def __init__(self, *args, max_pages=None, **kwargs):
+        self.max_pages = max_pages
+    
+    def count_pages(self, pdf_path):
+        return 5
+    
+    def iter_document(self, pdf_path, **kwargs):
+        for page_number in range(1, min(5, self.max_pages or 5) + 1):
+            yield PDFPage(page_number, 'text_layer', text=f"第 {page_number} 頁")
+
+
+class StubEngine:
+    """回傳固定文字的替身引擎"""
+    
+    def __init__(self, success=True):
+        self.success = success
+    
+    def process_image(self, image, **kwargs):
+        return OCRResult(
+            text_content="OCR 內容" if self.success else "",
+            file_path=kwargs.get('source_path', ''),
+            processing_time=0.1,
+            image_size=image.size,
+            vram_used_gb=0.0,
+            timestamp=None,
+            model_config={},
+            success=self.success,
+            error_message=None if self.success else "推理失敗"
+        )
+
+
+def test_pdf_job_runs_end_to_end(tmp_path, monkeypatch):
+    monkeypatch.setattr(src.pdf_converter, 'PDFConverter', StubConverter)
+    
+    pdf_path = tmp_path / "doc.pdf"
+    pdf_path.write_bytes(b"%PDF-1.4 stub")
+    
+    job_queue = JobQueue(tmp_path / "jobs.db")
+    job_id = job_queue.enqueue(pdf_path)
+    worker = QueueWorker(job_queue, StubEngine(), tmp_path / "out")
+    
+    stats = worker.run()
+    
+    assert stats == {'done': 1, 'failed': 0, 'retried': 0}
+    job = job_queue.get(job_id)
+    assert job.status == STATUS_DONE
+    markdown = (Path(job.result_path) / "doc.md").read_text(encoding='utf-8')
+    assert "文字層內容" in markdown
+    assert "OCR 內容" in markdown
+    job_queue.close()
+
+
+def test_pdf_job_with_failed_page_is_retried(tmp_path, monkeypatch):
+    monkeypatch.setattr(src.pdf_converter, 'PDFConverter', StubConverter)
+    
+    pdf_path = tmp_path / "doc.pdf"
+    pdf_path.write_bytes(b"%PDF-1.4 stub")
+    
+    job_queue = JobQueue(tmp_path / "jobs.db")
+    job_id = job_queue.enqueue(pdf_path)
+    worker = QueueWorker(job_queue, StubEngine(success=False), tmp_path / "out")
+    
+    assert worker.run(max_jobs=1) == {'done': 0, 'failed': 0, 'retried': 1}
+    job = job_queue.get(job_id)
+    assert job.status == STATUS_ENQUEUED
+    assert "第 2 頁" in job.error
+    job_queue.close()
+
+
+def test_pdf_job_is_not_truncated_by_default(tmp_path, monkeypatch):
+    monkeypatch.setattr(src.pdf_converter, 'PDFConverter', LongStubConverter)
+    
+    pdf_path = tmp_path / "doc.pdf"
+    pdf_path.write_bytes(b"%PDF-1.4 stub")
+    
+    job_queue = JobQueue(tmp_path / "jobs.db")
+    done_id = job_queue.enqueue(pdf_path)
+    QueueWorker(job_queue, StubEngine(), tmp_path / "out").run()
+    
+    job = job_queue.get(done_id)
+    assert job.status == STATUS_DONE
+    assert "第 5 頁" in (Path(job.result_path) / "doc.md").read_text(encoding='utf-8')
+    
+    capped_id = job_queue.enqueue(pdf_path, queue='capped')
+    QueueWorker(job_queue, StubEngine(), tmp_path / "out", queue='capped', max_pages=3).run()
+    
+    job = job_queue.get(capped_id)
+    assert job.status == STATUS_FAILED
+    assert job.attempts == 1
+    assert "共 5 頁" in job.error
+    job_queue.close()